@@ -0,0 +1,29 @@
+"""add claim ownership columns to analysis_jobs for multi-worker dispatch
+
+Revision ID: 20261016_0009
+Revises: 20260719_0008
+Create Date: 2026-10-16 09:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20261016_0009"
+down_revision: Union[str, None] = "20260719_0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("analysis_jobs", sa.Column("claimed_by", sa.String(length=255), nullable=True))
+    op.add_column("analysis_jobs", sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("idx_analysis_jobs_status_created", "analysis_jobs", ["status", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_analysis_jobs_status_created", table_name="analysis_jobs")
+    op.drop_column("analysis_jobs", "claimed_at")
+    op.drop_column("analysis_jobs", "claimed_by")
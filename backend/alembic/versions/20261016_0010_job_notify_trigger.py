@@ -0,0 +1,55 @@
+"""notify workers when an analysis job becomes claimable
+
+Revision ID: 20261016_0010
+Revises: 20261016_0009
+Create Date: 2026-10-16 10:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "20261016_0010"
+down_revision: Union[str, None] = "20261016_0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NOTIFY is transactional: the payload is delivered only when the inserting/updating
+    # transaction commits, so a woken worker always sees the committed row.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION devlens_analysis_jobs_notify()
+        RETURNS trigger AS $$
+        BEGIN
+            IF NEW.status IN ('queued', 'parsing', 'embedding', 'analyzing')
+               AND NEW.claimed_by IS NULL
+               AND (NEW.next_retry_at IS NULL OR NEW.next_retry_at <= NOW())
+               AND (
+                   TG_OP = 'INSERT'
+                   OR OLD.status IS DISTINCT FROM NEW.status
+                   OR OLD.claimed_by IS DISTINCT FROM NEW.claimed_by
+               ) THEN
+                PERFORM pg_notify('devlens_jobs', NEW.status);
+            END IF;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        DROP TRIGGER IF EXISTS trg_analysis_jobs_notify ON analysis_jobs;
+        CREATE TRIGGER trg_analysis_jobs_notify
+        AFTER INSERT OR UPDATE OF status, claimed_by ON analysis_jobs
+        FOR EACH ROW
+        EXECUTE FUNCTION devlens_analysis_jobs_notify();
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_analysis_jobs_notify ON analysis_jobs;")
+    op.execute("DROP FUNCTION IF EXISTS devlens_analysis_jobs_notify();")
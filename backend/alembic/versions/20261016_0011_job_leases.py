@@ -0,0 +1,35 @@
+"""add lease expiry to analysis_jobs for orphaned-stage recovery
+
+Revision ID: 20261016_0011
+Revises: 20261016_0010
+Create Date: 2026-10-16 11:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20261016_0011"
+down_revision: Union[str, None] = "20261016_0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("analysis_jobs", sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("idx_analysis_jobs_lease", "analysis_jobs", ["status", "lease_expires_at"])
+    # Claims taken before leases existed get a grace window instead of never expiring.
+    op.execute(
+        """
+        UPDATE analysis_jobs
+        SET lease_expires_at = claimed_at + INTERVAL '10 minutes'
+        WHERE claimed_by IS NOT NULL AND lease_expires_at IS NULL;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_analysis_jobs_lease", table_name="analysis_jobs")
+    op.drop_column("analysis_jobs", "lease_expires_at")
@@ -0,0 +1,45 @@
+"""persist file-level import edges per indexed commit
+
+Revision ID: 20261016_0013
+Revises: 20261016_0012
+Create Date: 2026-10-16 12:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "20261016_0013"
+down_revision: Union[str, None] = "20261016_0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "file_dependencies",
+        sa.Column("repo_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("commit_sha", sa.String(length=64), nullable=False),
+        sa.Column("source_path", sa.Text(), nullable=False),
+        sa.Column("target_path", sa.Text(), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.ForeignKeyConstraint(["repo_id"], ["repositories.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("repo_id", "commit_sha", "source_path", "target_path"),
+    )
+    # Reverse lookups (who imports X) for blast radius.
+    op.create_index(
+        "idx_file_dependencies_target",
+        "file_dependencies",
+        ["repo_id", "commit_sha", "target_path"],
+    )
+    # Commit whose edges file_dependencies holds; NULL until the worker first writes them.
+    op.add_column("repositories", sa.Column("dependencies_commit_sha", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("repositories", "dependencies_commit_sha")
+    op.drop_index("idx_file_dependencies_target", table_name="file_dependencies")
+    op.drop_table("file_dependencies")
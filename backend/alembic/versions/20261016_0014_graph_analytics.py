@@ -0,0 +1,29 @@
+"""store import-graph analytics with each analysis result
+
+Revision ID: 20261016_0014
+Revises: 20261016_0013
+Create Date: 2026-10-16 12:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "20261016_0014"
+down_revision: Union[str, None] = "20261016_0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "analysis_results",
+        sa.Column("graph_analytics", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("analysis_results", "graph_analytics")
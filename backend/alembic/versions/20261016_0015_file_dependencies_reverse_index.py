@@ -0,0 +1,36 @@
+"""cover reverse import lookups (target -> importers) with an index-only scan
+
+Revision ID: 20261016_0015
+Revises: 20261016_0014
+Create Date: 2026-10-16 12:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "20261016_0015"
+down_revision: Union[str, None] = "20261016_0014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Blast radius walks importers level by level; carrying source_path in the index answers each
+    # level without touching the heap.
+    op.create_index(
+        "idx_file_dependencies_reverse",
+        "file_dependencies",
+        ["repo_id", "commit_sha", "target_path", "source_path"],
+    )
+    op.drop_index("idx_file_dependencies_target", table_name="file_dependencies")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "idx_file_dependencies_target",
+        "file_dependencies",
+        ["repo_id", "commit_sha", "target_path"],
+    )
+    op.drop_index("idx_file_dependencies_reverse", table_name="file_dependencies")
@@ -0,0 +1,25 @@
+"""track which chunker configuration a repository's code_chunks were built with
+
+Revision ID: 20261016_0016
+Revises: 20261016_0015
+Create Date: 2026-10-16 23:30:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20261016_0016"
+down_revision: Union[str, None] = "20261016_0015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("repositories", sa.Column("indexed_chunker_fingerprint", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("repositories", "indexed_chunker_fingerprint")
@@ -505,20 +505,34 @@ def _snippet_fallback_text(db: Session, repo_id: UUID, top: list[dict], refs: li
 
 
 def _build_suggested_questions(db: Session, repo_id: UUID, limit: int) -> list[str]:
-    file_rows = db.execute(
-        select(CodeChunk.file_path)
-        .where(CodeChunk.repo_id == repo_id)
-        .distinct()
-        .order_by(CodeChunk.file_path.asc())
-        .limit(3)
-    ).all()
-    files = [row[0] for row in file_rows if row and row[0]]
+    analytics = db.execute(
+        select(AnalysisResult.graph_analytics)
+        .where(AnalysisResult.repo_id == repo_id, AnalysisResult.graph_analytics.is_not(None))
+        .order_by(AnalysisResult.created_at.desc())
+        .limit(1)
+    ).scalar_one_or_none() or {}
+
+    # Prefer the most central modules of the import graph; fall back to the first indexed files.
+    files = [entry["file_path"] for entry in (analytics.get("top_central") or [])[:3]]
+    if not files:
+        file_rows = db.execute(
+            select(CodeChunk.file_path)
+            .where(CodeChunk.repo_id == repo_id)
+            .distinct()
+            .order_by(CodeChunk.file_path.asc())
+            .limit(3)
+        ).all()
+        files = [row[0] for row in file_rows if row and row[0]]
 
     suggestions = [
         "What are the main architecture components in this repository?",
         "Where is authentication and token handling implemented?",
         "Which files show the core business logic flow?",
     ]
+    cycles = analytics.get("cycles") or []
+    if cycles:
+        members = ", ".join(f"`{path}`" for path in cycles[0][:3])
+        suggestions.append(f"Why do {members} import each other, and how could the cycle be broken?")
     for path in files:
         suggestions.append(f"Explain the responsibilities of `{path}`.")
     return suggestions[: max(1, min(limit, 10))]
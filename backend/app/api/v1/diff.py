@@ -11,7 +11,7 @@ from sqlalchemy.orm import Session
 from app.api.error_schema import ERROR_RESPONSE_SCHEMA
 from app.db.models import CommitDiff, Repository, User
 from app.deps import get_current_user, get_db_session
-from app.services.blast_radius import compute_blast_radius
+from app.services.blast_radius import blast_radius_from_index, compute_blast_radius
 from app.services.chat_synthesizer import ChatSynthesisError, synthesize_grounded_answer_stream
 
 router = APIRouter(prefix="/repos", tags=["diff"])
@@ -104,7 +104,10 @@ def get_commit_diff(
 
     changed_files = diff.changed_files or []
     changed_paths = [entry.get("path") for entry in changed_files if entry.get("path")]
-    blast = compute_blast_radius(_load_file_chunks(db, repo_id), changed_paths)
+    if repo.dependencies_commit_sha:
+        blast = blast_radius_from_index(db, str(repo_id), repo.dependencies_commit_sha, changed_paths)
+    else:
+        blast = compute_blast_radius(_load_file_chunks(db, repo_id), changed_paths)
 
     return {
         "repo_id": str(repo_id),
@@ -1,10 +1,11 @@
 import asyncio
 import json
 import time
+from typing import Literal
 from uuid import UUID
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
 from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import select
@@ -14,9 +15,15 @@ from app.db.models import AnalysisJob, AnalysisResult, CodeChunk, Repository
 from app.api.error_schema import ERROR_RESPONSE_SCHEMA
 from app.deps import get_db_session
 from app.db.session import SessionLocal
-from app.services.dependency_graph import build_dependency_graph
+from app.services.dependency_graph import (
+    InvalidCursor,
+    build_dependency_graph,
+    load_dependency_graph,
+    query_dependency_subgraph,
+)
 from app.services.github_repos import resolve_public_repo_snapshot
 from app.services.retrieval_hybrid import hybrid_search_chunks
+from app.services.search_cache import cached_search
 from app.services.retrieval_lexical import lexical_search_chunks
 from app.observability import observe_sse_startup, trace_span
 
@@ -115,6 +122,7 @@ class DependencyNode(BaseModel):
     id: str
     label: str
     file_path: str
+    depth: int | None = None
 
 
 class DependencyEdge(BaseModel):
@@ -134,6 +142,25 @@ class DependencyGraphResponse(BaseModel):
     nodes: list[DependencyNode]
     edges: list[DependencyEdge]
     stats: DependencyGraphStats
+    next_cursor: str | None = None
+
+
+class GraphRankEntry(BaseModel):
+    file_path: str
+    value: float
+
+
+class GraphAnalyticsResponse(BaseModel):
+    repo_id: str
+    commit_sha: str | None
+    node_count: int
+    edge_count: int
+    cycle_count: int
+    files_in_cycles: int
+    cycles: list[list[str]]
+    top_fan_in: list[GraphRankEntry]
+    top_fan_out: list[GraphRankEntry]
+    top_central: list[GraphRankEntry]
 
 
 def _fetch_latest_job(db: Session, repo_id: UUID) -> AnalysisJob | None:
@@ -338,7 +365,9 @@ def search_repo_lexical(repo_id: UUID, q: str, limit: int = 20, db: Session = De
     if repo is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Repository not found")
 
-    results = lexical_search_chunks(db, repo_id=repo_id, query=q, limit=limit)
+    results = cached_search(
+        db, repo_id, "lexical", q, limit, lambda: (lexical_search_chunks(db, repo_id=repo_id, query=q, limit=limit), True)
+    )
     return LexicalSearchResponse(repo_id=str(repo_id), query=q, total=len(results), results=results)
 
 
@@ -439,27 +468,82 @@ def get_repo_dashboard(repo_id: UUID, db: Session = Depends(get_db_session)) ->
     response_model=DependencyGraphResponse,
     summary="Repository dependency graph",
     description=(
-        "Builds a module dependency graph from analyzed code chunks. "
-        "Edges represent import/require relationships resolved to files within the same repository snapshot."
+        "Module dependency graph of the indexed commit, as persisted by the analysis worker. "
+        "Edges represent import/require relationships resolved to files within the same repository snapshot. "
+        "Pass `root` (with `direction` and `depth`) for a file's neighborhood, `path_prefix` to restrict to a "
+        "directory, and `limit`/`cursor` to page through nodes; each page carries its nodes' outgoing edges."
     ),
     responses={
+        400: {
+            "description": "Malformed cursor",
+            "content": {"application/json": {"schema": ERROR_RESPONSE_SCHEMA}},
+        },
         404: {
-            "description": "Repository not found",
+            "description": "Repository or root file not found",
+            "content": {"application/json": {"schema": ERROR_RESPONSE_SCHEMA}},
+        },
+        409: {
+            "description": "Filters requested before the repository's graph was indexed",
             "content": {"application/json": {"schema": ERROR_RESPONSE_SCHEMA}},
         },
     },
 )
-def get_dependency_graph(repo_id: UUID, db: Session = Depends(get_db_session)) -> DependencyGraphResponse:
+def get_dependency_graph(
+    repo_id: UUID,
+    root: str | None = Query(default=None, description="File path whose neighborhood to return"),
+    direction: Literal["imports", "importers", "both"] = Query(default="both"),
+    depth: int = Query(default=1, ge=1, le=10),
+    path_prefix: str | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=5000),
+    db: Session = Depends(get_db_session),
+) -> DependencyGraphResponse:
     repo = db.execute(select(Repository).where(Repository.id == repo_id)).scalar_one_or_none()
     if repo is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Repository not found")
 
-    rows = db.execute(
-        select(CodeChunk.file_path, CodeChunk.content)
-        .where(CodeChunk.repo_id == repo_id)
-        .order_by(CodeChunk.created_at.asc())
-    ).all()
-    graph = build_dependency_graph([{"file_path": row[0], "content": row[1]} for row in rows])
+    if root or path_prefix or cursor or limit:
+        if not repo.dependencies_commit_sha:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Dependency graph is not indexed yet; re-analyze the repository to enable filtering",
+            )
+        if root:
+            known = db.execute(
+                select(CodeChunk.id).where(CodeChunk.repo_id == repo_id, CodeChunk.file_path == root).limit(1)
+            ).first()
+            if known is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found in dependency graph")
+        try:
+            graph = query_dependency_subgraph(
+                db,
+                repo,
+                root=root,
+                direction=direction,
+                depth=depth,
+                path_prefix=path_prefix,
+                cursor=cursor,
+                limit=limit,
+            )
+        except InvalidCursor as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        return DependencyGraphResponse(
+            repo_id=str(repo_id),
+            nodes=[DependencyNode(**node) for node in graph["nodes"]],
+            edges=[DependencyEdge(**edge) for edge in graph["edges"]],
+            stats=DependencyGraphStats(**graph["stats"]),
+            next_cursor=graph["next_cursor"],
+        )
+
+    graph = load_dependency_graph(db, repo)
+    if graph is None:
+        # Indexed before edges were persisted; derive them from chunk content once more.
+        rows = db.execute(
+            select(CodeChunk.file_path, CodeChunk.content)
+            .where(CodeChunk.repo_id == repo_id)
+            .order_by(CodeChunk.created_at.asc())
+        ).all()
+        graph = build_dependency_graph([{"file_path": row[0], "content": row[1]} for row in rows])
 
     return DependencyGraphResponse(
         repo_id=str(repo_id),
@@ -469,6 +553,39 @@ def get_dependency_graph(repo_id: UUID, db: Session = Depends(get_db_session)) -
     )
 
 
+@router.get(
+    "/{repo_id}/graph-analytics",
+    response_model=GraphAnalyticsResponse,
+    summary="Import graph analytics",
+    description=(
+        "Import cycles (strongly connected components), fan-in/fan-out and PageRank centrality of the "
+        "indexed commit's dependency graph, precomputed by the analysis worker. Rankings hold the top files only."
+    ),
+    responses={
+        404: {
+            "description": "Repository not found or not analyzed yet",
+            "content": {"application/json": {"schema": ERROR_RESPONSE_SCHEMA}},
+        },
+    },
+)
+def get_graph_analytics(repo_id: UUID, db: Session = Depends(get_db_session)) -> GraphAnalyticsResponse:
+    repo = db.execute(select(Repository).where(Repository.id == repo_id)).scalar_one_or_none()
+    if repo is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Repository not found")
+
+    analytics = db.execute(
+        select(AnalysisResult.graph_analytics)
+        .where(AnalysisResult.repo_id == repo_id, AnalysisResult.graph_analytics.is_not(None))
+        .order_by(AnalysisResult.created_at.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+    if analytics is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph analytics not available for this repository")
+
+    # The commit the worker computed these metrics from; results written before it was stored have none.
+    return GraphAnalyticsResponse(repo_id=str(repo_id), **{"commit_sha": None, **analytics})
+
+
 @router.get(
     "/{repo_id}/status",
     summary="Stream repository analysis status (SSE)",
@@ -16,6 +16,9 @@ class Settings(BaseSettings):
     embed_model: str = "nvidia/nv-embedqa-e5-v5"
     embed_vector_size: int = 1024
     embed_timeout_seconds: int = 15
+    # Query embedding cache: in-process LRU in front of Redis, keyed by model + normalized query.
+    query_embed_cache_local_entries: int = 1024  # 0 disables the in-process tier
+    query_embed_cache_ttl_seconds: int = 86400  # Redis tier; 0 disables it
     github_client_id: str
     github_client_secret: str
     github_oauth_redirect_uri: AnyHttpUrl
@@ -44,6 +47,26 @@ class Settings(BaseSettings):
     reranker_enabled: bool = True
     reranker_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
     reranker_candidate_limit: int = 50
+    # Shared pooled HTTP clients (app/http_clients.py), one pool per upstream.
+    http_client_timeout_seconds: float = 10.0
+    http_client_max_connections: int = 20
+    # Streamed chat answers hold a connection each; this caps concurrent streams per provider.
+    http_client_stream_max_connections: int = 100
+    http_client_max_keepalive_connections: int = 10
+    http_client_keepalive_expiry_seconds: float = 30.0
+    http_client_http2: bool = False  # needs the h2 package (httpx[http2])
+    # Hybrid search runs lexical (Postgres) and embed+dense (NIM, Qdrant) concurrently; a branch
+    # that misses its budget is dropped and the request is served from the other signal.
+    hybrid_lexical_timeout_seconds: float = 5.0
+    hybrid_dense_timeout_seconds: float = 8.0
+    hybrid_dense_workers: int = 8
+    # Search result cache, scoped to the indexed commit + latest finished analysis; 0 disables.
+    search_cache_ttl_seconds: int = 3600
+    # Identical concurrent searches/embeddings/reranks share one computation (app/single_flight.py);
+    # the Redis lock extends that across backend processes.
+    single_flight_redis_lock: bool = False
+    single_flight_lock_ttl_seconds: float = 30.0
+    single_flight_wait_seconds: float = 10.0
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
 
@@ -31,6 +31,9 @@ class Repository(Base):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     default_branch: Mapped[str] = mapped_column(String(255), server_default="main")
     latest_commit_sha: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    indexed_commit_sha: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    indexed_chunker_fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    dependencies_commit_sha: Mapped[str | None] = mapped_column(String(64), nullable=True)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     stars: Mapped[int | None] = mapped_column(Integer, nullable=True)
     forks: Mapped[int | None] = mapped_column(Integer, nullable=True)
@@ -53,6 +56,9 @@ class AnalysisJob(Base):
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
     retry_count: Mapped[int] = mapped_column(Integer, server_default="0")
     next_retry_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    claimed_by: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
@@ -69,6 +75,7 @@ class AnalysisResult(Base):
     contributor_stats: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     tech_debt_flags: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     file_tree: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    graph_analytics: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     cache_key: Mapped[str | None] = mapped_column(String(512), unique=True, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
@@ -169,3 +176,13 @@ class CommitDiff(Base):
     changed_files: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     security_flags: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class FileDependency(Base):
+    __tablename__ = "file_dependencies"
+
+    repo_id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), ForeignKey("repositories.id", ondelete="CASCADE"), primary_key=True)
+    commit_sha: Mapped[str] = mapped_column(String(64), primary_key=True)
+    source_path: Mapped[str] = mapped_column(Text, primary_key=True)
+    target_path: Mapped[str] = mapped_column(Text, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
@@ -2,16 +2,16 @@ from urllib.parse import urlparse
 import socket
 import time
 
-import httpx
 from fastapi import FastAPI
 from starlette.requests import Request
 
 from app.api.v1 import api_router
 from app.config import settings
 from app.errors import install_exception_handlers
+from app.http_clients import close_http_clients, get_http_client
 from app.middleware.rate_limit import RateLimitMiddleware
 from app.observability import begin_trace, http_request_duration_seconds, metrics_response, trace_span
-from app.redis_client import close_redis
+from app.redis_client import close_redis, close_sync_redis
 
 app = FastAPI(title=settings.app_name)
 app.add_middleware(RateLimitMiddleware)
@@ -22,6 +22,8 @@ install_exception_handlers(app)
 @app.on_event("shutdown")
 async def _close_shared_clients() -> None:
     await close_redis()
+    close_sync_redis()
+    close_http_clients()
 
 
 @app.middleware("http")
@@ -67,9 +69,8 @@ def health_deps() -> dict:
     try:
         qdrant_health_url = f"{str(settings.qdrant_url).rstrip('/')}/healthz"
         headers = {"api-key": settings.qdrant_api_key} if settings.qdrant_api_key else None
-        with httpx.Client(timeout=3.0) as client:
-            response = client.get(qdrant_health_url, headers=headers)
-            qdrant_ok = response.status_code == 200
+        response = get_http_client("qdrant").get(qdrant_health_url, headers=headers, timeout=3.0)
+        qdrant_ok = response.status_code == 200
     except Exception:
         qdrant_ok = False
 
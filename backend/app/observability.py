@@ -4,7 +4,7 @@ import logging
 import time
 from uuid import uuid4
 
-from prometheus_client import CONTENT_TYPE_LATEST, Histogram, generate_latest
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
 from starlette.requests import Request
 from starlette.responses import Response
 
@@ -23,12 +23,48 @@ sse_startup_latency_seconds = Histogram(
     "Latency until first SSE event is emitted.",
     ["endpoint"],
 )
+query_embedding_cache_total = Counter(
+    "devlens_query_embedding_cache_total",
+    "Query embedding cache lookups by result (local_hit, redis_hit, miss).",
+    ["result"],
+)
+search_cache_total = Counter(
+    "devlens_search_cache_total",
+    "Search result cache lookups by search kind and result (hit, miss, bypass).",
+    ["kind", "result"],
+)
+single_flight_calls_total = Counter(
+    "devlens_single_flight_calls_total",
+    "Coalesced calls by operation and role (leader, follower, remote_wait).",
+    ["name", "role"],
+)
+retrieval_branch_fallbacks_total = Counter(
+    "devlens_retrieval_branch_fallbacks_total",
+    "Hybrid retrieval branches dropped, by branch and reason.",
+    ["branch", "reason"],
+)
 
 
 def observe_sse_startup(endpoint: str, seconds: float) -> None:
     sse_startup_latency_seconds.labels(endpoint=endpoint).observe(max(seconds, 0.0))
 
 
+def record_query_embedding_cache(result: str) -> None:
+    query_embedding_cache_total.labels(result=result).inc()
+
+
+def record_search_cache(kind: str, result: str) -> None:
+    search_cache_total.labels(kind=kind, result=result).inc()
+
+
+def record_single_flight(name: str, role: str) -> None:
+    single_flight_calls_total.labels(name=name, role=role).inc()
+
+
+def record_retrieval_fallback(branch: str, reason: str) -> None:
+    retrieval_branch_fallbacks_total.labels(branch=branch, reason=reason).inc()
+
+
 def metrics_response() -> Response:
     return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
@@ -8,16 +8,23 @@ An async Redis client is bound to the event loop it first ran on. The app serves
 loop in production, but tests (and any multi-loop caller) can run on different loops, so
 the client is cached per running loop and recreated when the loop changes. Without this,
 a loop mismatch raises and the middleware fails open, silently disabling rate limiting.
+
+Sync code paths (retrieval runs in FastAPI's threadpool and the hybrid dense pool) use a
+separate, thread-safe sync client that keeps raw bytes for binary cache values.
 """
 
 import asyncio
+import threading
 
+import redis
 from redis.asyncio import Redis
 
 from app.config import settings
 
 _client: Redis | None = None
 _client_loop: asyncio.AbstractEventLoop | None = None
+_sync_client: redis.Redis | None = None
+_sync_lock = threading.Lock()
 
 
 def get_redis() -> Redis:
@@ -32,6 +39,25 @@ def get_redis() -> Redis:
     return _client
 
 
+def get_sync_redis() -> redis.Redis:
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is None:
+            # Short socket timeouts: callers treat Redis as a best-effort cache in front of slower work.
+            _sync_client = redis.Redis.from_url(
+                settings.redis_url, decode_responses=False, socket_connect_timeout=1.0, socket_timeout=1.0
+            )
+        return _sync_client
+
+
+def close_sync_redis() -> None:
+    global _sync_client
+    with _sync_lock:
+        client, _sync_client = _sync_client, None
+    if client is not None:
+        client.close()
+
+
 async def close_redis() -> None:
     global _client, _client_loop
     if _client is not None:
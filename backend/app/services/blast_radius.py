@@ -1,38 +1,118 @@
 """Blast-radius analysis: which files are impacted by a set of changed files.
 
-Reuses the import graph from dependency_graph. An edge (source -> target) means source imports
-target, so the files impacted by a change to X are the transitive importers of X.
+An edge (source -> target) means source imports target, so the files impacted by a change to X
+are the transitive importers of X. Each impacted file carries its distance: the fewest import
+hops between it and a changed file, so clients can rank direct importers first.
+
+Repos with persisted edges are answered from the reverse adjacency index on file_dependencies
+(target -> importers), one index-only lookup per BFS level. Older repos fall back to rebuilding
+the graph from chunk content.
 """
 
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
 from app.services.dependency_graph import build_dependency_graph
 
+INDEX_STATS_SQL = text(
+    """
+    SELECT
+        (SELECT COUNT(DISTINCT file_path) FROM code_chunks WHERE repo_id = CAST(:repo_id AS uuid)) AS files_considered,
+        (
+            SELECT COUNT(*)
+            FROM file_dependencies
+            WHERE repo_id = CAST(:repo_id AS uuid) AND commit_sha = :commit_sha
+        ) AS edges_detected
+    """
+)
+
+IMPORTERS_SQL = text(
+    """
+    SELECT target_path, source_path
+    FROM file_dependencies
+    WHERE repo_id = CAST(:repo_id AS uuid)
+      AND commit_sha = :commit_sha
+      AND target_path = ANY(:targets)
+    """
+)
+
+
+def _normalize(changed_paths: list[str]) -> set[str]:
+    return {str(path).replace("\\", "/") for path in changed_paths if path}
+
+
+def _bfs_importers(changed: set[str], importers_of) -> dict[str, int]:
+    """Level-order walk over reverse edges; importers_of(frontier) -> iterable of importer paths."""
+    distances: dict[str, int] = {path: 0 for path in changed}
+    frontier = sorted(changed)
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = set()
+        for importer in importers_of(frontier):
+            if importer not in distances:
+                distances[importer] = distance
+                next_frontier.add(importer)
+        frontier = sorted(next_frontier)
+    return distances
+
+
+def _graph_stats(files_considered: int, edges_detected: int, commit_sha: str | None) -> dict:
+    """Same shape from both paths; commit_sha is None when the graph was rebuilt from chunks."""
+    return {"files_considered": files_considered, "edges_detected": edges_detected, "commit_sha": commit_sha}
+
+
+def _result(changed: set[str], distances: dict[str, int], graph_stats: dict) -> dict:
+    impacted = sorted(
+        ((distance, path) for path, distance in distances.items() if path not in changed),
+    )
+    return {
+        "changed_files": sorted(changed),
+        "impacted_files": [path for _distance, path in impacted],
+        "impacted": [{"file_path": path, "distance": distance} for distance, path in impacted],
+        "impacted_count": len(impacted),
+        "max_distance": impacted[-1][0] if impacted else 0,
+        "graph_stats": graph_stats,
+    }
+
 
 def compute_blast_radius(file_chunks: list[dict], changed_paths: list[str]) -> dict:
-    graph = build_dependency_graph(file_chunks)
+    return blast_radius_from_graph(build_dependency_graph(file_chunks), changed_paths)
 
+
+def blast_radius_from_graph(graph: dict, changed_paths: list[str]) -> dict:
     # target -> set of files that import it (reverse edges).
     importers: dict[str, set[str]] = {}
     for edge in graph["edges"]:
         importers.setdefault(edge["target"], set()).add(edge["source"])
 
-    changed = {str(path).replace("\\", "/") for path in changed_paths if path}
-    impacted: set[str] = set()
-    seen: set[str] = set(changed)
-    queue: list[str] = list(changed)
-
-    while queue:
-        node = queue.pop()
-        for importer in importers.get(node, set()):
-            if importer in seen:
-                continue
-            seen.add(importer)
-            if importer not in changed:
-                impacted.add(importer)
-            queue.append(importer)
+    def importers_of(frontier: list[str]):
+        for node in frontier:
+            yield from importers.get(node, ())
 
-    return {
-        "changed_files": sorted(changed),
-        "impacted_files": sorted(impacted),
-        "impacted_count": len(impacted),
-        "graph_stats": graph.get("stats", {}),
-    }
+    changed = _normalize(changed_paths)
+    stats = graph.get("stats", {})
+    graph_stats = _graph_stats(
+        int(stats.get("files_considered", len(graph.get("nodes", [])))),
+        int(stats.get("edges_detected", len(graph["edges"]))),
+        None,
+    )
+    return _result(changed, _bfs_importers(changed, importers_of), graph_stats)
+
+
+def blast_radius_from_index(db: Session, repo_id: str, commit_sha: str, changed_paths: list[str]) -> dict:
+    """Blast radius straight from file_dependencies; cost scales with the impacted set, not the repo."""
+    params = {"repo_id": repo_id, "commit_sha": commit_sha}
+
+    def importers_of(frontier: list[str]):
+        rows = db.execute(IMPORTERS_SQL, {**params, "targets": frontier}).all()
+        return (row[1] for row in rows)
+
+    changed = _normalize(changed_paths)
+    counts = db.execute(INDEX_STATS_SQL, params).mappings().first() or {}
+    graph_stats = _graph_stats(
+        int(counts.get("files_considered") or 0),
+        int(counts.get("edges_detected") or 0),
+        commit_sha,
+    )
+    return _result(changed, _bfs_importers(changed, importers_of), graph_stats)
@@ -4,6 +4,7 @@ from typing import Literal
 import httpx
 
 from app.config import settings
+from app.http_clients import get_stream_http_client
 
 
 class ChatSynthesisError(RuntimeError):
@@ -69,6 +70,13 @@ def _system_prompt(mode: Literal["answer", "summary"], intent: ChatIntent) -> st
     return system_prompt
 
 
+def _upstream(provider: str) -> str:
+    # Nemotron is served by NIM, so its streams use the "nim-stream" pool, kept apart from the
+    # "nim" pool that query embeddings use (see get_stream_http_client).
+    p = provider.strip().lower()
+    return "nim" if p in ("nemotron", "nim") else p
+
+
 def _max_tokens(mode: Literal["answer", "summary"], intent: ChatIntent) -> int:
     # Architecture/debug answers and summaries need more room than a short factual reply.
     if mode == "summary":
@@ -115,25 +123,25 @@ def _iter_provider_tokens(
     """Yield content tokens from a provider's streaming chat completion (SSE)."""
     url, headers, body, timeout = _build_request(provider, prompt, mode, intent, stream=True)
     try:
-        with httpx.Client(timeout=timeout) as client:
-            with client.stream("POST", url, headers=headers, json=body) as response:
-                if response.status_code != 200:
-                    response.read()
-                    raise ChatSynthesisError(f"{provider} returned status {response.status_code}")
-                for line in response.iter_lines():
-                    if not line or not line.startswith("data:"):
-                        continue
-                    data = line[len("data:"):].strip()
-                    if data == "[DONE]":
-                        break
-                    try:
-                        chunk = json.loads(data)
-                    except json.JSONDecodeError:
-                        continue
-                    delta = (chunk.get("choices", [{}])[0] or {}).get("delta", {}) or {}
-                    piece = delta.get("content")
-                    if piece:
-                        yield piece
+        client = get_stream_http_client(_upstream(provider))
+        with client.stream("POST", url, headers=headers, json=body, timeout=timeout) as response:
+            if response.status_code != 200:
+                response.read()
+                raise ChatSynthesisError(f"{provider} returned status {response.status_code}")
+            for line in response.iter_lines():
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    chunk = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+                delta = (chunk.get("choices", [{}])[0] or {}).get("delta", {}) or {}
+                piece = delta.get("content")
+                if piece:
+                    yield piece
     except httpx.TimeoutException as exc:
         raise ChatSynthesisError(f"{provider} timeout: {exc}") from exc
     except httpx.TransportError as exc:
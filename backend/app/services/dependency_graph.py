@@ -1,7 +1,14 @@
+import base64
+import binascii
 import os
 import posixpath
 import re
 
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.db.models import CodeChunk, FileDependency, Repository
+
 PY_IMPORT_RE = re.compile(r"^\s*import\s+([^\n#]+)", re.MULTILINE)
 PY_FROM_IMPORT_RE = re.compile(r"^\s*from\s+([a-zA-Z0-9_\.]+)\s+import\s+", re.MULTILINE)
 JS_IMPORT_RE = re.compile(r"""(?:import|export)\s+(?:[^'"]+?\s+from\s+)?['"]([^'"]+)['"]""")
@@ -72,7 +79,6 @@ def build_dependency_graph(file_chunks: list[dict]) -> dict:
         file_to_content.setdefault(file_path, []).append(content)
 
     files = set(file_to_content.keys())
-    nodes = [{"id": path, "label": os.path.basename(path), "file_path": path} for path in sorted(files)]
     edge_set: set[tuple[str, str, str]] = set()
 
     for file_path, chunks in file_to_content.items():
@@ -98,9 +104,14 @@ def build_dependency_graph(file_chunks: list[dict]) -> dict:
                 if target and target != file_path:
                     edge_set.add((file_path, target, "javascript"))
 
+    return graph_from_edges(sorted(files), sorted(edge_set))
+
+
+def graph_from_edges(files: list[str], edge_rows: list[tuple[str, str, str]]) -> dict:
+    nodes = [{"id": path, "label": os.path.basename(path), "file_path": path} for path in files]
     edges = [
         {"id": f"{src}->{dst}", "source": src, "target": dst, "kind": kind}
-        for src, dst, kind in sorted(edge_set)
+        for src, dst, kind in edge_rows
     ]
 
     return {
@@ -111,3 +122,139 @@ def build_dependency_graph(file_chunks: list[dict]) -> dict:
             "edges_detected": len(edges),
         },
     }
+
+
+def load_dependency_graph(db: Session, repo: Repository) -> dict | None:
+    """Graph the worker persisted for the repo's indexed commit; None until one has been written."""
+    if not repo.dependencies_commit_sha:
+        return None
+    files = db.execute(
+        select(CodeChunk.file_path).where(CodeChunk.repo_id == repo.id).distinct().order_by(CodeChunk.file_path)
+    ).scalars().all()
+    edge_rows = db.execute(
+        select(FileDependency.source_path, FileDependency.target_path, FileDependency.kind)
+        .where(
+            FileDependency.repo_id == repo.id,
+            FileDependency.commit_sha == repo.dependencies_commit_sha,
+        )
+        .order_by(FileDependency.source_path, FileDependency.target_path)
+    ).all()
+    return graph_from_edges(list(files), [tuple(row) for row in edge_rows])
+
+
+# Breadth-first reach from :root over the indexed adjacency, one join per hop: forward hops
+# use the primary key (repo_id, commit_sha, source_path), reverse hops idx_file_dependencies_reverse.
+NEIGHBORHOOD_SQL = text(
+    """
+    WITH RECURSIVE reach(file_path, depth) AS (
+        SELECT CAST(:root AS text), 0
+        UNION
+        SELECT CASE WHEN d.source_path = r.file_path THEN d.target_path ELSE d.source_path END, r.depth + 1
+        FROM reach r
+        JOIN file_dependencies d
+          ON d.repo_id = CAST(:repo_id AS uuid)
+         AND d.commit_sha = :commit_sha
+         AND ((:follow_imports AND d.source_path = r.file_path)
+              OR (:follow_importers AND d.target_path = r.file_path))
+        WHERE r.depth < :depth
+    )
+    SELECT file_path, MIN(depth) AS depth
+    FROM reach
+    GROUP BY file_path
+    """
+)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(file_path: str) -> str:
+    return base64.urlsafe_b64encode(file_path.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return base64.b64decode(cursor.encode("ascii"), altchars=b"-_", validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise InvalidCursor("Malformed cursor") from exc
+
+
+def query_dependency_subgraph(
+    db: Session,
+    repo: Repository,
+    *,
+    root: str | None = None,
+    direction: str = "both",
+    depth: int = 1,
+    path_prefix: str | None = None,
+    cursor: str | None = None,
+    limit: int | None = None,
+) -> dict:
+    """A filtered page of the persisted graph, answered from file_dependencies indexes.
+
+    Nodes are the root's neighborhood (within depth hops in direction) or every indexed file,
+    optionally restricted to path_prefix, ordered by path and paged with an opaque cursor.
+    Each page carries the outgoing edges of its nodes whose target is also in the subgraph,
+    so walking all pages yields every edge exactly once.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    depths: dict[str, int] | None = None
+
+    if root:
+        rows = db.execute(
+            NEIGHBORHOOD_SQL,
+            {
+                "repo_id": str(repo.id),
+                "commit_sha": repo.dependencies_commit_sha,
+                "root": root,
+                "depth": depth,
+                "follow_imports": direction in ("imports", "both"),
+                "follow_importers": direction in ("importers", "both"),
+            },
+        ).mappings().all()
+        depths = {row["file_path"]: int(row["depth"]) for row in rows}
+        candidates = sorted(
+            path
+            for path in depths
+            if (not path_prefix or path.startswith(path_prefix)) and (after is None or path > after)
+        )
+        page = candidates[: limit + 1] if limit else candidates
+    else:
+        query = select(CodeChunk.file_path).where(CodeChunk.repo_id == repo.id).distinct().order_by(CodeChunk.file_path)
+        if path_prefix:
+            query = query.where(CodeChunk.file_path.startswith(path_prefix, autoescape=True))
+        if after is not None:
+            query = query.where(CodeChunk.file_path > after)
+        if limit:
+            query = query.limit(limit + 1)
+        page = list(db.execute(query).scalars().all())
+
+    next_cursor = None
+    if limit and len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1])
+
+    edge_rows: list[tuple[str, str, str]] = []
+    if page:
+        edge_query = (
+            select(FileDependency.source_path, FileDependency.target_path, FileDependency.kind)
+            .where(
+                FileDependency.repo_id == repo.id,
+                FileDependency.commit_sha == repo.dependencies_commit_sha,
+                FileDependency.source_path.in_(page),
+            )
+            .order_by(FileDependency.source_path, FileDependency.target_path)
+        )
+        if path_prefix:
+            edge_query = edge_query.where(FileDependency.target_path.startswith(path_prefix, autoescape=True))
+        edge_rows = [tuple(row) for row in db.execute(edge_query).all()]
+        if depths is not None:
+            edge_rows = [row for row in edge_rows if row[1] in depths]
+
+    graph = graph_from_edges(page, edge_rows)
+    if depths is not None:
+        for node in graph["nodes"]:
+            node["depth"] = depths[node["id"]]
+    graph["next_cursor"] = next_cursor
+    return graph
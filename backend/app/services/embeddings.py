@@ -4,11 +4,33 @@ NIM retrieval embedders are asymmetric: pass input_type="query" for search queri
 and input_type="passage" for indexed documents. Both sides of the pipeline (this
 backend query path and the worker index path) must use the same model + dimension so
 vectors share one space.
+
+Query embeddings are cached in two tiers, keyed by model + normalized query text: an
+in-process LRU, then Redis (shared across backend replicas). Vectors are stored as packed
+float32 behind the same versioned header the worker's passage cache uses. Redis is
+best-effort; a cache error falls back to embedding directly.
 """
 
+import hashlib
+import logging
+import struct
+import threading
+import unicodedata
+from collections import OrderedDict
+
 import httpx
 
 from app.config import settings
+from app.http_clients import get_http_client
+from app.observability import record_query_embedding_cache
+from app.redis_client import get_sync_redis
+from app.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Header: magic, format version, struct dtype code; matches workers/embed_cache.py.
+_MAGIC = b"EV"
+_VERSION = 1
 
 
 class EmbeddingError(RuntimeError):
@@ -35,8 +57,9 @@ def _embed(texts: list[str], input_type: str) -> list[list[float]]:
     }
 
     try:
-        with httpx.Client(timeout=float(settings.embed_timeout_seconds)) as client:
-            response = client.post(url, headers=headers, json=body)
+        response = get_http_client("nim").post(
+            url, headers=headers, json=body, timeout=float(settings.embed_timeout_seconds)
+        )
     except httpx.TimeoutException as exc:
         raise EmbeddingError(f"NIM embeddings timeout: {exc}") from exc
     except httpx.TransportError as exc:
@@ -53,8 +76,116 @@ def _embed(texts: list[str], input_type: str) -> list[list[float]]:
     return [[float(x) for x in (item.get("embedding") or [])] for item in ordered]
 
 
+class _QueryLRU:
+    """Thread-safe LRU of packed query vectors; dense retrieval calls it from pool threads."""
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            raw = self._entries.get(key)
+            if raw is not None:
+                self._entries.move_to_end(key)
+            return raw
+
+    def put(self, key: str, raw: bytes, capacity: int) -> None:
+        if capacity <= 0:
+            return
+        with self._lock:
+            self._entries[key] = raw
+            self._entries.move_to_end(key)
+            while len(self._entries) > capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_query_cache = _QueryLRU()
+_query_flight = SingleFlight("embed_query")
+
+
+def normalize_query(text: str) -> str:
+    # Unicode NFC plus collapsed whitespace; case is kept, since the embedder is case-sensitive.
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def _query_cache_key(normalized: str) -> str:
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return f"qembedcache:{settings.embed_model}:{digest}"
+
+
+def encode_vector(vector: list[float]) -> bytes:
+    return _MAGIC + bytes((_VERSION, ord("f"))) + struct.pack(f"<{len(vector)}f", *vector)
+
+
+def decode_vector(raw: bytes) -> list[float]:
+    if raw[:2] != _MAGIC or raw[2] != _VERSION:
+        raise ValueError("unsupported embedding cache entry")
+    code = chr(raw[3])
+    width = struct.calcsize(f"<{code}")
+    return list(struct.unpack(f"<{(len(raw) - 4) // width}{code}", raw[4:]))
+
+
+def _redis_get(key: str) -> bytes | None:
+    if settings.query_embed_cache_ttl_seconds <= 0:
+        return None
+    try:
+        return get_sync_redis().get(key)
+    except Exception as exc:
+        logger.warning("Query embedding cache read failed: %s", exc)
+        return None
+
+
+def _redis_set(key: str, raw: bytes) -> None:
+    if settings.query_embed_cache_ttl_seconds <= 0:
+        return
+    try:
+        get_sync_redis().set(key, raw, ex=settings.query_embed_cache_ttl_seconds)
+    except Exception as exc:
+        logger.warning("Query embedding cache write failed: %s", exc)
+
+
+def _redis_vector(key: str, capacity: int) -> list[float] | None:
+    raw = _redis_get(key)
+    if raw is None:
+        return None
+    try:
+        vector = decode_vector(raw)
+    except (ValueError, struct.error):
+        return None
+    _query_cache.put(key, raw, capacity)
+    return vector
+
+
 def embed_query(text: str) -> list[float]:
-    return _embed([text], input_type="query")[0]
+    normalized = normalize_query(text)
+    key = _query_cache_key(normalized)
+    capacity = settings.query_embed_cache_local_entries
+
+    raw = _query_cache.get(key) if capacity > 0 else None
+    if raw is not None:
+        record_query_embedding_cache("local_hit")
+        return decode_vector(raw)
+
+    vector = _redis_vector(key, capacity)
+    if vector is not None:
+        record_query_embedding_cache("redis_hit")
+        return vector
+
+    def compute() -> list[float]:
+        record_query_embedding_cache("miss")
+        vector = _embed([normalized], input_type="query")[0]
+        raw = encode_vector(vector)
+        _query_cache.put(key, raw, capacity)
+        _redis_set(key, raw)
+        return vector
+
+    # Concurrent misses for the same query share one NIM call.
+    return _query_flight.do(key, compute, shared_lookup=lambda: _redis_vector(key, capacity))
 
 
 def embed_passages(texts: list[str]) -> list[list[float]]:
@@ -1,19 +1,34 @@
+import contextvars
+import hashlib
+import json
 import logging
 import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from uuid import UUID
 
-import httpx
 from fastapi import HTTPException, status
 from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.http_clients import get_http_client
+from app.observability import record_retrieval_fallback
+from app.single_flight import SingleFlight
 from app.services.embeddings import EmbeddingError, embed_query
 from app.services.reranker import RerankerUnavailable, rerank_candidates
 from app.services.retrieval_lexical import lexical_search_chunks
+from app.services.search_cache import cached_search
 
 logger = logging.getLogger(__name__)
 
+_dense_executor: ThreadPoolExecutor | None = None
+_dense_executor_lock = threading.Lock()
+_rerank_flight = SingleFlight("rerank")
+
 
 def dense_search_qdrant(repo_id: str, query: str, limit: int) -> list[dict]:
     if not repo_id:
@@ -33,8 +48,7 @@ def dense_search_qdrant(repo_id: str, query: str, limit: int) -> list[dict]:
     headers = {"api-key": settings.qdrant_api_key} if settings.qdrant_api_key else None
 
     try:
-        with httpx.Client(timeout=10.0) as client:
-            response = client.post(url, json=body, headers=headers)
+        response = get_http_client("qdrant").post(url, json=body, headers=headers, timeout=10.0)
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Qdrant request failed: {exc}") from exc
 
@@ -93,9 +107,10 @@ def _load_chunk_content(db: Session, repo_id: UUID, chunk_ids: list[str]) -> dic
     return {row["chunk_id"]: row.get("content") or "" for row in rows}
 
 
-def _apply_cross_encoder_rerank(db: Session, repo_id: UUID, query: str, rows: list[dict]) -> list[dict]:
+def _apply_cross_encoder_rerank(db: Session, repo_id: UUID, query: str, rows: list[dict]) -> tuple[list[dict], bool]:
+    """Returns (rows, reranked); reranked is False when the fused order was kept as a fallback."""
     if not rows:
-        return rows
+        return rows, True
     candidate_limit = max(1, min(settings.reranker_candidate_limit, len(rows)))
     candidates = rows[:candidate_limit]
     chunk_ids = [row["chunk_id"] for row in candidates]
@@ -109,20 +124,83 @@ def _apply_cross_encoder_rerank(db: Session, repo_id: UUID, query: str, rows: li
         }
         for row in candidates
     ]
+    flight_key = hashlib.sha256(
+        json.dumps(
+            [settings.reranker_model, query, [(row["chunk_id"], row["content"]) for row in rerank_input]],
+            separators=(",", ":"),
+        ).encode("utf-8")
+    ).hexdigest()
     try:
-        score_map = rerank_candidates(query=query, candidates=rerank_input, model_name=settings.reranker_model)
+        score_map = _rerank_flight.do(
+            flight_key,
+            lambda: rerank_candidates(query=query, candidates=rerank_input, model_name=settings.reranker_model),
+        )
     except RerankerUnavailable as exc:
         logger.warning("Cross-encoder reranker unavailable; using deterministic ranking: %s", exc)
-        return rows
+        return rows, False
     except Exception as exc:
         logger.warning("Cross-encoder reranker failed; using deterministic ranking: %s", exc)
-        return rows
+        return rows, False
     if not score_map:
-        return rows
+        return rows, False
     for row in rows:
         if row["chunk_id"] in score_map:
             row["rerank_score"] = round(score_map[row["chunk_id"]], 6)
-    return sorted(rows, key=lambda row: (-row["rerank_score"], row["chunk_id"]))
+    return sorted(rows, key=lambda row: (-row["rerank_score"], row["chunk_id"])), True
+
+
+def _get_dense_executor() -> ThreadPoolExecutor:
+    global _dense_executor
+    with _dense_executor_lock:
+        if _dense_executor is None:
+            _dense_executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.hybrid_dense_workers),
+                thread_name_prefix="hybrid-dense",
+            )
+        return _dense_executor
+
+
+def _submit_dense(repo_id: str, query: str, limit: int) -> Future:
+    # Copy the request context so the dense branch logs under the caller's trace id.
+    context = contextvars.copy_context()
+    return _get_dense_executor().submit(context.run, dense_search_qdrant, repo_id, query, limit)
+
+
+def _lexical_with_timeout(db: Session, repo_id: UUID, query: str, limit: int) -> list[dict] | None:
+    """Run the lexical branch on the caller's session under a Postgres statement_timeout.
+
+    The session is not thread-safe, so this branch stays on the request thread while the dense
+    branch runs in the pool. The timeout is set inside a savepoint: a cancelled statement rolls
+    the savepoint back (restoring the previous timeout) without aborting the outer transaction.
+    """
+    timeout_ms = max(1, int(settings.hybrid_lexical_timeout_seconds * 1000))
+    try:
+        with db.begin_nested():
+            previous = db.execute(text("SELECT current_setting('statement_timeout')")).scalar()
+            db.execute(text("SELECT set_config('statement_timeout', :value, true)"), {"value": f"{timeout_ms}ms"})
+            rows = lexical_search_chunks(db, repo_id=repo_id, query=query, limit=limit)
+            db.execute(text("SELECT set_config('statement_timeout', :value, true)"), {"value": previous})
+        return rows
+    except OperationalError as exc:
+        logger.warning("Lexical retrieval exceeded %sms; serving dense results only: %s", timeout_ms, exc)
+        record_retrieval_fallback("lexical", "timeout")
+        return None
+
+
+def _await_dense(future: Future, deadline: float) -> tuple[list[dict] | None, HTTPException | None]:
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic())), None
+    except FutureTimeoutError:
+        future.cancel()
+        logger.warning(
+            "Dense retrieval exceeded %ss; serving lexical results only", settings.hybrid_dense_timeout_seconds
+        )
+        record_retrieval_fallback("dense", "timeout")
+        return None, HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Dense retrieval timed out")
+    except HTTPException as exc:
+        logger.warning("Dense retrieval failed; serving lexical results only: %s", exc.detail)
+        record_retrieval_fallback("dense", "error")
+        return None, exc
 
 
 def hybrid_search_chunks(db: Session, repo_id: UUID, query: str, limit: int = 20) -> list[dict]:
@@ -130,9 +208,30 @@ def hybrid_search_chunks(db: Session, repo_id: UUID, query: str, limit: int = 20
     if not q:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Query must not be empty")
     safe_limit = max(1, min(limit, 100))
+    config = {
+        "reranker_enabled": settings.reranker_enabled,
+        "reranker_model": settings.reranker_model,
+        "reranker_candidate_limit": settings.reranker_candidate_limit,
+    }
+    return cached_search(
+        db, repo_id, "hybrid", q, safe_limit, lambda: _hybrid_search(db, repo_id, q, safe_limit), config=config
+    )
+
 
-    lexical = lexical_search_chunks(db, repo_id=repo_id, query=q, limit=safe_limit * 2)
-    dense = dense_search_qdrant(str(repo_id), q, safe_limit * 2)
+def _hybrid_search(db: Session, repo_id: UUID, q: str, safe_limit: int) -> tuple[list[dict], bool]:
+    """Returns (rows, complete); complete is False when a retrieval branch was dropped or the
+    cross-encoder fell back to the fused order, so degraded results are not cached."""
+    # Fan out: embed+dense in the pool, lexical on this thread. Latency is the slower branch,
+    # and a branch that times out or fails is dropped rather than failing the request.
+    deadline = time.monotonic() + settings.hybrid_dense_timeout_seconds
+    dense_future = _submit_dense(str(repo_id), q, safe_limit * 2)
+    lexical = _lexical_with_timeout(db, repo_id, q, safe_limit * 2)
+    dense, dense_error = _await_dense(dense_future, deadline)
+    if lexical is None and dense is None:
+        raise dense_error
+    complete = lexical is not None and dense is not None
+    lexical = lexical or []
+    dense = dense or []
 
     merged: dict[str, dict] = {}
     for item in lexical:
@@ -175,5 +274,6 @@ def hybrid_search_chunks(db: Session, repo_id: UUID, query: str, limit: int = 20
 
     ranked = sorted(merged.values(), key=lambda row: (-row["rerank_score"], row["chunk_id"]))
     if settings.reranker_enabled:
-        ranked = _apply_cross_encoder_rerank(db, repo_id=repo_id, query=q, rows=ranked)
-    return ranked[:safe_limit]
+        ranked, reranked = _apply_cross_encoder_rerank(db, repo_id=repo_id, query=q, rows=ranked)
+        complete = complete and reranked
+    return ranked[:safe_limit], complete
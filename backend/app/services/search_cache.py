@@ -0,0 +1,132 @@
+"""Commit-scoped cache for search results (lexical, hybrid and chat retrieval).
+
+Entries are keyed by repo, index scope, normalized query, limit and (for hybrid) the reranker
+config. The index scope comes from analysis_jobs alone: the latest `done` job (its commit and
+id) plus the latest job that has started. A finished or failed analysis therefore changes the
+scope, and old entries are never read again; they expire by TTL. While a job is parsing,
+embedding or analyzing, code_chunks may already have been replaced under new ids, so the cache
+is bypassed until it finishes. repositories.indexed_commit_sha is not used: parse writes it
+before the job is done.
+
+Results that were computed in a degraded mode (a retrieval branch timed out or failed, or the
+cross-encoder reranker was unavailable) are not stored, so a transient upstream failure is not
+served for the whole TTL. Redis is best-effort; a cache error falls back to computing the
+results.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Callable
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.observability import record_search_cache
+from app.redis_client import get_sync_redis
+from app.services.embeddings import normalize_query
+from app.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_search_flight = SingleFlight("search")
+
+SCOPE_SQL = text(
+    """
+    SELECT done.commit_sha AS done_commit_sha,
+           done.id::text AS done_job_id,
+           latest.id::text AS latest_job_id,
+           latest.status AS latest_status
+    FROM (SELECT CAST(:repo_id AS uuid) AS repo_id) r
+    LEFT JOIN LATERAL (
+        SELECT j.id, j.commit_sha
+        FROM analysis_jobs j
+        WHERE j.repo_id = r.repo_id AND j.status = 'done'
+        ORDER BY j.completed_at DESC NULLS LAST, j.created_at DESC
+        LIMIT 1
+    ) done ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT j.id, j.status
+        FROM analysis_jobs j
+        WHERE j.repo_id = r.repo_id AND j.status <> 'queued'
+        ORDER BY j.created_at DESC
+        LIMIT 1
+    ) latest ON TRUE
+    """
+)
+
+# Stages during which code_chunks (and their ids) may differ from what the last done job saw.
+INDEXING_STATUSES = frozenset({"parsing", "embedding", "analyzing"})
+
+
+def search_scope(db: Session, repo_id: UUID) -> str | None:
+    """Index scope for cache keys, or None while an analysis is rewriting the index."""
+    row = db.execute(SCOPE_SQL, {"repo_id": str(repo_id)}).mappings().first() or {}
+    if row.get("latest_status") in INDEXING_STATUSES:
+        return None
+    return ":".join(row.get(column) or "none" for column in ("done_commit_sha", "done_job_id", "latest_job_id"))
+
+
+def search_cache_key(kind: str, repo_id: UUID, scope: str, query: str, limit: int, config: dict | None = None) -> str:
+    params = json.dumps({"q": query, "limit": limit, "config": config or {}}, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(params.encode("utf-8")).hexdigest()
+    return f"searchcache:{kind}:{repo_id}:{scope}:{digest}"
+
+
+def cached_search(
+    db: Session,
+    repo_id: UUID,
+    kind: str,
+    query: str,
+    limit: int,
+    compute: Callable[[], tuple[list[dict], bool]],
+    config: dict | None = None,
+) -> list[dict]:
+    """Serve results from the cache, or run compute() -> (rows, cacheable) and store them.
+
+    Identical concurrent searches share one compute() call (see app/single_flight.py).
+    """
+    normalized = normalize_query(query)
+    if not normalized:
+        return compute()[0]
+
+    scope = search_scope(db, repo_id)
+    use_cache = settings.search_cache_ttl_seconds > 0 and scope is not None
+    if scope is None and settings.search_cache_ttl_seconds > 0:
+        record_search_cache(kind, "bypass")
+    key = search_cache_key(kind, repo_id, scope or "indexing", normalized, limit, config)
+    if use_cache:
+        rows = _read(key)
+        if rows is not None:
+            record_search_cache(kind, "hit")
+            return rows
+
+    def run() -> list[dict]:
+        if use_cache:
+            record_search_cache(kind, "miss")
+        rows, cacheable = compute()
+        if use_cache and cacheable:
+            try:
+                get_sync_redis().set(key, json.dumps(rows, separators=(",", ":")), ex=settings.search_cache_ttl_seconds)
+            except Exception as exc:
+                logger.warning("Search cache write failed: %s", exc)
+        return rows
+
+    return _search_flight.do(key, run, shared_lookup=(lambda: _read(key)) if use_cache else None)
+
+
+def _read(key: str) -> list[dict] | None:
+    try:
+        raw = get_sync_redis().get(key)
+    except Exception as exc:
+        logger.warning("Search cache read failed: %s", exc)
+        return None
+    if raw is None:
+        return None
+    try:
+        rows = json.loads(raw)
+    except ValueError:
+        return None
+    return rows if isinstance(rows, list) else None
@@ -0,0 +1,124 @@
+"""Single-flight coalescing for identical concurrent calls.
+
+When many users trigger the same search at once (a shared dashboard, a suggested-question
+button), each request would otherwise run its own query embedding, retrieval and
+cross-encoder pass. `SingleFlight.do(key, fn)` runs `fn` once per key at a time within the
+process. Concurrent callers with the same key wait for that call and receive a copy of its
+result, or its exception.
+
+With SINGLE_FLIGHT_REDIS_LOCK enabled, callers that pass `shared_lookup` also coordinate
+across processes. The first process takes a short Redis lock. The others poll
+`shared_lookup` (the Redis cache the leader writes to) until the result appears or the lock
+goes away. If that happens, or after SINGLE_FLIGHT_WAIT_SECONDS, they compute it themselves.
+The lock is an optimization only; any Redis error falls back to computing directly.
+"""
+
+import copy
+import logging
+import threading
+import time
+from typing import Callable, TypeVar
+from uuid import uuid4
+
+from app.config import settings
+from app.observability import record_single_flight
+from app.redis_client import get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Delete the lock only if this caller still owns it (it may have expired and been re-taken).
+_RELEASE_LOCK_LUA = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+  return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+_POLL_INTERVAL_SECONDS = 0.05
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], T], *, shared_lookup: Callable[[], T | None] | None = None) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            record_single_flight(self.name, "follower")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            # Callers may mutate what they get back; each follower gets its own copy.
+            return copy.deepcopy(call.result)
+
+        record_single_flight(self.name, "leader")
+        try:
+            call.result = self._run(key, fn, shared_lookup)
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _run(self, key: str, fn: Callable[[], T], shared_lookup: Callable[[], T | None] | None) -> T:
+        if shared_lookup is None or not settings.single_flight_redis_lock:
+            return fn()
+
+        lock_key = f"singleflight:{self.name}:{key}"
+        token = uuid4().hex
+        try:
+            client = get_sync_redis()
+            acquired = client.set(lock_key, token, nx=True, px=int(settings.single_flight_lock_ttl_seconds * 1000))
+        except Exception as exc:
+            logger.warning("Single-flight lock unavailable; computing directly: %s", exc)
+            return fn()
+
+        if acquired:
+            try:
+                return fn()
+            finally:
+                try:
+                    client.eval(_RELEASE_LOCK_LUA, 1, lock_key, token)
+                except Exception as exc:
+                    logger.warning("Single-flight lock release failed: %s", exc)
+
+        record_single_flight(self.name, "remote_wait")
+        deadline = time.monotonic() + settings.single_flight_wait_seconds
+        while time.monotonic() < deadline:
+            time.sleep(_POLL_INTERVAL_SECONDS)
+            result = shared_lookup()
+            if result is not None:
+                return result
+            try:
+                if not client.exists(lock_key):
+                    break
+            except Exception:
+                break
+        # The lock may have been released right after the result landed; look once more.
+        result = shared_lookup()
+        if result is not None:
+            return result
+        # The other process failed, or its result was not cacheable; compute it here.
+        return fn()
@@ -0,0 +1,59 @@
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from app.db.models import FileDependency, Repository
+from app.services.blast_radius import blast_radius_from_graph, blast_radius_from_index
+
+# core <- service <- api <- cli, and service <- worker
+EDGES = [
+    ("app/service.py", "app/core.py"),
+    ("app/api.py", "app/service.py"),
+    ("cli.py", "app/api.py"),
+    ("worker.py", "app/service.py"),
+]
+
+
+def test_blast_radius_from_graph_ranks_importers_by_distance():
+    graph = {"edges": [{"source": src, "target": dst} for src, dst in EDGES], "stats": {}}
+
+    result = blast_radius_from_graph(graph, ["app/core.py"])
+
+    assert result["impacted"] == [
+        {"file_path": "app/service.py", "distance": 1},
+        {"file_path": "app/api.py", "distance": 2},
+        {"file_path": "worker.py", "distance": 2},
+        {"file_path": "cli.py", "distance": 3},
+    ]
+    assert result["impacted_count"] == 4
+    assert result["max_distance"] == 3
+    assert result["graph_stats"] == {"files_considered": 0, "edges_detected": 4, "commit_sha": None}
+
+
+def test_blast_radius_from_index_matches_graph_walk(db_session: Session):
+    repo = Repository(
+        id=uuid4(),
+        github_url="https://github.com/test-owner/blast-index",
+        full_name="test-owner/blast-index",
+        owner="test-owner",
+        name="blast-index",
+        default_branch="main",
+        dependencies_commit_sha="head",
+    )
+    db_session.add(repo)
+    db_session.flush()
+    db_session.add_all(
+        FileDependency(repo_id=repo.id, commit_sha="head", source_path=src, target_path=dst, kind="python")
+        for src, dst in EDGES + [("app/core.py", "app/api.py")]  # a cycle must not loop forever
+    )
+    db_session.commit()
+
+    result = blast_radius_from_index(db_session, str(repo.id), "head", ["app/service.py", "cli.py"])
+
+    assert result["changed_files"] == ["app/service.py", "cli.py"]
+    assert result["impacted"] == [
+        {"file_path": "app/api.py", "distance": 1},
+        {"file_path": "worker.py", "distance": 1},
+        {"file_path": "app/core.py", "distance": 2},
+    ]
+    assert result["graph_stats"] == {"files_considered": 0, "edges_detected": 5, "commit_sha": "head"}
@@ -2,7 +2,7 @@ from uuid import uuid4
 
 from sqlalchemy.orm import Session
 
-from app.db.models import CodeChunk, Repository
+from app.db.models import CodeChunk, FileDependency, Repository
 
 
 def test_dependency_graph_returns_nodes_and_edges(client, db_session: Session):
@@ -64,3 +64,125 @@ def test_dependency_graph_returns_nodes_and_edges(client, db_session: Session):
 def test_dependency_graph_404_for_missing_repo(client):
     response = client.get(f"/api/v1/repos/{uuid4()}/dependency-graph")
     assert response.status_code == 404
+
+
+def test_dependency_graph_serves_persisted_edges(client, db_session: Session):
+    repo = Repository(
+        id=uuid4(),
+        github_url="https://github.com/test-owner/dep-graph-stored",
+        full_name="test-owner/dep-graph-stored",
+        owner="test-owner",
+        name="dep-graph-stored",
+        default_branch="main",
+        dependencies_commit_sha="abc123",
+    )
+    db_session.add(repo)
+    db_session.flush()
+
+    db_session.add_all(
+        [
+            CodeChunk(id=uuid4(), repo_id=repo.id, file_path="a.py", start_line=1, end_line=1, content="x = 1\n", language="python"),
+            CodeChunk(id=uuid4(), repo_id=repo.id, file_path="b.py", start_line=1, end_line=1, content="y = 2\n", language="python"),
+            # Edges of an older commit are ignored.
+            FileDependency(repo_id=repo.id, commit_sha="old", source_path="b.py", target_path="a.py", kind="python"),
+            FileDependency(repo_id=repo.id, commit_sha="abc123", source_path="a.py", target_path="b.py", kind="python"),
+        ]
+    )
+    db_session.commit()
+
+    response = client.get(f"/api/v1/repos/{repo.id}/dependency-graph")
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["stats"] == {"files_considered": 2, "edges_detected": 1}
+    assert [(edge["source"], edge["target"]) for edge in payload["edges"]] == [("a.py", "b.py")]
+
+
+def _indexed_repo(db_session: Session, name: str, edges: list[tuple[str, str]]) -> Repository:
+    repo = Repository(
+        id=uuid4(),
+        github_url=f"https://github.com/test-owner/{name}",
+        full_name=f"test-owner/{name}",
+        owner="test-owner",
+        name=name,
+        default_branch="main",
+        dependencies_commit_sha="head",
+    )
+    db_session.add(repo)
+    db_session.flush()
+    paths = sorted({path for edge in edges for path in edge})
+    db_session.add_all(
+        [
+            CodeChunk(id=uuid4(), repo_id=repo.id, file_path=path, start_line=1, end_line=1, content="x\n", language="python")
+            for path in paths
+        ]
+        + [
+            FileDependency(repo_id=repo.id, commit_sha="head", source_path=src, target_path=dst, kind="python")
+            for src, dst in edges
+        ]
+    )
+    db_session.commit()
+    return repo
+
+
+def test_dependency_graph_neighborhood_follows_direction_and_depth(client, db_session: Session):
+    # api -> service -> db, cli -> service
+    repo = _indexed_repo(
+        db_session,
+        "dep-graph-hood",
+        [("app/api.py", "app/service.py"), ("app/service.py", "app/db.py"), ("cli.py", "app/service.py")],
+    )
+    url = f"/api/v1/repos/{repo.id}/dependency-graph"
+
+    importers = client.get(url, params={"root": "app/service.py", "direction": "importers"}).json()
+    assert {node["id"]: node["depth"] for node in importers["nodes"]} == {
+        "app/api.py": 1,
+        "app/service.py": 0,
+        "cli.py": 1,
+    }
+    assert {(edge["source"], edge["target"]) for edge in importers["edges"]} == {
+        ("app/api.py", "app/service.py"),
+        ("cli.py", "app/service.py"),
+    }
+
+    imports = client.get(url, params={"root": "app/api.py", "direction": "imports", "depth": 2}).json()
+    assert [node["id"] for node in imports["nodes"]] == ["app/api.py", "app/db.py", "app/service.py"]
+
+    assert client.get(url, params={"root": "missing.py"}).status_code == 404
+
+
+def test_dependency_graph_prefix_filter_and_cursor_pages(client, db_session: Session):
+    repo = _indexed_repo(
+        db_session,
+        "dep-graph-pages",
+        [("app/a.py", "app/b.py"), ("app/b.py", "app/c.py"), ("app/c.py", "lib/x.py")],
+    )
+    url = f"/api/v1/repos/{repo.id}/dependency-graph"
+
+    first = client.get(url, params={"path_prefix": "app/", "limit": 2}).json()
+    assert [node["id"] for node in first["nodes"]] == ["app/a.py", "app/b.py"]
+    assert first["next_cursor"]
+
+    second = client.get(url, params={"path_prefix": "app/", "limit": 2, "cursor": first["next_cursor"]}).json()
+    assert [node["id"] for node in second["nodes"]] == ["app/c.py"]
+    assert second["next_cursor"] is None
+    # Edges leaving the prefix are dropped; every other edge shows up on exactly one page.
+    pairs = [(edge["source"], edge["target"]) for page in (first, second) for edge in page["edges"]]
+    assert pairs == [("app/a.py", "app/b.py"), ("app/b.py", "app/c.py")]
+
+    assert client.get(url, params={"cursor": "%%%"}).status_code == 400
+
+
+def test_dependency_graph_filters_need_indexed_graph(client, db_session: Session):
+    repo = Repository(
+        id=uuid4(),
+        github_url="https://github.com/test-owner/dep-graph-legacy",
+        full_name="test-owner/dep-graph-legacy",
+        owner="test-owner",
+        name="dep-graph-legacy",
+        default_branch="main",
+    )
+    db_session.add(repo)
+    db_session.commit()
+
+    response = client.get(f"/api/v1/repos/{repo.id}/dependency-graph", params={"limit": 10})
+    assert response.status_code == 409
@@ -0,0 +1,45 @@
+from prometheus_client import generate_latest
+
+from app import http_clients
+
+
+def test_clients_are_shared_per_upstream() -> None:
+    try:
+        qdrant = http_clients.get_http_client("qdrant")
+        assert http_clients.get_http_client("qdrant") is qdrant
+        assert http_clients.get_http_client("nim") is not qdrant
+    finally:
+        http_clients.close_http_clients()
+
+
+def test_close_http_clients_closes_and_forgets_clients() -> None:
+    client = http_clients.get_http_client("groq")
+    http_clients.close_http_clients()
+    assert client.is_closed
+    replacement = http_clients.get_http_client("groq")
+    try:
+        assert replacement is not client
+    finally:
+        http_clients.close_http_clients()
+
+
+def test_pool_metrics_are_exported_per_upstream() -> None:
+    try:
+        http_clients.get_http_client("openrouter")
+        output = generate_latest().decode()
+        assert 'devlens_http_pool_connections{state="idle",upstream="openrouter"} 0.0' in output
+    finally:
+        http_clients.close_http_clients()
+
+
+def test_stream_clients_have_their_own_larger_pool(monkeypatch) -> None:
+    monkeypatch.setattr(http_clients.settings, "http_client_max_connections", 20)
+    monkeypatch.setattr(http_clients.settings, "http_client_stream_max_connections", 100)
+    try:
+        stream = http_clients.get_stream_http_client("nim")
+        assert stream is not http_clients.get_http_client("nim")
+        assert stream is http_clients.get_stream_http_client("nim")
+        assert stream._transport._pool._max_connections == 100
+        assert http_clients.get_http_client("nim")._transport._pool._max_connections == 20
+    finally:
+        http_clients.close_http_clients()
@@ -1,3 +1,4 @@
+import time
 from uuid import uuid4
 
 import pytest
@@ -31,7 +32,7 @@ class FakeClient:
     def __exit__(self, *_args):
         return False
 
-    def post(self, url, json, headers=None):
+    def post(self, url, json, headers=None, timeout=None):
         self.captured["url"] = url
         self.captured["json"] = json
         self.captured["headers"] = headers
@@ -64,7 +65,7 @@ def test_dense_search_qdrant_includes_repo_filter(monkeypatch) -> None:
         ]
     }
     monkeypatch.setattr(retrieval_hybrid, "embed_query", lambda *_a, **_k: [0.1] * 1024)
-    monkeypatch.setattr(retrieval_hybrid.httpx, "Client", lambda **_kwargs: FakeClient(captured, payload))
+    monkeypatch.setattr(retrieval_hybrid, "get_http_client", lambda _upstream: FakeClient(captured, payload))
 
     results = retrieval_hybrid.dense_search_qdrant("repo-1", "auth token", 5)
     assert len(results) == 1
@@ -142,7 +143,7 @@ def test_hybrid_search_flag_off_keeps_deterministic_ranking(db_session: Session,
 
     def fake_apply(*_args, **_kwargs):
         called["value"] = True
-        return []
+        return [], True
 
     monkeypatch.setattr(retrieval_hybrid, "_apply_cross_encoder_rerank", fake_apply)
     results = retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=2)
@@ -206,3 +207,84 @@ def test_hybrid_search_reranker_failure_falls_back_to_deterministic(db_session:
 
     results = retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=2)
     assert [row["chunk_id"] for row in results] == [c1, c2]
+
+
+def _lexical_rows(c1: str, c2: str):
+    return lambda *_args, **_kwargs: [
+        {"chunk_id": c1, "file_path": "src/a.py", "start_line": 1, "end_line": 10, "language": "py", "score": 0.9},
+        {"chunk_id": c2, "file_path": "src/b.py", "start_line": 1, "end_line": 10, "language": "py", "score": 0.2},
+    ]
+
+
+def test_hybrid_search_slow_dense_degrades_to_lexical(db_session: Session, monkeypatch) -> None:
+    repo = _seed_repo(db_session)
+    c1 = str(uuid4())
+    c2 = str(uuid4())
+    monkeypatch.setattr(retrieval_hybrid.settings, "reranker_enabled", False)
+    monkeypatch.setattr(retrieval_hybrid.settings, "hybrid_dense_timeout_seconds", 0.05)
+    monkeypatch.setattr(retrieval_hybrid, "lexical_search_chunks", _lexical_rows(c1, c2))
+    monkeypatch.setattr(retrieval_hybrid, "dense_search_qdrant", lambda *_args, **_kwargs: time.sleep(1.0) or [])
+
+    started = time.monotonic()
+    results = retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=2)
+    assert time.monotonic() - started < 0.9
+    assert [row["chunk_id"] for row in results] == [c1, c2]
+    assert all(row["dense_score"] == 0.0 for row in results)
+
+
+def test_hybrid_search_dense_failure_degrades_to_lexical(db_session: Session, monkeypatch) -> None:
+    repo = _seed_repo(db_session)
+    c1 = str(uuid4())
+    c2 = str(uuid4())
+    monkeypatch.setattr(retrieval_hybrid.settings, "reranker_enabled", False)
+    monkeypatch.setattr(retrieval_hybrid, "lexical_search_chunks", _lexical_rows(c1, c2))
+
+    def failing_dense(*_args, **_kwargs):
+        raise HTTPException(status_code=502, detail="Query embedding failed: boom")
+
+    monkeypatch.setattr(retrieval_hybrid, "dense_search_qdrant", failing_dense)
+    results = retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=2)
+    assert [row["chunk_id"] for row in results] == [c1, c2]
+
+
+def test_hybrid_search_runs_branches_concurrently(db_session: Session, monkeypatch) -> None:
+    repo = _seed_repo(db_session)
+    c1 = str(uuid4())
+    c2 = str(uuid4())
+    monkeypatch.setattr(retrieval_hybrid.settings, "reranker_enabled", False)
+
+    def slow_lexical(*args, **kwargs):
+        time.sleep(0.3)
+        return _lexical_rows(c1, c2)(*args, **kwargs)
+
+    def slow_dense(*_args, **_kwargs):
+        time.sleep(0.3)
+        return [{"chunk_id": c2, "file_path": "src/b.py", "start_line": 1, "end_line": 10, "language": "py", "dense_score": 0.8}]
+
+    monkeypatch.setattr(retrieval_hybrid, "lexical_search_chunks", slow_lexical)
+    monkeypatch.setattr(retrieval_hybrid, "dense_search_qdrant", slow_dense)
+
+    started = time.monotonic()
+    results = retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=2)
+    assert time.monotonic() - started < 0.55
+    assert {row["chunk_id"] for row in results} == {c1, c2}
+
+
+def test_hybrid_search_raises_when_both_branches_fail(db_session: Session, monkeypatch) -> None:
+    repo = _seed_repo(db_session)
+    monkeypatch.setattr(retrieval_hybrid.settings, "hybrid_lexical_timeout_seconds", 0.05)
+
+    def slow_lexical(db, **_kwargs):
+        db.execute(text("SELECT pg_sleep(1)"))
+        return []
+
+    def failing_dense(*_args, **_kwargs):
+        raise HTTPException(status_code=502, detail="Qdrant search failed")
+
+    monkeypatch.setattr(retrieval_hybrid, "lexical_search_chunks", slow_lexical)
+    monkeypatch.setattr(retrieval_hybrid, "dense_search_qdrant", failing_dense)
+    with pytest.raises(HTTPException) as exc_info:
+        retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=2)
+    assert exc_info.value.status_code == 502
+    # The cancelled statement only rolled back its savepoint; the session is still usable.
+    assert db_session.execute(text("SELECT 1")).scalar() == 1
@@ -20,6 +20,7 @@ def test_schema_tables_exist(db_session: Session) -> None:
         'share_tokens',
         'dead_letter_jobs',
         'api_keys',
+        'file_dependencies',
         'alembic_version',
     }
     assert required.issubset(tables)
@@ -27,7 +28,7 @@ def test_schema_tables_exist(db_session: Session) -> None:
 
 def test_alembic_head_is_applied(db_session: Session) -> None:
     version = db_session.execute(text('select version_num from alembic_version')).scalar_one()
-    assert version == '20260719_0008'
+    assert version == '20261016_0016'
 
 
 def test_hot_path_indexes_exist(db_session: Session) -> None:
@@ -45,9 +46,12 @@ def test_hot_path_indexes_exist(db_session: Session) -> None:
         "idx_code_chunks_fts",
         "idx_analysis_jobs_repo_status",
         "idx_analysis_jobs_retry",
+        "idx_analysis_jobs_status_created",
+        "idx_analysis_jobs_lease",
         "idx_analysis_jobs_repo_commit_idempotency",
         "idx_analysis_jobs_repo_commit_status_created",
         "idx_analysis_results_repo_created",
         "idx_api_keys_user_revoked",
+        "idx_file_dependencies_reverse",
     }
     assert required.issubset(indexes)
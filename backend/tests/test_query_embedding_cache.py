@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from app.services import embeddings
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
+@pytest.fixture
+def fake_embed(monkeypatch):
+    calls: list[list[str]] = []
+
+    def fake(texts, input_type):
+        calls.append(list(texts))
+        return [[0.25, -0.5, 1.0] for _ in texts]
+
+    fake_redis = FakeRedis()
+    embeddings._query_cache.clear()
+    monkeypatch.setattr(embeddings, "_embed", fake)
+    monkeypatch.setattr(embeddings, "get_sync_redis", lambda: fake_redis)
+    monkeypatch.setattr(embeddings.settings, "query_embed_cache_local_entries", 16)
+    monkeypatch.setattr(embeddings.settings, "query_embed_cache_ttl_seconds", 60)
+    yield calls, fake_redis
+    embeddings._query_cache.clear()
+
+
+def test_repeated_query_is_embedded_once(fake_embed) -> None:
+    calls, fake_redis = fake_embed
+    first = embeddings.embed_query("how is auth   handled?")
+    second = embeddings.embed_query("  how is auth handled?\n")
+    assert first == second == [0.25, -0.5, 1.0]
+    assert calls == [["how is auth handled?"]]
+    assert len(fake_redis.store) == 1
+    assert next(iter(fake_redis.store.values()))[:2] == b"EV"
+
+
+def test_redis_tier_serves_other_processes(fake_embed) -> None:
+    calls, _fake_redis = fake_embed
+    embeddings.embed_query("where are tokens refreshed")
+    embeddings._query_cache.clear()  # as seen from a fresh replica
+    assert embeddings.embed_query("where are tokens refreshed") == [0.25, -0.5, 1.0]
+    assert len(calls) == 1
+
+
+def test_cache_key_includes_model(fake_embed, monkeypatch) -> None:
+    calls, _fake_redis = fake_embed
+    embeddings.embed_query("parse worker")
+    monkeypatch.setattr(embeddings.settings, "embed_model", "other-model")
+    embeddings.embed_query("parse worker")
+    assert len(calls) == 2
+
+
+def test_redis_errors_fall_back_to_embedding(fake_embed, monkeypatch) -> None:
+    calls, _fake_redis = fake_embed
+    monkeypatch.setattr(embeddings.settings, "query_embed_cache_local_entries", 0)
+
+    def broken_redis():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(embeddings, "get_sync_redis", broken_redis)
+    assert embeddings.embed_query("chat flow") == [0.25, -0.5, 1.0]
+    assert embeddings.embed_query("chat flow") == [0.25, -0.5, 1.0]
+    assert len(calls) == 2
+
+
+def test_concurrent_misses_share_one_embedding_call(fake_embed, monkeypatch) -> None:
+    calls, _fake_redis = fake_embed
+    original = embeddings._embed
+
+    def slow_embed(texts, input_type):
+        time.sleep(0.2)
+        return original(texts, input_type)
+
+    monkeypatch.setattr(embeddings, "_embed", slow_embed)
+    threads = [threading.Thread(target=embeddings.embed_query, args=("suggested question",)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
@@ -180,3 +180,60 @@ def test_get_repo_dashboard_without_analysis(client, db_session: Session):
 def test_get_repo_dashboard_404_for_missing_repo(client):
     response = client.get(f'/api/v1/repos/{uuid4()}/dashboard')
     assert response.status_code == 404
+
+
+def test_get_graph_analytics_returns_latest_precomputed_metrics(client, db_session: Session):
+    repo = Repository(
+        id=uuid4(),
+        github_url='https://github.com/test-owner/graph-analytics',
+        full_name='test-owner/graph-analytics',
+        owner='test-owner',
+        name='graph-analytics',
+        default_branch='main',
+        # A re-analysis has already stored the next commit's edges.
+        dependencies_commit_sha='sha-next',
+    )
+    db_session.add(repo)
+    db_session.flush()
+    db_session.add(
+        AnalysisResult(
+            id=uuid4(),
+            repo_id=repo.id,
+            job_id=None,
+            quality_score=80,
+            graph_analytics={
+                'commit_sha': 'sha-graph',
+                'node_count': 3,
+                'edge_count': 3,
+                'cycle_count': 1,
+                'files_in_cycles': 2,
+                'cycles': [['a.py', 'b.py']],
+                'top_fan_in': [{'file_path': 'a.py', 'value': 2}],
+                'top_fan_out': [{'file_path': 'c.py', 'value': 2}],
+                'top_central': [{'file_path': 'a.py', 'value': 0.45}],
+            },
+        )
+    )
+    db_session.commit()
+
+    response = client.get(f'/api/v1/repos/{repo.id}/graph-analytics')
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload['commit_sha'] == 'sha-graph'
+    assert payload['cycles'] == [['a.py', 'b.py']]
+    assert payload['top_central'][0] == {'file_path': 'a.py', 'value': 0.45}
+
+
+def test_get_graph_analytics_404_before_analysis(client, db_session: Session):
+    repo = Repository(
+        id=uuid4(),
+        github_url='https://github.com/test-owner/graph-analytics-none',
+        full_name='test-owner/graph-analytics-none',
+        owner='test-owner',
+        name='graph-analytics-none',
+        default_branch='main',
+    )
+    db_session.add(repo)
+    db_session.commit()
+
+    assert client.get(f'/api/v1/repos/{repo.id}/graph-analytics').status_code == 404
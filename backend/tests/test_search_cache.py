@@ -0,0 +1,170 @@
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+import app.api.v1.repos as repos_module
+from app.db.models import AnalysisJob, Repository
+from app.services import retrieval_hybrid, search_cache
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value.encode() if isinstance(value, str) else value
+
+
+@pytest.fixture
+def fake_redis(monkeypatch) -> FakeRedis:
+    redis = FakeRedis()
+    monkeypatch.setattr(search_cache, "get_sync_redis", lambda: redis)
+    monkeypatch.setattr(search_cache.settings, "search_cache_ttl_seconds", 60)
+    monkeypatch.setattr(retrieval_hybrid.settings, "reranker_enabled", False)
+    return redis
+
+
+def _seed_repo(db_session: Session) -> Repository:
+    repo = Repository(
+        id=uuid4(),
+        github_url="https://github.com/test-owner/search-cache-repo",
+        full_name="test-owner/search-cache-repo",
+        owner="test-owner",
+        name="search-cache-repo",
+        default_branch="main",
+        indexed_commit_sha="sha-1",
+    )
+    db_session.add(repo)
+    db_session.commit()
+    return repo
+
+
+def _finish_job(db_session: Session, repo: Repository, commit_sha: str) -> AnalysisJob:
+    job = AnalysisJob(
+        id=uuid4(),
+        repo_id=repo.id,
+        status="done",
+        progress=100,
+        commit_sha=commit_sha,
+        completed_at=datetime.now(UTC),
+    )
+    db_session.add(job)
+    db_session.commit()
+    return job
+
+
+def _counting_lexical(monkeypatch, chunk_id: str) -> list[int]:
+    calls: list[int] = []
+
+    def lexical(*_args, **_kwargs):
+        calls.append(1)
+        return [{"chunk_id": chunk_id, "file_path": "src/a.py", "start_line": 1, "end_line": 5, "language": "py", "score": 0.5}]
+
+    monkeypatch.setattr(retrieval_hybrid, "lexical_search_chunks", lexical)
+    return calls
+
+
+def test_repeated_hybrid_search_is_served_from_cache(db_session: Session, fake_redis, monkeypatch) -> None:
+    repo = _seed_repo(db_session)
+    _finish_job(db_session, repo, "sha-1")
+    calls = _counting_lexical(monkeypatch, str(uuid4()))
+    monkeypatch.setattr(retrieval_hybrid, "dense_search_qdrant", lambda *_args, **_kwargs: [])
+
+    first = retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=5)
+    second = retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "  auth   token ", limit=5)
+    assert second == first
+    assert len(calls) == 1
+
+    retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=3)
+    assert len(calls) == 2
+
+
+def test_finished_analysis_invalidates_cached_results(db_session: Session, fake_redis, monkeypatch) -> None:
+    repo = _seed_repo(db_session)
+    _finish_job(db_session, repo, "sha-1")
+    calls = _counting_lexical(monkeypatch, str(uuid4()))
+    monkeypatch.setattr(retrieval_hybrid, "dense_search_qdrant", lambda *_args, **_kwargs: [])
+
+    retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=5)
+    repo.indexed_commit_sha = "sha-2"
+    db_session.commit()
+    _finish_job(db_session, repo, "sha-2")
+    retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=5)
+    assert len(calls) == 2
+
+
+def test_degraded_hybrid_results_are_not_cached(db_session: Session, fake_redis, monkeypatch) -> None:
+    repo = _seed_repo(db_session)
+    calls = _counting_lexical(monkeypatch, str(uuid4()))
+
+    def failing_dense(*_args, **_kwargs):
+        raise HTTPException(status_code=502, detail="Qdrant search failed")
+
+    monkeypatch.setattr(retrieval_hybrid, "dense_search_qdrant", failing_dense)
+    retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=5)
+    retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=5)
+    assert len(calls) == 2
+    assert fake_redis.store == {}
+
+
+def test_lexical_endpoint_uses_cache(client, db_session: Session, fake_redis, monkeypatch) -> None:
+    repo = _seed_repo(db_session)
+    calls: list[int] = []
+
+    def lexical(*_args, **_kwargs):
+        calls.append(1)
+        return []
+
+    monkeypatch.setattr(repos_module, "lexical_search_chunks", lexical)
+    for _ in range(2):
+        response = client.get(f"/api/v1/repos/{repo.id}/search/lexical", params={"q": "payment"})
+        assert response.status_code == 200
+    assert len(calls) == 1
+
+
+def test_results_without_cross_encoder_rerank_are_not_cached(db_session: Session, fake_redis, monkeypatch) -> None:
+    repo = _seed_repo(db_session)
+    chunk_id = str(uuid4())
+    calls = _counting_lexical(monkeypatch, chunk_id)
+    monkeypatch.setattr(retrieval_hybrid, "dense_search_qdrant", lambda *_args, **_kwargs: [])
+    monkeypatch.setattr(retrieval_hybrid.settings, "reranker_enabled", True)
+
+    def unavailable(*_args, **_kwargs):
+        raise retrieval_hybrid.RerankerUnavailable("model not loaded")
+
+    monkeypatch.setattr(retrieval_hybrid, "rerank_candidates", unavailable)
+    results = retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=5)
+    retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=5)
+    assert [row["chunk_id"] for row in results] == [chunk_id]
+    assert len(calls) == 2
+    assert fake_redis.store == {}
+
+
+def test_cache_is_bypassed_while_a_reindex_is_running(db_session: Session, fake_redis, monkeypatch) -> None:
+    repo = _seed_repo(db_session)
+    _finish_job(db_session, repo, "sha-1")
+    calls = _counting_lexical(monkeypatch, str(uuid4()))
+    monkeypatch.setattr(retrieval_hybrid, "dense_search_qdrant", lambda *_args, **_kwargs: [])
+    retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=5)
+    assert len(fake_redis.store) == 1
+
+    # A full re-index of the same commit replaces chunk ids before the job is done.
+    job = _finish_job(db_session, repo, "sha-1")
+    job.status = "embedding"
+    job.completed_at = None
+    db_session.commit()
+    retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=5)
+    assert len(calls) == 2
+    assert len(fake_redis.store) == 1
+
+    job.status = "done"
+    job.completed_at = datetime.now(UTC)
+    db_session.commit()
+    retrieval_hybrid.hybrid_search_chunks(db_session, repo.id, "auth token", limit=5)
+    assert len(calls) == 3
@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pytest
+
+from app import single_flight
+from app.single_flight import SingleFlight
+
+
+def _run_concurrently(count: int, target) -> list:
+    results: list = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(index: int) -> None:
+        barrier.wait()
+        try:
+            results[index] = target()
+        except Exception as exc:
+            results[index] = exc
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_identical_calls_share_one_computation() -> None:
+    flight = SingleFlight("test")
+    calls: list[int] = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return [{"chunk_id": "c1"}]
+
+    results = _run_concurrently(8, lambda: flight.do("same", compute))
+    assert calls == [1]
+    assert all(result == [{"chunk_id": "c1"}] for result in results)
+    # Followers get copies, so one caller mutating its rows cannot affect another.
+    assert len({id(result) for result in results}) == len(results)
+
+
+def test_different_keys_and_sequential_calls_compute_separately() -> None:
+    flight = SingleFlight("test")
+    calls: list[str] = []
+
+    def compute(key: str):
+        calls.append(key)
+        return key
+
+    assert flight.do("a", lambda: compute("a")) == "a"
+    assert flight.do("a", lambda: compute("a")) == "a"
+    assert flight.do("b", lambda: compute("b")) == "b"
+    assert calls == ["a", "a", "b"]
+
+
+def test_leader_error_is_raised_for_every_waiter() -> None:
+    flight = SingleFlight("test")
+
+    def compute():
+        time.sleep(0.2)
+        raise RuntimeError("upstream down")
+
+    results = _run_concurrently(4, lambda: flight.do("same", compute))
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight._calls == {}
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def exists(self, key):
+        return int(key in self.store)
+
+    def eval(self, _script, _numkeys, key, token):
+        if self.store.get(key) == token:
+            del self.store[key]
+            return 1
+        return 0
+
+
+def test_redis_lock_waits_for_result_from_another_process(monkeypatch) -> None:
+    redis = FakeRedis()
+    monkeypatch.setattr(single_flight, "get_sync_redis", lambda: redis)
+    monkeypatch.setattr(single_flight.settings, "single_flight_redis_lock", True)
+    monkeypatch.setattr(single_flight.settings, "single_flight_wait_seconds", 2.0)
+    redis.store["singleflight:test:same"] = "other-process"
+    shared = {"value": None}
+
+    def finish_elsewhere() -> None:
+        time.sleep(0.2)
+        shared["value"] = [1.0, 2.0]
+        del redis.store["singleflight:test:same"]
+
+    threading.Thread(target=finish_elsewhere).start()
+    result = SingleFlight("test").do(
+        "same",
+        lambda: pytest.fail("should reuse the other process's result"),
+        shared_lookup=lambda: shared["value"],
+    )
+    assert result == [1.0, 2.0]
+
+
+def test_redis_lock_is_released_after_computing(monkeypatch) -> None:
+    redis = FakeRedis()
+    monkeypatch.setattr(single_flight, "get_sync_redis", lambda: redis)
+    monkeypatch.setattr(single_flight.settings, "single_flight_redis_lock", True)
+    assert SingleFlight("test").do("key", lambda: "value", shared_lookup=lambda: None) == "value"
+    assert redis.store == {}
@@ -246,7 +246,9 @@ export type SecurityFlag = { path: string; categories: string[] };
 export type BlastRadius = {
   changed_files: string[];
   impacted_files: string[];
+  impacted: { file_path: string; distance: number }[];
   impacted_count: number;
+  max_distance: number;
 };
 
 export type CommitDiffSummary = {
@@ -1,16 +1,19 @@
 import re
 import json
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
+from typing import Iterable, Iterator
 from uuid import uuid4
 
 import httpx
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from graph_analytics import compute_graph_analytics
+from http_clients import get_http_client
 from parse_worker import update_job_status
-from reliability import schedule_retry_or_dead_letter
+from reliability import JobLease, LeaseLost, schedule_retry_or_dead_letter, worker_identity
 from telemetry import (
     record_llm_fallback,
     record_llm_provider_attempt,
@@ -49,19 +52,32 @@ def fetch_next_analyze_job(db: Session) -> AnalyzeSnapshot | None:
     row = db.execute(
         text(
             """
-            SELECT j.id::text AS job_id,
-                   j.repo_id::text AS repo_id,
-                   r.full_name,
-                   r.default_branch
-            FROM analysis_jobs j
-            JOIN repositories r ON r.id = j.repo_id
-            WHERE j.status = 'analyzing'
-              AND (j.next_retry_at IS NULL OR j.next_retry_at <= NOW())
-            ORDER BY j.created_at ASC
-            LIMIT 1
+            WITH next_job AS (
+                SELECT id
+                FROM analysis_jobs
+                WHERE status = 'analyzing'
+                  AND claimed_by IS NULL
+                  AND (next_retry_at IS NULL OR next_retry_at <= NOW())
+                ORDER BY created_at ASC
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE analysis_jobs j
+            SET claimed_by = :worker_id,
+                claimed_at = NOW(),
+                lease_expires_at = NOW() + make_interval(secs => :lease_seconds)
+            FROM next_job, repositories r
+            WHERE j.id = next_job.id
+              AND r.id = j.repo_id
+            RETURNING j.id::text AS job_id,
+                      j.repo_id::text AS repo_id,
+                      r.full_name,
+                      r.default_branch
             """
-        )
+        ),
+        {'worker_id': worker_identity(), 'lease_seconds': settings.worker_lease_seconds},
     ).mappings().first()
+    db.commit()
 
     if not row:
         return None
@@ -74,7 +90,9 @@ def fetch_next_analyze_job(db: Session) -> AnalyzeSnapshot | None:
     )
 
 
-def load_repo_chunks(db: Session, repo_id: str) -> list[ChunkRecord]:
+def load_repo_chunks(db: Session, repo_id: str) -> Iterator[ChunkRecord]:
+    # yield_per streams through a server-side cursor, so memory stays flat however large the
+    # repo is; nothing commits on this session until the scan is finished.
     rows = db.execute(
         text(
             """
@@ -85,49 +103,52 @@ def load_repo_chunks(db: Session, repo_id: str) -> list[ChunkRecord]:
             """
         ),
         {'repo_id': repo_id},
-    ).mappings().all()
+        execution_options={'yield_per': settings.chunk_load_page_size},
+    ).mappings()
 
-    return [
-        ChunkRecord(
+    for row in rows:
+        yield ChunkRecord(
             file_path=row['file_path'],
             start_line=row['start_line'],
             end_line=row['end_line'],
             content=row['content'],
             language=row['language'],
         )
-        for row in rows
-    ]
 
 
-def language_breakdown(chunks: list[ChunkRecord]) -> dict:
-    totals: dict[str, int] = {}
-    for chunk in chunks:
+@dataclass
+class ChunkStats:
+    """Everything the analyze stage derives from chunks, accumulated in one streaming pass."""
+
+    chunk_count: int = 0
+    language_sizes: dict[str, int] = field(default_factory=dict)
+    long_functions: list[dict] = field(default_factory=list)
+    todo_count: int = 0
+    test_files: set[str] = field(default_factory=set)
+    files: dict[str, dict] = field(default_factory=dict)
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[ChunkRecord]) -> 'ChunkStats':
+        stats = cls()
+        for chunk in chunks:
+            stats.add(chunk)
+        return stats
+
+    def add(self, chunk: ChunkRecord) -> None:
+        self.chunk_count += 1
         lang = (chunk.language or 'unknown').lower()
-        totals[lang] = totals.get(lang, 0) + len(chunk.content)
-
-    total_size = sum(totals.values()) or 1
-    return {lang: round((size / total_size) * 100, 2) for lang, size in sorted(totals.items(), key=lambda kv: kv[1], reverse=True)}
-
-
-def detect_tech_debt(chunks: list[ChunkRecord]) -> dict:
-    long_functions = []
-    todo_count = 0
-    source_files = set()
-    test_files = set()
+        self.language_sizes[lang] = self.language_sizes.get(lang, 0) + len(chunk.content)
 
-    for chunk in chunks:
         path = chunk.file_path
         lower_path = path.lower()
-        source_files.add(path)
         if '/tests/' in lower_path or lower_path.startswith('tests/') or 'test_' in lower_path:
-            test_files.add(path)
+            self.test_files.add(path)
 
         span = None
         if chunk.start_line is not None and chunk.end_line is not None:
             span = chunk.end_line - chunk.start_line + 1
-
-        if span and span > 50:
-            long_functions.append(
+        if span and span > 50 and len(self.long_functions) < 50:
+            self.long_functions.append(
                 {
                     'file': path,
                     'line': chunk.start_line,
@@ -135,29 +156,39 @@ def detect_tech_debt(chunks: list[ChunkRecord]) -> dict:
                 }
             )
 
-        todo_count += len(re.findall(r'(?i)\b(TODO|FIXME)\b', chunk.content))
+        self.todo_count += len(re.findall(r'(?i)\b(TODO|FIXME)\b', chunk.content))
+
+        entry = self.files.setdefault(path, {'chunks': 0, 'lines': 0, 'language': chunk.language or 'unknown'})
+        entry['chunks'] += 1
+        if chunk.start_line and chunk.end_line:
+            entry['lines'] += max(0, chunk.end_line - chunk.start_line + 1)
+
+
+def _as_stats(chunks: Iterable[ChunkRecord] | ChunkStats) -> ChunkStats:
+    return chunks if isinstance(chunks, ChunkStats) else ChunkStats.from_chunks(chunks)
+
+
+def language_breakdown(chunks: Iterable[ChunkRecord] | ChunkStats) -> dict:
+    totals = _as_stats(chunks).language_sizes
+    total_size = sum(totals.values()) or 1
+    return {lang: round((size / total_size) * 100, 2) for lang, size in sorted(totals.items(), key=lambda kv: kv[1], reverse=True)}
+
 
+def detect_tech_debt(chunks: Iterable[ChunkRecord] | ChunkStats) -> dict:
+    stats = _as_stats(chunks)
     missing_tests = []
-    if not test_files:
-        missing_tests = sorted(list(source_files))[:20]
+    if not stats.test_files:
+        missing_tests = sorted(stats.files)[:20]
 
     return {
-        'long_functions': long_functions[:50],
-        'todo_count': todo_count,
+        'long_functions': list(stats.long_functions),
+        'todo_count': stats.todo_count,
         'missing_tests': missing_tests,
     }
 
 
-def build_file_tree(chunks: list[ChunkRecord]) -> dict:
-    metrics: dict[str, dict] = {}
-    for chunk in chunks:
-        path = chunk.file_path
-        entry = metrics.setdefault(path, {'chunks': 0, 'lines': 0, 'language': chunk.language or 'unknown'})
-        entry['chunks'] += 1
-        if chunk.start_line and chunk.end_line:
-            entry['lines'] += max(0, chunk.end_line - chunk.start_line + 1)
-
-    return {'files': metrics}
+def build_file_tree(chunks: Iterable[ChunkRecord] | ChunkStats) -> dict:
+    return {'files': _as_stats(chunks).files}
 
 
 def get_contributor_stats(full_name: str) -> dict:
@@ -188,14 +219,15 @@ def get_contributor_stats(full_name: str) -> dict:
         return {'top_contributors': [], 'error': 'github_unreachable'}
 
 
-def build_architecture_summary(snapshot: AnalyzeSnapshot, lang_breakdown: dict, chunks: list[ChunkRecord]) -> str:
+def build_architecture_summary(snapshot: AnalyzeSnapshot, lang_breakdown: dict, chunks: Iterable[ChunkRecord] | ChunkStats) -> str:
+    stats = _as_stats(chunks)
     top_lang = next(iter(lang_breakdown.keys()), 'unknown')
-    unique_paths = sorted({chunk.file_path for chunk in chunks})
+    unique_paths = sorted(stats.files)
     sample_paths = ', '.join(unique_paths[:5]) if unique_paths else 'no source files discovered'
 
     return (
         f"Repository {snapshot.full_name} (branch {snapshot.default_branch}) is primarily {top_lang}. "
-        f"The parse/index stage identified {len(unique_paths)} source files and {len(chunks)} chunks. "
+        f"The parse/index stage identified {len(unique_paths)} source files and {stats.chunk_count} chunks. "
         f"Representative paths include: {sample_paths}. "
         "This summary is generated from structural chunk metadata and should be refined with LLM synthesis in later stages."
     )
@@ -249,8 +281,7 @@ def _provider_request(provider: str, prompt: str, timeout_seconds: float) -> str
     }
 
     try:
-        with httpx.Client(timeout=timeout_seconds) as client:
-            response = client.post(url, headers=headers, json=body)
+        response = get_http_client(provider_name).post(url, headers=headers, json=body, timeout=timeout_seconds)
     except httpx.TimeoutException as exc:
         raise AnalyzeError("LLM_PROVIDER_TIMEOUT", str(exc)) from exc
     except httpx.TransportError as exc:
@@ -275,14 +306,15 @@ def _provider_request(provider: str, prompt: str, timeout_seconds: float) -> str
     return text
 
 
-def generate_architecture_summary(snapshot: AnalyzeSnapshot, lang_breakdown: dict, chunks: list[ChunkRecord]) -> str:
-    fallback = build_architecture_summary(snapshot, lang_breakdown, chunks)
+def generate_architecture_summary(snapshot: AnalyzeSnapshot, lang_breakdown: dict, chunks: Iterable[ChunkRecord] | ChunkStats) -> str:
+    stats = _as_stats(chunks)
+    fallback = build_architecture_summary(snapshot, lang_breakdown, stats)
 
-    top_paths = sorted({chunk.file_path for chunk in chunks})[:25]
+    top_paths = sorted(stats.files)[:25]
     prompt = (
         f"Repository: {snapshot.full_name}\n"
         f"Branch: {snapshot.default_branch}\n"
-        f"Files discovered: {len(top_paths)} sampled from {len(chunks)} chunks\n"
+        f"Files discovered: {len(top_paths)} sampled from {stats.chunk_count} chunks\n"
         f"Language breakdown: {json.dumps(lang_breakdown)}\n"
         f"Representative files: {', '.join(top_paths) if top_paths else 'none'}\n\n"
         "Write a concise architecture summary (3-5 sentences) for an engineering dashboard. "
@@ -315,7 +347,29 @@ def generate_architecture_summary(snapshot: AnalyzeSnapshot, lang_breakdown: dic
     return fallback
 
 
-def compute_quality_score(tech_debt: dict, file_tree: dict) -> int:
+def load_dependency_edges(db: Session, repo_id: str) -> tuple[str | None, list[tuple[str, str]]]:
+    """(commit_sha, edges): the import edges the parse stage stored for the repo's indexed commit."""
+    row = db.execute(
+        text('SELECT dependencies_commit_sha FROM repositories WHERE id = CAST(:repo_id AS uuid)'),
+        {'repo_id': repo_id},
+    ).mappings().first()
+    commit_sha = (row or {}).get('dependencies_commit_sha')
+    if not commit_sha:
+        return None, []
+    rows = db.execute(
+        text(
+            """
+            SELECT source_path, target_path
+            FROM file_dependencies
+            WHERE repo_id = CAST(:repo_id AS uuid) AND commit_sha = :commit_sha
+            """
+        ),
+        {'repo_id': repo_id, 'commit_sha': commit_sha},
+    ).mappings().all()
+    return commit_sha, [(row['source_path'], row['target_path']) for row in rows]
+
+
+def compute_quality_score(tech_debt: dict, file_tree: dict, graph_analytics: dict | None = None) -> int:
     score = 100
 
     todo_penalty = min(30, int(tech_debt.get('todo_count', 0)))
@@ -332,6 +386,10 @@ def compute_quality_score(tech_debt: dict, file_tree: dict) -> int:
     if has_readme:
         score += 5
 
+    if graph_analytics:
+        cycle_penalty = min(15, int(graph_analytics.get('cycle_count', 0)) * 3)
+        score -= cycle_penalty
+
     return max(0, min(100, score))
 
 
@@ -344,6 +402,7 @@ def store_analysis_result(
     contributors: dict,
     tech_debt: dict,
     file_tree: dict,
+    graph_analytics: dict | None = None,
 ) -> None:
     existing = db.execute(
         text('SELECT id::text FROM analysis_results WHERE job_id = CAST(:job_id AS uuid) LIMIT 1'),
@@ -359,6 +418,7 @@ def store_analysis_result(
         'contributor_stats': json.dumps(contributors),
         'tech_debt_flags': json.dumps(tech_debt),
         'file_tree': json.dumps(file_tree),
+        'graph_analytics': json.dumps(graph_analytics) if graph_analytics is not None else None,
     }
 
     if existing:
@@ -371,7 +431,8 @@ def store_analysis_result(
                     language_breakdown = CAST(:language_breakdown AS jsonb),
                     contributor_stats = CAST(:contributor_stats AS jsonb),
                     tech_debt_flags = CAST(:tech_debt_flags AS jsonb),
-                    file_tree = CAST(:file_tree AS jsonb)
+                    file_tree = CAST(:file_tree AS jsonb),
+                    graph_analytics = CAST(:graph_analytics AS jsonb)
                 WHERE id = CAST(:id AS uuid)
                 """
             ),
@@ -383,11 +444,11 @@ def store_analysis_result(
                 """
                 INSERT INTO analysis_results (
                     id, repo_id, job_id, architecture_summary, quality_score,
-                    language_breakdown, contributor_stats, tech_debt_flags, file_tree
+                    language_breakdown, contributor_stats, tech_debt_flags, file_tree, graph_analytics
                 ) VALUES (
                     CAST(:id AS uuid), CAST(:repo_id AS uuid), CAST(:job_id AS uuid), :summary, :quality_score,
                     CAST(:language_breakdown AS jsonb), CAST(:contributor_stats AS jsonb),
-                    CAST(:tech_debt_flags AS jsonb), CAST(:file_tree AS jsonb)
+                    CAST(:tech_debt_flags AS jsonb), CAST(:file_tree AS jsonb), CAST(:graph_analytics AS jsonb)
                 )
                 """
             ),
@@ -395,21 +456,27 @@ def store_analysis_result(
         )
 
 
-def mark_job_done(db: Session, snapshot: AnalyzeSnapshot) -> None:
+def mark_job_done(db: Session, snapshot: AnalyzeSnapshot, owner: str) -> None:
     now = datetime.now(UTC)
-    db.execute(
+    row = db.execute(
         text(
             """
             UPDATE analysis_jobs
-            SET status = 'done', progress = 100, completed_at = :completed_at, error_message = NULL
+            SET status = 'done', progress = 100, completed_at = :completed_at, error_message = NULL,
+                claimed_by = NULL, claimed_at = NULL, lease_expires_at = NULL
             WHERE id = CAST(:job_id AS uuid)
+              AND claimed_by = :owner
+            RETURNING id
             """
         ),
         {
             'job_id': snapshot.job_id,
             'completed_at': now,
+            'owner': owner,
         },
-    )
+    ).first()
+    if row is None:
+        raise LeaseLost(f'Job {snapshot.job_id} is no longer claimed by {owner}')
     db.execute(
         text(
             """
@@ -430,25 +497,37 @@ def analyze_job(db: Session, snapshot: AnalyzeSnapshot) -> None:
     update_job_status(db, snapshot.job_id, 'analyzing', 10)
     db.commit()
 
+    lease = JobLease(snapshot.job_id)
     try:
-        with trace_span("worker.analyze", trace_id=snapshot.job_id, repo_id=snapshot.repo_id):
-            chunks = load_repo_chunks(db, snapshot.repo_id)
-            if not chunks:
+        with (
+            trace_span("worker.analyze", trace_id=snapshot.job_id, repo_id=snapshot.repo_id),
+            lease,
+        ):
+            stats = ChunkStats.from_chunks(load_repo_chunks(db, snapshot.repo_id))
+            if not stats.chunk_count:
                 raise AnalyzeError('NO_CHUNKS', 'No chunks available for analysis')
 
-            lang = language_breakdown(chunks)
-            tech_debt = detect_tech_debt(chunks)
-            file_tree = build_file_tree(chunks)
+            lang = language_breakdown(stats)
+            tech_debt = detect_tech_debt(stats)
+            file_tree = build_file_tree(stats)
             contributors = get_contributor_stats(snapshot.full_name)
-            summary = generate_architecture_summary(snapshot, lang, chunks)
-            quality = compute_quality_score(tech_debt, file_tree)
-
-            update_job_status(db, snapshot.job_id, 'analyzing', 80)
-            store_analysis_result(db, snapshot, summary, quality, lang, contributors, tech_debt, file_tree)
-            mark_job_done(db, snapshot)
+            summary = generate_architecture_summary(snapshot, lang, stats)
+            dependencies_commit, edges = load_dependency_edges(db, snapshot.repo_id)
+            # Stored with the metrics: repositories.dependencies_commit_sha moves on as soon as the
+            # next parse writes its edges, before this payload is replaced.
+            graph = {**compute_graph_analytics(list(stats.files), edges), 'commit_sha': dependencies_commit}
+            quality = compute_quality_score(tech_debt, file_tree, graph)
+
+            lease.check()
+            update_job_status(db, snapshot.job_id, 'analyzing', 80, owner=lease.owner)
+            store_analysis_result(db, snapshot, summary, quality, lang, contributors, tech_debt, file_tree, graph)
+            mark_job_done(db, snapshot, lease.owner)
             db.commit()
             record_stage_duration("analyzing", "success", time.perf_counter() - started)
 
+    except LeaseLost:
+        db.rollback()
+        record_stage_duration("analyzing", "lease_lost", time.perf_counter() - started)
     except AnalyzeError as exc:
         schedule_retry_or_dead_letter(
             db,
@@ -457,6 +536,7 @@ def analyze_job(db: Session, snapshot: AnalyzeSnapshot) -> None:
             stage='analyzing',
             error_code=exc.code,
             message=str(exc),
+            owner=lease.owner,
         )
         db.commit()
         record_stage_duration("analyzing", "error", time.perf_counter() - started)
@@ -468,6 +548,7 @@ def analyze_job(db: Session, snapshot: AnalyzeSnapshot) -> None:
             stage='analyzing',
             error_code='UNEXPECTED_ANALYZE_ERROR',
             message=str(exc),
+            owner=lease.owner,
         )
         db.commit()
         record_stage_duration("analyzing", "error", time.perf_counter() - started)
@@ -0,0 +1,73 @@
+"""Chunk spans cached by git blob SHA, shared across repos, forks and commits.
+
+A file's chunk boundaries depend only on its bytes, its language (from the path) and the
+chunker itself (version, grammar packages, line limits; see chunking.chunker_fingerprint).
+Keying on all of those lets an identical file anywhere skip tree-sitter entirely: the parse
+stage rebuilds chunk text from the cached (start, end) line spans. Identical chunk text then
+hits the content-addressed embedding cache as well.
+
+Only spans are stored, not text, so entries are a few hundred bytes. Like the embedding
+cache, Redis is best-effort: any error reads as a miss and parsing proceeds normally.
+"""
+
+import json
+
+try:
+    import redis
+except Exception:  # pragma: no cover - redis is a runtime dep; keep cache import-safe without it
+    redis = None
+
+from config import settings
+
+_client = None
+_client_ready = False
+
+
+def _get_client():
+    global _client, _client_ready
+    if not _client_ready:
+        _client_ready = True
+        if redis is None:
+            _client = None
+        else:
+            try:
+                _client = redis.Redis.from_url(settings.redis_url, decode_responses=False)
+            except Exception:
+                _client = None
+    return _client
+
+
+def span_key(fingerprint: str, language: str, blob_sha: str) -> str:
+    return f"chunkcache:{fingerprint}:{language}:{blob_sha}"
+
+
+def lookup_spans(keys: list[str]) -> list[list[tuple[int, int]] | None]:
+    """Cached spans per key, or None for a miss. An empty list is a valid hit (blank file)."""
+    client = _get_client()
+    if client is None or not keys:
+        return [None] * len(keys)
+    try:
+        raws = client.mget(keys)
+    except Exception:
+        return [None] * len(keys)
+
+    found: list[list[tuple[int, int]] | None] = []
+    for raw in raws:
+        try:
+            found.append([(int(start), int(end)) for start, end in json.loads(raw)] if raw is not None else None)
+        except (ValueError, TypeError):
+            found.append(None)
+    return found
+
+
+def store_spans(entries: list[tuple[str, list[tuple[int, int]]]], ttl_seconds: int) -> None:
+    client = _get_client()
+    if client is None or not entries:
+        return
+    try:
+        pipe = client.pipeline()
+        for key, spans in entries:
+            pipe.set(key, json.dumps([[start, end] for start, end in spans], separators=(",", ":")), ex=ttl_seconds)
+        pipe.execute()
+    except Exception:
+        pass
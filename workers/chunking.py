@@ -5,20 +5,39 @@ chunk is a coherent unit instead of an arbitrary line window. Gaps between defin
 (imports, module-level statements) become their own chunks, and any unit larger than the
 configured max is further split with a line window so chunk sizes stay bounded.
 
+Sizes are measured in one of two units. "lines" is the original fixed line budget. "tokens"
+targets the embedder's input window using a local token estimate: an oversized definition is
+first split at its nested definitions (methods inside a class, functions inside a module
+block), and only a unit with no nested definitions falls back to a token window. Adjacent
+small units are then packed together up to the budget, so chunks come out close to one size
+instead of varying by an order of magnitude.
+
 If tree-sitter or a language grammar is unavailable, chunk_code raises ChunkingUnavailable
 and the caller falls back to plain line-window chunking.
 """
 
+import hashlib
+import re
+from importlib import metadata
+
 try:
     from tree_sitter_language_pack import get_parser
 except Exception:  # pragma: no cover - optional dependency path
     get_parser = None
 
+# Bump whenever span selection changes, so cached spans from the old logic stop matching.
+CHUNKER_VERSION = 1
+
 
 class ChunkingUnavailable(RuntimeError):
     pass
 
 
+# Loaded grammars, per process: get_parser() builds a fresh Parser on every call, and parse
+# pool processes chunk thousands of files with a handful of grammars.
+_PARSERS: dict[str, object] = {}
+
+
 # File extension (or bare filename for extensionless files) -> tree-sitter grammar name.
 TS_LANGUAGE_BY_KEY = {
     "py": "python",
@@ -65,10 +84,149 @@ DEFINITION_TYPES = {
 }
 
 
+def _package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "none"
+
+
+def chunker_fingerprint(max_size: int, overlap_size: int, unit: str = "lines") -> str:
+    """Identifies everything besides file content that decides the spans chunk_file produces."""
+    parts = [
+        str(CHUNKER_VERSION),
+        _package_version("tree-sitter"),
+        _package_version("tree-sitter-language-pack") if get_parser is not None else "none",
+        str(max_size),
+        str(overlap_size),
+        unit,
+    ]
+    return hashlib.sha256(":".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
 def ts_language_for(key: str) -> str | None:
     return TS_LANGUAGE_BY_KEY.get((key or "").lower())
 
 
+# Words (identifier/number runs) and single punctuation characters. WordPiece/BPE vocabularies
+# split long identifiers into several pieces, so a word costs one token per ~4 characters.
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, dependency-free approximation of an embedding tokenizer's count for code."""
+    total = 0
+    for match in _TOKEN_RE.finditer(text):
+        length = match.end() - match.start()
+        total += (length + 3) // 4 if length > 1 else 1
+    return total
+
+
+def _token_window(
+    start: int, end: int, weights: list[int], max_tokens: int, overlap_tokens: int
+) -> list[tuple[int, int]]:
+    """Pack whole lines of an inclusive 1-indexed [start, end] range into <= max_tokens pieces.
+
+    weights[i] is the token count of line i + 1. A single line over budget becomes its own piece.
+    Each piece after the first repeats trailing lines of the previous one worth <= overlap_tokens.
+    """
+    spans: list[tuple[int, int]] = []
+    cursor = start
+    while cursor <= end:
+        stop = cursor
+        used = weights[cursor - 1]
+        while stop < end and used + weights[stop] <= max_tokens:
+            used += weights[stop]
+            stop += 1
+        spans.append((cursor, stop))
+        if stop == end:
+            break
+        back = stop
+        carried = 0
+        while back > cursor and carried + weights[back - 1] <= overlap_tokens:
+            carried += weights[back - 1]
+            back -= 1
+        cursor = back + 1
+    return spans
+
+
+def _nested_definitions(node) -> list:
+    """Outermost definition nodes strictly inside node (not node itself)."""
+    found = []
+    stack = list(reversed(node.named_children))
+    while stack:
+        child = stack.pop()
+        if child.type in DEFINITION_TYPES:
+            found.append(child)
+        else:
+            stack.extend(reversed(child.named_children))
+    return found
+
+
+def _split_by_tokens(
+    node, start: int, end: int, weights: list[int], max_tokens: int, overlap_tokens: int
+) -> list[tuple[int, int]]:
+    """Split [start, end] (covering node) at nested definitions until each piece fits max_tokens."""
+    if sum(weights[start - 1:end]) <= max_tokens:
+        return [(start, end)]
+
+    children = _nested_definitions(node) if node is not None else []
+    if not children:
+        return _token_window(start, end, weights, max_tokens, overlap_tokens)
+
+    spans: list[tuple[int, int]] = []
+    cursor = start
+    for child in children:
+        # Clamp: definitions sharing a line with their neighbour (one-liners) must not overlap.
+        child_start = max(child.start_point[0] + 1, cursor)
+        child_end = min(child.end_point[0] + 1, end)
+        if child_end < child_start:
+            continue
+        if child_start > cursor:
+            spans.extend(_split_by_tokens(None, cursor, child_start - 1, weights, max_tokens, overlap_tokens))
+        spans.extend(_split_by_tokens(child, child_start, child_end, weights, max_tokens, overlap_tokens))
+        cursor = child_end + 1
+    if cursor <= end:
+        spans.extend(_split_by_tokens(None, cursor, end, weights, max_tokens, overlap_tokens))
+    return spans
+
+
+def _pack(spans: list[tuple[int, int]], weights: list[int], max_tokens: int) -> list[tuple[int, int]]:
+    """Merge runs of adjacent spans while the merged span stays within max_tokens.
+
+    Overlapping window pieces are never adjacent, so they are left alone.
+    """
+    packed: list[tuple[int, int]] = []
+    packed_tokens = 0
+    for start, end in spans:
+        tokens = sum(weights[start - 1:end])
+        if packed and packed[-1][1] + 1 == start and packed_tokens + tokens <= max_tokens:
+            packed[-1] = (packed[-1][0], end)
+            packed_tokens += tokens
+        else:
+            packed.append((start, end))
+            packed_tokens = tokens
+    return packed
+
+
+def _materialize(lines: list[str], spans: list[tuple[int, int]]) -> list[tuple[int, int, str]]:
+    out: list[tuple[int, int, str]] = []
+    for start, end in spans:
+        text = "\n".join(lines[start - 1:end])
+        if text.strip():
+            out.append((start, end, text))
+    return out
+
+
+def chunk_tokens(content: str, max_tokens: int, overlap_tokens: int) -> list[tuple[int, int, str]]:
+    """Token-budget window over a whole file, for languages without a grammar."""
+    lines = content.splitlines()
+    if not lines:
+        return []
+    weights = [estimate_tokens(line) for line in lines]
+    return _materialize(lines, _token_window(1, len(lines), weights, max_tokens, overlap_tokens))
+
+
 def _window(start: int, end: int, max_lines: int, overlap_lines: int) -> list[tuple[int, int]]:
     """Line-window an inclusive 1-indexed [start, end] range into <= max_lines pieces."""
     spans: list[tuple[int, int]] = []
@@ -84,13 +242,18 @@ def _window(start: int, end: int, max_lines: int, overlap_lines: int) -> list[tu
     return spans
 
 
-def chunk_code(content: str, ts_language: str, max_lines: int, overlap_lines: int) -> list[tuple[int, int, str]]:
+def chunk_code(
+    content: str, ts_language: str, max_size: int, overlap_size: int, unit: str = "lines"
+) -> list[tuple[int, int, str]]:
     if get_parser is None:
         raise ChunkingUnavailable("tree-sitter-language-pack is not installed")
-    try:
-        parser = get_parser(ts_language)
-    except Exception as exc:  # pragma: no cover - grammar load failure
-        raise ChunkingUnavailable(f"no grammar for {ts_language}: {exc}") from exc
+    parser = _PARSERS.get(ts_language)
+    if parser is None:
+        try:
+            parser = get_parser(ts_language)
+        except Exception as exc:  # pragma: no cover - grammar load failure
+            raise ChunkingUnavailable(f"no grammar for {ts_language}: {exc}") from exc
+        _PARSERS[ts_language] = parser
 
     lines = content.splitlines()
     total = len(lines)
@@ -100,6 +263,11 @@ def chunk_code(content: str, ts_language: str, max_lines: int, overlap_lines: in
     tree = parser.parse(content.encode("utf-8", errors="ignore"))
     root = tree.root_node
 
+    if unit == "tokens":
+        weights = [estimate_tokens(line) for line in lines]
+        spans = _split_by_tokens(root, 1, total, weights, max_size, overlap_size)
+        return _materialize(lines, _pack(spans, weights, max_size))
+
     # Build ordered spans: definition nodes stay whole; the gaps between them are grouped.
     raw_spans: list[tuple[int, int]] = []
     cursor = 1
@@ -117,12 +285,11 @@ def chunk_code(content: str, ts_language: str, max_lines: int, overlap_lines: in
     if not raw_spans:  # no top-level definitions detected
         raw_spans = [(1, total)]
 
-    # Bound each span to max_lines and materialize non-blank chunks.
-    out: list[tuple[int, int, str]] = []
+    # Bound each span to max_size lines and materialize non-blank chunks.
+    bounded: list[tuple[int, int]] = []
     for start, end in raw_spans:
-        pieces = [(start, end)] if (end - start + 1) <= max_lines else _window(start, end, max_lines, overlap_lines)
-        for piece_start, piece_end in pieces:
-            text = "\n".join(lines[piece_start - 1:piece_end])
-            if text.strip():
-                out.append((piece_start, piece_end, text))
-    return out
+        if (end - start + 1) <= max_size:
+            bounded.append((start, end))
+        else:
+            bounded.extend(_window(start, end, max_size, overlap_size))
+    return _materialize(lines, bounded)
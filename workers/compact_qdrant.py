@@ -0,0 +1,137 @@
+"""Offline reconciliation of the Qdrant collection against code_chunks.
+
+embed_job sweeps a repo's stale points at the end of every full re-embed, but a sweep can fail
+(Qdrant down, worker killed after commit) and collections written before deterministic point IDs
+still carry every historical copy. This command scrolls the whole collection and:
+
+- deletes points no code_chunks row references (skipping generations still being embedded);
+- clears code_chunks.qdrant_point_id where the point is gone, so the next embed run refills it.
+
+Run it from the worker image: `python compact_qdrant.py [--dry-run]`.
+"""
+
+import argparse
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from embed_worker import _points_url, _qdrant_headers, _request_with_retries, delete_chunk_points
+
+
+def scroll_points(offset: str | None, limit: int) -> tuple[list[dict], str | None]:
+    body = {'limit': limit, 'with_payload': ['repo_id', 'generation'], 'with_vector': False}
+    if offset is not None:
+        body['offset'] = offset
+    data = _request_with_retries('POST', _points_url('/scroll'), json_body=body, allowed_statuses={404}, headers=_qdrant_headers())
+    result = (data or {}).get('result') or {}
+    return result.get('points') or [], result.get('next_page_offset')
+
+
+def retrieve_existing_points(point_ids: list[str]) -> set[str]:
+    if not point_ids:
+        return set()
+    body = {'ids': point_ids, 'with_payload': False, 'with_vector': False}
+    data = _request_with_retries('POST', _points_url(), json_body=body, allowed_statuses={404}, headers=_qdrant_headers())
+    return {str(point['id']) for point in (data or {}).get('result') or []}
+
+
+def active_generations(db: Session) -> set[str]:
+    # Points are upserted before their IDs are written back to code_chunks, so an in-flight
+    # embed run looks exactly like a pile of orphans.
+    rows = db.execute(text("SELECT id::text AS job_id FROM analysis_jobs WHERE status = 'embedding'")).mappings().all()
+    return {row['job_id'] for row in rows}
+
+
+def referenced_point_ids(db: Session, point_ids: list[str]) -> set[str]:
+    if not point_ids:
+        return set()
+    rows = db.execute(
+        text(
+            """
+            SELECT qdrant_point_id::text AS qdrant_point_id
+            FROM code_chunks
+            WHERE qdrant_point_id = ANY(CAST(:point_ids AS uuid[]))
+            """
+        ),
+        {'point_ids': point_ids},
+    ).mappings().all()
+    return {row['qdrant_point_id'] for row in rows}
+
+
+def delete_orphan_points(db: Session, *, page_size: int = 256, dry_run: bool = False) -> tuple[int, int]:
+    scanned = 0
+    orphaned = 0
+    skip_generations = active_generations(db)
+    offset: str | None = None
+
+    while True:
+        points, offset = scroll_points(offset, page_size)
+        scanned += len(points)
+        candidates = [
+            str(point['id'])
+            for point in points
+            if (point.get('payload') or {}).get('generation') not in skip_generations
+        ]
+        known = referenced_point_ids(db, candidates)
+        orphans = [point_id for point_id in candidates if point_id not in known]
+        orphaned += len(orphans)
+        if orphans and not dry_run:
+            delete_chunk_points(orphans)
+        if offset is None:
+            return scanned, orphaned
+
+
+def reset_missing_point_ids(db: Session, *, page_size: int = 256, dry_run: bool = False) -> int:
+    reset = 0
+    after = '00000000-0000-0000-0000-000000000000'
+
+    while True:
+        rows = db.execute(
+            text(
+                """
+                SELECT id::text AS id, qdrant_point_id::text AS qdrant_point_id
+                FROM code_chunks
+                WHERE qdrant_point_id IS NOT NULL
+                  AND id > CAST(:after AS uuid)
+                ORDER BY id
+                LIMIT :limit
+                """
+            ),
+            {'after': after, 'limit': page_size},
+        ).mappings().all()
+        if not rows:
+            return reset
+
+        after = rows[-1]['id']
+        existing = retrieve_existing_points([row['qdrant_point_id'] for row in rows])
+        missing = [row['id'] for row in rows if row['qdrant_point_id'] not in existing]
+        reset += len(missing)
+        if missing and not dry_run:
+            db.execute(
+                text('UPDATE code_chunks SET qdrant_point_id = NULL WHERE id = ANY(CAST(:chunk_ids AS uuid[]))'),
+                {'chunk_ids': missing},
+            )
+            db.commit()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Reconcile the Qdrant collection against code_chunks.')
+    parser.add_argument('--dry-run', action='store_true', help='report what would change without writing')
+    parser.add_argument('--page-size', type=int, default=256)
+    args = parser.parse_args(argv)
+
+    from db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        scanned, orphaned = delete_orphan_points(db, page_size=args.page_size, dry_run=args.dry_run)
+        reset = reset_missing_point_ids(db, page_size=args.page_size, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    verb = 'would delete' if args.dry_run else 'deleted'
+    print(f"Scanned {scanned} points; {verb} {orphaned} orphans; {reset} chunks pointed at missing points.")
+
+
+if __name__ == '__main__':
+    main()
@@ -11,10 +11,32 @@ class WorkerSettings(BaseSettings):
     qdrant_api_key: str | None = None
 
     parse_clone_timeout_seconds: int = 60
+    # Bare-mirror clone cache (see mirrors.py); empty dir = <tmp>/devlens-mirrors, 0 MB = no cache.
+    parse_mirror_dir: str = ''
+    parse_mirror_max_mb: int = 10240
     parse_max_files: int = 8000
     parse_max_chunks: int = 20000
+    # "tokens": size chunks by estimated embedder tokens; "lines": fixed line windows.
+    parse_chunk_mode: str = 'tokens'
+    parse_chunk_max_tokens: int = 480  # under the embed model's 512-token input window
+    parse_chunk_overlap_tokens: int = 32
     parse_chunk_lines: int = 120
     parse_chunk_overlap_lines: int = 20
+    # "git": read blobs via ls-tree + cat-file --batch (no checkout); "checkout": walk a working tree.
+    parse_ingest_mode: str = 'git'
+    # Pre-chunk classifier (source_filter.py): skip binary/minified/generated/vendored files.
+    parse_skip_generated: bool = True
+    parse_max_file_bytes: int = 1000000
+    parse_max_line_length: int = 1000
+    # Blob-SHA keyed chunk span cache in Redis (git ingest only); 0 disables.
+    parse_chunk_cache_ttl_seconds: int = 2592000  # 30 days
+    # Processes for file reading + tree-sitter chunking; 0 = one per CPU core.
+    parse_chunk_workers: int = 0
+    # Re-chunk only files changed since repositories.indexed_commit_sha (full re-index otherwise).
+    parse_incremental: bool = True
+
+    # Rows per page/fetch when embed and analyze stream code_chunks.
+    chunk_load_page_size: int = 500
 
     # Embeddings (NVIDIA NIM, OpenAI-compatible /embeddings endpoint)
     nim_base_url: AnyHttpUrl = "https://integrate.api.nvidia.com/v1"
@@ -24,10 +46,26 @@ class WorkerSettings(BaseSettings):
     embed_timeout_seconds: int = 15
     embed_batch_size: int = 32
     embed_retry_attempts: int = 3
+    # Embed+upsert batches kept in flight at once; lower it if the provider rate-limits (429s).
+    embed_max_in_flight: int = 4
     embed_cache_ttl_seconds: int = 604800  # 7 days; content-addressed embedding cache
+    embed_cache_dtype: str = "float32"  # float16 halves Redis memory again at ~3 significant digits
+    embed_cache_local_entries: int = 2048  # in-process LRU in front of Redis; 0 disables
+    # Shared pooled HTTP clients (http_clients.py), one pool per upstream.
+    http_client_timeout_seconds: float = 20.0
+    http_client_max_connections: int = 20
+    http_client_max_keepalive_connections: int = 10
+    http_client_keepalive_expiry_seconds: float = 30.0
+    http_client_http2: bool = False  # needs the h2 package (httpx[http2])
     worker_retry_max_attempts: int = 3
     worker_retry_base_delay_seconds: int = 30
     worker_metrics_port: int = 9101
+    # Safety-net poll while idle; new work normally arrives via LISTEN/NOTIFY (see dispatch.py).
+    worker_poll_interval_seconds: int = 10
+    # Visibility timeout on a claimed stage; renewed every lease/3 while the stage runs.
+    worker_lease_seconds: int = 120
+    # Claim owner recorded on analysis_jobs.claimed_by; defaults to "<hostname>:<pid>".
+    worker_id: str | None = None
 
     # LLM summary generation routing
     llm_summary_provider: str = "openrouter"
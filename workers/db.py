@@ -14,3 +14,8 @@ def _normalize_database_url(url: str) -> str:
 
 engine = create_engine(_normalize_database_url(settings.database_url), pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def raw_conninfo() -> str:
+    """libpq URI for dedicated psycopg connections that live outside the SQLAlchemy pool."""
+    return engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
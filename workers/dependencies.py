@@ -0,0 +1,100 @@
+"""File-level import edges, extracted once per indexed commit.
+
+Mirrors the regex extraction and resolution in backend/app/services/dependency_graph.py; the
+backend serves the resulting edges from the file_dependencies table instead of re-scanning
+every chunk on each request. Keep the two in sync.
+
+Extraction and resolution are split: import references depend only on a file's own content,
+while resolving them to files depends on the set of paths in the commit. Files whose content
+did not change keep their edges as long as that path set is unchanged.
+"""
+
+import posixpath
+import re
+
+PY_IMPORT_RE = re.compile(r"^\s*import\s+([^\n#]+)", re.MULTILINE)
+PY_FROM_IMPORT_RE = re.compile(r"^\s*from\s+([a-zA-Z0-9_\.]+)\s+import\s+", re.MULTILINE)
+JS_IMPORT_RE = re.compile(r"""(?:import|export)\s+(?:[^'"]+?\s+from\s+)?['"]([^'"]+)['"]""")
+JS_REQUIRE_RE = re.compile(r"""require\(\s*['"]([^'"]+)['"]\s*\)""")
+
+JS_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs")
+
+ImportRef = tuple[str, str]  # (module or relative specifier, kind)
+Edge = tuple[str, str, str]  # (source_path, target_path, kind)
+
+
+def file_text(spans: list[tuple[int, int, str]]) -> str:
+    """Rebuild a file's text from its (possibly overlapping) 1-indexed chunk spans."""
+    lines: dict[int, str] = {}
+    for start, _end, content in spans:
+        for offset, line in enumerate(content.split("\n")):
+            lines.setdefault(start + offset, line)
+    return "\n".join(lines[number] for number in sorted(lines))
+
+
+def extract_import_refs(file_path: str, content: str) -> list[ImportRef]:
+    refs: list[ImportRef] = []
+    if file_path.endswith(".py"):
+        for match in PY_IMPORT_RE.findall(content):
+            for module in [part.strip() for part in match.split(",") if part.strip()]:
+                if " as " in module:
+                    module = module.split(" as ", 1)[0].strip()
+                refs.append((module, "python"))
+        refs.extend((module, "python") for module in PY_FROM_IMPORT_RE.findall(content))
+    if file_path.endswith(JS_EXTENSIONS):
+        for ref in JS_IMPORT_RE.findall(content) + JS_REQUIRE_RE.findall(content):
+            refs.append((ref, "javascript"))
+    return refs
+
+
+def _resolve_python_import(source_file: str, imported_module: str, files: set[str]) -> str | None:
+    candidate = imported_module.strip(".").replace(".", "/")
+    if not candidate:
+        return None
+    candidate_file = f"{candidate}.py"
+    if candidate_file in files:
+        return candidate_file
+
+    package_init = f"{candidate}/__init__.py"
+    if package_init in files:
+        return package_init
+
+    source_dir = posixpath.dirname(source_file)
+    if source_dir:
+        local_candidate = posixpath.normpath(posixpath.join(source_dir, candidate_file))
+        if local_candidate in files:
+            return local_candidate
+
+    return None
+
+
+def _resolve_js_import(source_file: str, imported_ref: str, files: set[str]) -> str | None:
+    if not imported_ref.startswith("."):
+        return None
+
+    base_path = posixpath.normpath(posixpath.join(posixpath.dirname(source_file), imported_ref))
+    if base_path.endswith(JS_EXTENSIONS):
+        candidates = [base_path]
+    else:
+        candidates = []
+        for ext in JS_EXTENSIONS:
+            candidates.append(base_path + ext)
+            candidates.append(posixpath.join(base_path, f"index{ext}"))
+
+    for candidate in candidates:
+        if candidate in files:
+            return candidate
+    return None
+
+
+def resolve_edges(refs_by_file: dict[str, list[ImportRef]], files: set[str]) -> set[Edge]:
+    edges: set[Edge] = set()
+    for source, refs in refs_by_file.items():
+        for ref, kind in refs:
+            if kind == "python":
+                target = _resolve_python_import(source, ref, files)
+            else:
+                target = _resolve_js_import(source, ref, files)
+            if target and target != source:
+                edges.add((source, target, kind))
+    return edges
@@ -138,3 +138,36 @@ def compute_commit_diff(repo_path: str, head_sha: str, timeout: int = 60) -> dic
         "changed_files": changed_files,
         "security_flags": detect_security_touches(changed_files),
     }
+
+
+def parse_name_status(output: str) -> dict[str, set[str]]:
+    """Parse `git diff --name-status --no-renames -z` into changed and deleted path sets."""
+    changed: set[str] = set()
+    deleted: set[str] = set()
+    fields = [field for field in output.split("\0") if field]
+    for status, path in zip(fields[0::2], fields[1::2]):
+        if status.startswith("D"):
+            deleted.add(path)
+        else:
+            changed.add(path)
+    return {"changed": changed, "deleted": deleted}
+
+
+def compute_changed_paths(repo_path: str, base_sha: str, head_sha: str, timeout: int = 60) -> dict[str, set[str]] | None:
+    """Paths that differ between two commits. Best-effort: returns None on failure.
+
+    Renames are reported as a delete plus an add so callers only handle two cases.
+    """
+    try:
+        try:
+            _run_git(["fetch", "--depth", "1", "origin", base_sha], cwd=repo_path, timeout=timeout)
+        except Exception:
+            pass  # already present, or unreachable; the diff below decides
+        output = _run_git(
+            ["diff", "--name-status", "--no-renames", "-z", base_sha, head_sha],
+            cwd=repo_path,
+            timeout=timeout,
+        )
+    except Exception:
+        return None
+    return parse_name_status(output)
@@ -0,0 +1,72 @@
+"""Event-driven job wake-ups via Postgres LISTEN/NOTIFY.
+
+A trigger on analysis_jobs (backend migration 20261016_0010) NOTIFYs the `devlens_jobs`
+channel whenever a row becomes claimable: a new job is queued, a stage hands off to the next
+one, or a claim is released. Workers block on that channel instead of sleep-polling, so the
+parse -> embed -> analyze hand-off happens as soon as the previous stage commits.
+
+The wait timeout doubles as a safety-net poll: it covers missed notifications (e.g. while the
+listener reconnects) and retries whose next_retry_at has just elapsed, which never NOTIFY.
+"""
+
+import logging
+import time
+
+try:
+    import psycopg
+except Exception:  # pragma: no cover - psycopg is a runtime dep; keep import-safe without it
+    psycopg = None
+
+logger = logging.getLogger("devlens.worker.dispatch")
+
+JOB_CHANNEL = "devlens_jobs"
+
+
+class JobListener:
+    def __init__(self, conninfo: str, channel: str = JOB_CHANNEL) -> None:
+        self._conninfo = conninfo
+        self._channel = channel
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is not None and not self._conn.closed:
+            return self._conn
+        if psycopg is None:
+            return None
+        try:
+            conn = psycopg.connect(self._conninfo, autocommit=True)
+            conn.execute(f"LISTEN {self._channel}")
+        except Exception as exc:
+            logger.warning("job listener connect failed; polling only: %s", exc)
+            return None
+        self._conn = conn
+        return conn
+
+    def wait(self, timeout: float) -> bool:
+        """Block until a job notification arrives or timeout elapses. Returns True if woken."""
+        conn = self._connect()
+        if conn is None:
+            time.sleep(timeout)
+            return False
+        try:
+            woken = False
+            for _ in conn.notifies(timeout=timeout, stop_after=1):
+                woken = True
+            if woken:
+                # Coalesce a burst of hand-offs into a single wake-up.
+                for _ in conn.notifies(timeout=0):
+                    pass
+            return woken
+        except Exception as exc:
+            logger.warning("job listener dropped; reconnecting on next wait: %s", exc)
+            self.close()
+            time.sleep(timeout)
+            return False
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
@@ -5,12 +5,20 @@ once and reused across re-analyses of the same repo (unchanged content is near-f
 even across repos. Keying on content hash rather than (repo, commit) maximizes reuse while
 still guaranteeing correctness: the same text always maps to the same vector for a model.
 
+Vectors are stored as packed little-endian floats behind a small versioned header (float32 by
+default, float16 via EMBED_CACHE_DTYPE), about a fifth of the JSON encoding and decoded with a
+single struct.unpack. Legacy JSON values are still readable. An optional in-process LRU tier
+(EMBED_CACHE_LOCAL_ENTRIES) sits in front of Redis and holds the same packed bytes.
+
 Redis is best-effort: any cache error falls back to embedding directly, so the pipeline
 never fails because of the cache.
 """
 
 import hashlib
 import json
+import struct
+import threading
+from collections import OrderedDict
 from typing import Callable
 
 try:
@@ -23,6 +31,46 @@ from config import settings
 _client = None
 _client_ready = False
 
+# Header: magic, format version, struct dtype code ('f' = float32, 'e' = float16).
+_MAGIC = b"EV"
+_VERSION = 1
+_DTYPE_CODES = {"float32": "f", "float16": "e"}
+
+
+class _LocalTier:
+    """Thread-safe LRU of packed vectors; the embed pipeline calls the cache from pool threads."""
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]:
+        with self._lock:
+            found: list[bytes | None] = []
+            for key in keys:
+                raw = self._entries.get(key)
+                if raw is not None:
+                    self._entries.move_to_end(key)
+                found.append(raw)
+            return found
+
+    def put_many(self, items: list[tuple[str, bytes]], capacity: int) -> None:
+        if capacity <= 0:
+            return
+        with self._lock:
+            for key, raw in items:
+                self._entries[key] = raw
+                self._entries.move_to_end(key)
+            while len(self._entries) > capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_local = _LocalTier()
+
 
 def _get_client():
     global _client, _client_ready
@@ -32,7 +80,7 @@ def _get_client():
             _client = None
         else:
             try:
-                _client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+                _client = redis.Redis.from_url(settings.redis_url, decode_responses=False)
             except Exception:
                 _client = None
     return _client
@@ -43,48 +91,86 @@ def _key(model: str, content: str) -> str:
     return f"embedcache:{model}:{digest}"
 
 
+def encode_vector(vector: list[float], dtype: str = "float32") -> bytes:
+    code = _DTYPE_CODES.get(dtype, "f")
+    return _MAGIC + bytes((_VERSION, ord(code))) + struct.pack(f"<{len(vector)}{code}", *vector)
+
+
+def decode_vector(raw: bytes | str) -> list[float]:
+    if isinstance(raw, bytes) and raw[:2] == _MAGIC:
+        if raw[2] != _VERSION:
+            raise ValueError(f"unsupported embedding cache version {raw[2]}")
+        code = chr(raw[3])
+        width = struct.calcsize(f"<{code}")
+        return list(struct.unpack(f"<{(len(raw) - 4) // width}{code}", raw[4:]))
+    # Entries written before the binary format were JSON arrays.
+    return json.loads(raw)
+
+
 def embed_with_cache(
     texts: list[str],
     embed_fn: Callable[[list[str]], list[list[float]]],
     model: str,
     ttl_seconds: int,
 ) -> list[list[float]]:
-    """Return vectors for texts, serving cache hits from Redis and embedding only misses."""
+    """Return vectors for texts, serving hits from the local tier, then Redis; embeds only misses."""
     if not texts:
         return []
 
+    keys = [_key(model, t) for t in texts]
+    local_capacity = settings.embed_cache_local_entries
+    result: list[list[float] | None] = [None] * len(texts)
+    local_hits = _local.get_many(keys) if local_capacity > 0 else [None] * len(keys)
+    missing = _fill_from(local_hits, result, range(len(texts)))
+    promote: list[tuple[str, bytes]] = []
+
     client = _get_client()
-    if client is None:
-        return embed_fn(texts)
+    if missing and client is not None:
+        try:
+            cached = client.mget([keys[i] for i in missing])
+        except Exception:
+            cached = [None] * len(missing)
+        still_missing = _fill_from(cached, result, missing)
+        promote = [(keys[i], _packed(raw, result[i])) for i, raw in zip(missing, cached) if result[i] is not None]
+        missing = still_missing
 
-    keys = [_key(model, t) for t in texts]
-    try:
-        cached = client.mget(keys)
-    except Exception:
-        return embed_fn(texts)
+    if missing:
+        new_vectors = embed_fn([texts[i] for i in missing])
+        encoded: list[tuple[str, bytes]] = []
+        for slot, idx in enumerate(missing):
+            result[idx] = new_vectors[slot]
+            encoded.append((keys[idx], encode_vector(new_vectors[slot], settings.embed_cache_dtype)))
+        promote.extend(encoded)
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                for key, raw in encoded:
+                    pipe.set(key, raw, ex=ttl_seconds)
+                pipe.execute()
+            except Exception:
+                # Store failed; still return freshly computed vectors.
+                pass
 
-    result: list[list[float] | None] = [None] * len(texts)
+    _local.put_many(promote, local_capacity)
+    return [vec if vec is not None else [] for vec in result]
+
+
+def _fill_from(raws, result: list[list[float] | None], indices) -> list[int]:
+    """Decode raws into result at indices; returns the indices still missing."""
     missing: list[int] = []
-    for i, raw in enumerate(cached):
+    for idx, raw in zip(indices, raws):
         if raw:
             try:
-                result[i] = json.loads(raw)
+                result[idx] = decode_vector(raw)
                 continue
-            except (ValueError, TypeError):
+            except (ValueError, TypeError, struct.error):
                 pass
-        missing.append(i)
+        missing.append(idx)
+    return missing
 
-    if missing:
-        new_vectors = embed_fn([texts[i] for i in missing])
-        try:
-            pipe = client.pipeline()
-            for slot, idx in enumerate(missing):
-                result[idx] = new_vectors[slot]
-                pipe.set(keys[idx], json.dumps(new_vectors[slot]), ex=ttl_seconds)
-            pipe.execute()
-        except Exception:
-            # Store failed; still return freshly computed vectors.
-            for slot, idx in enumerate(missing):
-                result[idx] = new_vectors[slot]
 
-    return [vec if vec is not None else [] for vec in result]
+def _packed(raw: bytes | str, vector: list[float]) -> bytes:
+    # Legacy JSON hits are re-packed so the local tier never parses JSON twice.
+    if isinstance(raw, bytes) and raw[:2] == _MAGIC:
+        return raw
+    return encode_vector(vector, settings.embed_cache_dtype)
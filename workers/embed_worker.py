@@ -1,6 +1,12 @@
+import logging
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from dataclasses import dataclass
-from uuid import uuid4
+from itertools import chain, islice
+from typing import Iterable, Iterator
+from uuid import UUID, uuid5
 
 import httpx
 from sqlalchemy import text
@@ -9,9 +15,16 @@ from sqlalchemy.orm import Session
 from config import settings
 from embed_cache import embed_with_cache
 from embeddings import embed_texts
+from http_clients import get_http_client
 from parse_worker import update_job_status
-from reliability import schedule_retry_or_dead_letter
-from telemetry import record_stage_duration, trace_span
+from reliability import JobLease, LeaseLost, schedule_retry_or_dead_letter, worker_identity
+from telemetry import record_stage_duration, record_stale_point_cleanup_failure, trace_span
+
+logger = logging.getLogger("devlens.worker.embed")
+
+# Point IDs are derived from chunk IDs, so a retried or repeated embed of the same chunk
+# overwrites its vector instead of adding another one.
+POINT_ID_NAMESPACE = UUID('5b0e4c61-3f5e-4d8a-9a49-2f1f7c3d6e10')
 
 
 class EmbedError(RuntimeError):
@@ -42,15 +55,28 @@ def fetch_next_embed_job(db: Session) -> EmbedSnapshot | None:
     row = db.execute(
         text(
             """
-            SELECT id::text AS job_id, repo_id::text AS repo_id
-            FROM analysis_jobs
-            WHERE status = 'embedding'
-              AND (next_retry_at IS NULL OR next_retry_at <= NOW())
-            ORDER BY created_at ASC
-            LIMIT 1
+            WITH next_job AS (
+                SELECT id
+                FROM analysis_jobs
+                WHERE status = 'embedding'
+                  AND claimed_by IS NULL
+                  AND (next_retry_at IS NULL OR next_retry_at <= NOW())
+                ORDER BY created_at ASC
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE analysis_jobs j
+            SET claimed_by = :worker_id,
+                claimed_at = NOW(),
+                lease_expires_at = NOW() + make_interval(secs => :lease_seconds)
+            FROM next_job
+            WHERE j.id = next_job.id
+            RETURNING j.id::text AS job_id, j.repo_id::text AS repo_id
             """
-        )
+        ),
+        {'worker_id': worker_identity(), 'lease_seconds': settings.worker_lease_seconds},
     ).mappings().first()
+    db.commit()
 
     if not row:
         return None
@@ -58,30 +84,55 @@ def fetch_next_embed_job(db: Session) -> EmbedSnapshot | None:
     return EmbedSnapshot(job_id=row['job_id'], repo_id=row['repo_id'])
 
 
-def load_repo_chunks(db: Session, repo_id: str) -> list[ChunkRecord]:
-    rows = db.execute(
-        text(
-            """
-            SELECT id::text, file_path, start_line, end_line, content, language
-            FROM code_chunks
-            WHERE repo_id = CAST(:repo_id AS uuid)
-            ORDER BY created_at ASC
-            """
-        ),
+def load_repo_chunks(db: Session, repo_id: str, *, only_unembedded: bool = False) -> Iterator[ChunkRecord]:
+    """Stream the repo's chunks in keyset pages of chunk_load_page_size rows.
+
+    Pages are separate statements rather than one server-side cursor because embed_job commits
+    between batches, which would close a cursor mid-scan.
+    """
+    # An incremental parse keeps untouched chunks (and their point IDs), so only the rows it
+    # re-inserted need vectors.
+    unembedded_filter = 'AND qdrant_point_id IS NULL' if only_unembedded else ''
+    after = '00000000-0000-0000-0000-000000000000'
+    while True:
+        rows = db.execute(
+            text(
+                f"""
+                SELECT id::text, file_path, start_line, end_line, content, language
+                FROM code_chunks
+                WHERE repo_id = CAST(:repo_id AS uuid)
+                  AND id > CAST(:after AS uuid)
+                  {unembedded_filter}
+                ORDER BY id
+                LIMIT :limit
+                """
+            ),
+            {'repo_id': repo_id, 'after': after, 'limit': settings.chunk_load_page_size},
+        ).mappings().all()
+        if not rows:
+            return
+
+        for row in rows:
+            yield ChunkRecord(
+                id=row['id'],
+                file_path=row['file_path'],
+                start_line=row['start_line'],
+                end_line=row['end_line'],
+                content=row['content'],
+                language=row['language'],
+            )
+        if len(rows) < settings.chunk_load_page_size:
+            return
+        after = rows[-1]['id']
+
+
+def count_repo_chunks(db: Session, repo_id: str, *, only_unembedded: bool = False) -> int:
+    unembedded_filter = 'AND qdrant_point_id IS NULL' if only_unembedded else ''
+    row = db.execute(
+        text(f'SELECT COUNT(*) AS chunk_count FROM code_chunks WHERE repo_id = CAST(:repo_id AS uuid) {unembedded_filter}'),
         {'repo_id': repo_id},
-    ).mappings().all()
-
-    return [
-        ChunkRecord(
-            id=row['id'],
-            file_path=row['file_path'],
-            start_line=row['start_line'],
-            end_line=row['end_line'],
-            content=row['content'],
-            language=row['language'],
-        )
-        for row in rows
-    ]
+    ).mappings().first()
+    return int((row or {}).get('chunk_count') or 0)
 
 
 def _request_with_retries(
@@ -96,8 +147,7 @@ def _request_with_retries(
 
     for attempt in range(1, settings.embed_retry_attempts + 1):
         try:
-            with httpx.Client(timeout=20.0) as client:
-                response = client.request(method, url, json=json_body, headers=headers)
+            response = get_http_client('qdrant').request(method, url, json=json_body, headers=headers, timeout=20.0)
 
             if response.status_code >= 500:
                 raise httpx.HTTPStatusError('Transient server error', request=response.request, response=response)
@@ -150,14 +200,32 @@ def ensure_collection() -> None:
     _request_with_retries('PUT', url, json_body=body, allowed_statuses={409}, headers=headers)
 
 
-def upsert_chunk_vectors(repo_id: str, chunks: list[ChunkRecord], vectors: list[list[float]]) -> list[str]:
+def chunk_point_id(chunk_id: str) -> str:
+    return str(uuid5(POINT_ID_NAMESPACE, chunk_id))
+
+
+def _points_url(suffix: str = '') -> str:
+    return f"{str(settings.qdrant_url).rstrip('/')}/collections/{settings.qdrant_collection}/points{suffix}"
+
+
+def _qdrant_headers() -> dict[str, str] | None:
+    return {'api-key': settings.qdrant_api_key} if settings.qdrant_api_key else None
+
+
+def upsert_chunk_vectors(
+    repo_id: str,
+    chunks: list[ChunkRecord],
+    vectors: list[list[float]],
+    *,
+    generation: str | None = None,
+) -> list[str]:
     if len(chunks) != len(vectors):
         raise EmbedError('EMBED_VECTOR_MISMATCH', 'Chunks and vectors length mismatch')
 
     points = []
     qdrant_ids: list[str] = []
     for chunk, vector in zip(chunks, vectors):
-        point_id = str(uuid4())
+        point_id = chunk_point_id(chunk.id)
         qdrant_ids.append(point_id)
         points.append(
             {
@@ -170,32 +238,129 @@ def upsert_chunk_vectors(repo_id: str, chunks: list[ChunkRecord], vectors: list[
                     'end_line': chunk.end_line,
                     'language': chunk.language,
                     'chunk_id': chunk.id,
+                    'generation': generation,
                 },
             }
         )
 
-    url = f"{str(settings.qdrant_url).rstrip('/')}/collections/{settings.qdrant_collection}/points?wait=true"
-    headers = {'api-key': settings.qdrant_api_key} if settings.qdrant_api_key else None
-    _request_with_retries('PUT', url, json_body={'points': points}, headers=headers)
+    _request_with_retries('PUT', _points_url('?wait=true'), json_body={'points': points}, headers=_qdrant_headers())
 
     return qdrant_ids
 
 
+def delete_chunk_points(point_ids: list[str]) -> None:
+    if not point_ids:
+        return
+    _request_with_retries(
+        'POST',
+        _points_url('/delete?wait=true'),
+        json_body={'points': point_ids},
+        allowed_statuses={404},
+        headers=_qdrant_headers(),
+    )
+
+
+def sweep_stale_points(repo_id: str, generation: str) -> None:
+    """Delete every point of the repo not written by this embed generation."""
+    body = {
+        'filter': {
+            'must': [{'key': 'repo_id', 'match': {'value': repo_id}}],
+            'must_not': [{'key': 'generation', 'match': {'value': generation}}],
+        }
+    }
+    _request_with_retries('POST', _points_url('/delete?wait=true'), json_body=body, allowed_statuses={404}, headers=_qdrant_headers())
+
+
 def store_qdrant_point_ids(db: Session, chunk_ids: list[str], qdrant_ids: list[str]) -> None:
-    for chunk_id, qdrant_id in zip(chunk_ids, qdrant_ids):
-        db.execute(
-            text(
-                """
-                UPDATE code_chunks
-                SET qdrant_point_id = CAST(:qdrant_id AS uuid)
-                WHERE id = CAST(:chunk_id AS uuid)
-                """
-            ),
-            {
-                'chunk_id': chunk_id,
-                'qdrant_id': qdrant_id,
-            },
-        )
+    """Map a batch of chunks to their Qdrant points in one set-based UPDATE."""
+    if not chunk_ids:
+        return
+    db.execute(
+        text(
+            """
+            UPDATE code_chunks AS c
+            SET qdrant_point_id = v.qdrant_id
+            FROM unnest(CAST(:chunk_ids AS uuid[]), CAST(:qdrant_ids AS uuid[])) AS v(chunk_id, qdrant_id)
+            WHERE c.id = v.chunk_id
+            """
+        ),
+        {
+            'chunk_ids': chunk_ids,
+            'qdrant_ids': qdrant_ids,
+        },
+    )
+
+
+def count_carried_over_chunks(db: Session, repo_id: str, job_id: str) -> int:
+    """Chunks older than the job itself, i.e. kept by an incremental parse rather than re-inserted."""
+    row = db.execute(
+        text(
+            """
+            SELECT COUNT(*) AS carried_over
+            FROM code_chunks c
+            JOIN analysis_jobs j ON j.id = CAST(:job_id AS uuid)
+            WHERE c.repo_id = CAST(:repo_id AS uuid)
+              AND c.created_at < j.created_at
+            """
+        ),
+        {'repo_id': repo_id, 'job_id': job_id},
+    ).mappings().first()
+    return int((row or {}).get('carried_over') or 0)
+
+
+def embed_and_upsert_batch(repo_id: str, batch: list[ChunkRecord], generation: str) -> list[str]:
+    vectors = embed_with_cache(
+        [chunk.content for chunk in batch],
+        embed_texts,
+        model=settings.embed_model,
+        ttl_seconds=settings.embed_cache_ttl_seconds,
+    )
+    return upsert_chunk_vectors(repo_id, batch, vectors, generation=generation)
+
+
+def iter_chunk_batches(chunks: Iterable[ChunkRecord], batch_size: int) -> Iterator[list[ChunkRecord]]:
+    iterator = iter(chunks)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def iter_embedded_batches(
+    repo_id: str,
+    chunks: Iterable[ChunkRecord],
+    generation: str,
+    *,
+    batch_size: int,
+    max_in_flight: int,
+) -> Iterator[tuple[list[ChunkRecord], list[str]]]:
+    """Embed + upsert batches with up to max_in_flight running at once; yields in input order.
+
+    Only network I/O runs on the pool threads; the caller keeps the DB session on its own thread
+    and writes each yielded batch's mapping there. The window is bounded, so a slow consumer (or
+    a provider rate limit) never lets more than max_in_flight requests pile up, and chunks are
+    pulled from the (streaming) iterable only as batches are submitted.
+    """
+    remaining = iter_chunk_batches(chunks, batch_size)
+    if max_in_flight <= 1:
+        for batch in remaining:
+            yield batch, embed_and_upsert_batch(repo_id, batch, generation)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='embed')
+    pending: deque = deque()
+    try:
+        for batch in remaining:
+            pending.append((batch, executor.submit(embed_and_upsert_batch, repo_id, batch, generation)))
+            if len(pending) >= max_in_flight:
+                break
+        while pending:
+            batch, future = pending.popleft()
+            qdrant_ids = future.result()
+            next_batch = next(remaining, None)
+            if next_batch is not None:
+                pending.append((next_batch, executor.submit(embed_and_upsert_batch, repo_id, next_batch, generation)))
+            yield batch, qdrant_ids
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
 def embed_job(db: Session, snapshot: EmbedSnapshot) -> None:
@@ -203,42 +368,69 @@ def embed_job(db: Session, snapshot: EmbedSnapshot) -> None:
     update_job_status(db, snapshot.job_id, 'embedding', 10)
     db.commit()
 
+    lease = JobLease(snapshot.job_id)
     try:
-        with trace_span("worker.embed", trace_id=snapshot.job_id, repo_id=snapshot.repo_id):
-            chunks = load_repo_chunks(db, snapshot.repo_id)
-            if not chunks:
-                raise EmbedError('NO_CHUNKS', 'No chunks available for embedding')
+        with (
+            trace_span("worker.embed", trace_id=snapshot.job_id, repo_id=snapshot.repo_id),
+            lease,
+        ):
+            pending_chunks = count_repo_chunks(db, snapshot.repo_id, only_unembedded=True)
+            chunks = iter(load_repo_chunks(db, snapshot.repo_id, only_unembedded=True))
+            first_chunk = next(chunks, None)
+            if first_chunk is None:
+                if count_repo_chunks(db, snapshot.repo_id) == 0:
+                    raise EmbedError('NO_CHUNKS', 'No chunks available for embedding')
+                # Incremental parse touched no embeddable chunks; every vector is already current.
+                lease.check()
+                update_job_status(db, snapshot.job_id, 'analyzing', 100, owner=lease.owner)
+                db.commit()
+                record_stage_duration("embedding", "success", time.perf_counter() - started)
+                return
 
             ensure_collection()
-            update_job_status(db, snapshot.job_id, 'embedding', 40)
+            update_job_status(db, snapshot.job_id, 'embedding', 40, owner=lease.owner)
             db.commit()
 
-            qdrant_ids: list[str] = []
-            chunk_ids: list[str] = []
-            batch_size = max(1, settings.embed_batch_size)
-
-            for idx in range(0, len(chunks), batch_size):
-                batch = chunks[idx: idx + batch_size]
-                vectors = embed_with_cache(
-                    [chunk.content for chunk in batch],
-                    embed_texts,
-                    model=settings.embed_model,
-                    ttl_seconds=settings.embed_cache_ttl_seconds,
-                )
-                batch_qdrant_ids = upsert_chunk_vectors(snapshot.repo_id, batch, vectors)
-
-                chunk_ids.extend([chunk.id for chunk in batch])
-                qdrant_ids.extend(batch_qdrant_ids)
-
-                progress = 40 + int(((idx + len(batch)) / len(chunks)) * 50)
-                update_job_status(db, snapshot.job_id, 'embedding', min(progress, 95))
-                db.commit()
-
-            store_qdrant_point_ids(db, chunk_ids, qdrant_ids)
-            update_job_status(db, snapshot.job_id, 'analyzing', 100)
+            done = 0
+            batches = iter_embedded_batches(
+                snapshot.repo_id,
+                chain([first_chunk], chunks),
+                snapshot.job_id,
+                batch_size=max(1, settings.embed_batch_size),
+                max_in_flight=settings.embed_max_in_flight,
+            )
+            # closing() stops the in-flight pool right away if the lease is lost mid-run.
+            with closing(batches):
+                for batch, batch_qdrant_ids in batches:
+                    lease.check()
+                    # Mapped per batch: a retry only loads chunks still missing a point ID, so it
+                    # resumes here instead of re-embedding the whole repo.
+                    store_qdrant_point_ids(db, [chunk.id for chunk in batch], batch_qdrant_ids)
+
+                    done += len(batch)
+                    progress = 40 + int((done / max(pending_chunks, done)) * 50)
+                    update_job_status(db, snapshot.job_id, 'embedding', min(progress, 95), owner=lease.owner)
+                    db.commit()
+
+            lease.check()
+            update_job_status(db, snapshot.job_id, 'analyzing', 100, owner=lease.owner)
             db.commit()
             record_stage_duration("embedding", "success", time.perf_counter() - started)
 
+            # After a full re-index every live chunk was inserted by this job's parse and embedded
+            # under this generation, so anything else tagged with the repo is an orphan from an
+            # earlier run. Incremental runs already deleted their stale points at parse time and
+            # must keep the untouched ones.
+            if count_carried_over_chunks(db, snapshot.repo_id, snapshot.job_id) == 0:
+                try:
+                    sweep_stale_points(snapshot.repo_id, snapshot.job_id)
+                except EmbedError as exc:
+                    logger.warning("stale point sweep failed for repo %s; run compact_qdrant: %s", snapshot.repo_id, exc)
+                    record_stale_point_cleanup_failure("embedding")
+
+    except LeaseLost:
+        db.rollback()
+        record_stage_duration("embedding", "lease_lost", time.perf_counter() - started)
     except EmbedError as exc:
         schedule_retry_or_dead_letter(
             db,
@@ -247,6 +439,7 @@ def embed_job(db: Session, snapshot: EmbedSnapshot) -> None:
             stage='embedding',
             error_code=exc.code,
             message=str(exc),
+            owner=lease.owner,
         )
         db.commit()
         record_stage_duration("embedding", "error", time.perf_counter() - started)
@@ -258,6 +451,7 @@ def embed_job(db: Session, snapshot: EmbedSnapshot) -> None:
             stage='embedding',
             error_code='UNEXPECTED_EMBED_ERROR',
             message=str(exc),
+            owner=lease.owner,
         )
         db.commit()
         record_stage_duration("embedding", "error", time.perf_counter() - started)
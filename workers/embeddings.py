@@ -11,6 +11,7 @@ from typing import Iterable
 import httpx
 
 from config import settings
+from http_clients import get_http_client
 
 
 class EmbeddingError(RuntimeError):
@@ -37,8 +38,9 @@ def _post_embeddings(texts: list[str], input_type: str) -> list[list[float]]:
     last_error: Exception | None = None
     for attempt in range(1, settings.embed_retry_attempts + 1):
         try:
-            with httpx.Client(timeout=float(settings.embed_timeout_seconds)) as client:
-                response = client.post(url, headers=headers, json=body)
+            response = get_http_client('nim').post(
+                url, headers=headers, json=body, timeout=float(settings.embed_timeout_seconds)
+            )
             if response.status_code == 200:
                 data = response.json().get("data") or []
                 if len(data) != len(texts):
@@ -0,0 +1,113 @@
+"""Read a commit's files straight from the git object store.
+
+`git ls-tree -r` lists every blob at a commit with its path, object SHA and size, so path
+filters run before a single byte of content is read. Contents then stream through one
+long-running `git cat-file --batch` process instead of being checked out to disk and read
+back. The blob SHA doubles as a content-addressed key for anything derived from the file.
+"""
+
+import subprocess
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+
+
+class GitObjectError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class SourceBlob:
+    path: str
+    sha: str
+    size: int
+
+
+def parse_ls_tree(output: bytes) -> list[SourceBlob]:
+    """Parse `git ls-tree -r -z --long` output, keeping regular files only.
+
+    Symlinks (120000) and submodules (commit entries) are skipped, matching the checkout walk,
+    which never indexed either.
+    """
+    blobs: list[SourceBlob] = []
+    for record in output.split(b'\0'):
+        if not record:
+            continue
+        meta, _, path = record.partition(b'\t')
+        mode, kind, sha, size = meta.split()
+        if kind != b'blob' or mode == b'120000':
+            continue
+        blobs.append(SourceBlob(path=path.decode('utf-8', errors='surrogateescape'), sha=sha.decode(), size=int(size)))
+    return blobs
+
+
+def list_blobs(
+    repo_path: str,
+    commit_sha: str,
+    include: Callable[[str], bool] | None = None,
+    timeout: int | None = None,
+) -> list[SourceBlob]:
+    try:
+        result = subprocess.run(
+            ['git', 'ls-tree', '-r', '-z', '--long', '--full-tree', commit_sha],
+            cwd=repo_path,
+            check=True,
+            timeout=timeout,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as exc:
+        raise GitObjectError(f'git ls-tree failed for {commit_sha}: {exc}') from exc
+    blobs = parse_ls_tree(result.stdout)
+    if include is not None:
+        blobs = [blob for blob in blobs if include(blob.path)]
+    return sorted(blobs, key=lambda blob: blob.path)
+
+
+def iter_blob_contents(repo_path: str, shas: Iterable[str]) -> Iterator[bytes]:
+    """Yield each blob's raw bytes, in order, from a single `git cat-file --batch` process."""
+    shas = list(shas)
+    if not shas:
+        return
+
+    proc = subprocess.Popen(
+        ['git', 'cat-file', '--batch'],
+        cwd=repo_path,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+
+    # Requests are written from a separate thread so neither pipe can fill up and deadlock
+    # while the other side waits.
+    def feed() -> None:
+        try:
+            for sha in shas:
+                proc.stdin.write(f'{sha}\n'.encode())
+        except (BrokenPipeError, ValueError):
+            pass
+        finally:
+            try:
+                proc.stdin.close()
+            except (BrokenPipeError, ValueError):
+                pass
+
+    feeder = threading.Thread(target=feed, name='cat-file-feed', daemon=True)
+    feeder.start()
+    try:
+        for sha in shas:
+            header = proc.stdout.readline().split()
+            if len(header) != 3 or header[1] != b'blob':
+                raise GitObjectError(f'git cat-file could not read blob {sha}')
+            size = int(header[2])
+            data = proc.stdout.read(size)
+            proc.stdout.read(1)  # trailing LF after each object
+            if len(data) != size:
+                raise GitObjectError(f'git cat-file returned a truncated blob {sha}')
+            yield data
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        proc.stdout.close()
+        feeder.join()
@@ -0,0 +1,128 @@
+"""Structural analytics over the file import graph (file_dependencies).
+
+Computed once per analysis, stored in analysis_results.graph_analytics, and reused by the
+quality score and the backend's suggested questions:
+
+- import cycles: strongly connected components with more than one file (iterative Tarjan, so
+  deep chains cannot hit the recursion limit);
+- fan-in / fan-out: how many files import a file, and how many files it imports;
+- centrality: PageRank over import edges, so a file ranks high when central files import it.
+
+Only the top entries of each ranking are stored; the full graph stays in file_dependencies.
+"""
+
+Edge = tuple[str, str]
+
+
+def strongly_connected_components(nodes: list[str], edges: list[Edge]) -> list[list[str]]:
+    adjacency: dict[str, list[str]] = {node: [] for node in nodes}
+    for source, target in edges:
+        adjacency.setdefault(source, []).append(target)
+        adjacency.setdefault(target, [])
+
+    index: dict[str, int] = {}
+    lowlink: dict[str, int] = {}
+    on_stack: set[str] = set()
+    stack: list[str] = []
+    components: list[list[str]] = []
+    counter = 0
+
+    for start in adjacency:
+        if start in index:
+            continue
+        work: list[tuple[str, int]] = [(start, 0)]
+        while work:
+            node, child_index = work.pop()
+            if child_index == 0:
+                index[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack.add(node)
+            children = adjacency[node]
+            if child_index < len(children):
+                work.append((node, child_index + 1))
+                child = children[child_index]
+                if child not in index:
+                    work.append((child, 0))
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+                continue
+            # All children visited: propagate lowlink to the parent and pop a finished component.
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+    return components
+
+
+def pagerank(
+    nodes: list[str],
+    edges: list[Edge],
+    *,
+    damping: float = 0.85,
+    iterations: int = 50,
+    tolerance: float = 1e-8,
+) -> dict[str, float]:
+    if not nodes:
+        return {}
+    count = len(nodes)
+    outgoing: dict[str, list[str]] = {node: [] for node in nodes}
+    for source, target in edges:
+        if source in outgoing and target in outgoing:
+            outgoing[source].append(target)
+
+    rank = {node: 1.0 / count for node in nodes}
+    for _ in range(iterations):
+        # Files that import nothing spread their rank evenly, keeping the total at 1.
+        dangling = sum(rank[node] for node in nodes if not outgoing[node])
+        base = (1.0 - damping) / count + damping * dangling / count
+        updated = {node: base for node in nodes}
+        for source, targets in outgoing.items():
+            if targets:
+                share = damping * rank[source] / len(targets)
+                for target in targets:
+                    updated[target] += share
+        delta = sum(abs(updated[node] - rank[node]) for node in nodes)
+        rank = updated
+        if delta < tolerance:
+            break
+    return rank
+
+
+def _top(values: dict[str, float], limit: int, digits: int | None = None) -> list[dict]:
+    ranked = sorted(((value, path) for path, value in values.items() if value > 0), key=lambda item: (-item[0], item[1]))
+    return [
+        {'file_path': path, 'value': round(value, digits) if digits is not None else value}
+        for value, path in ranked[:limit]
+    ]
+
+
+def compute_graph_analytics(nodes: list[str], edges: list[Edge], *, top_n: int = 20, max_cycles: int = 20) -> dict:
+    nodes = sorted(set(nodes) | {path for edge in edges for path in edge})
+    fan_in = {node: 0 for node in nodes}
+    fan_out = {node: 0 for node in nodes}
+    for source, target in edges:
+        fan_out[source] += 1
+        fan_in[target] += 1
+
+    cycles = [component for component in strongly_connected_components(nodes, edges) if len(component) > 1]
+    cycles.sort(key=lambda component: (-len(component), component[0]))
+
+    return {
+        'node_count': len(nodes),
+        'edge_count': len(edges),
+        'cycle_count': len(cycles),
+        'files_in_cycles': sum(len(component) for component in cycles),
+        'cycles': cycles[:max_cycles],
+        'top_fan_in': _top(fan_in, top_n),
+        'top_fan_out': _top(fan_out, top_n),
+        'top_central': _top(pagerank(nodes, edges), top_n, digits=6),
+    }
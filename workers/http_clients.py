@@ -0,0 +1,87 @@
+"""Shared pooled HTTP clients, one per upstream (Qdrant, NIM, LLM providers).
+
+Opening an `httpx.Client` per call pays a TCP (and TLS) handshake on every embedding batch,
+Qdrant upsert and summary completion. Clients here are created on first use and reused for the
+process lifetime, so connections stay in a keep-alive pool. Callers keep their own timeouts by
+passing `timeout=` per request. `httpx.Client` is thread-safe, so the embed stage's in-flight
+batches share one pool.
+
+HTTP/2 is negotiated over TLS when HTTP_CLIENT_HTTP2 is set and the `h2` package
+(`httpx[http2]`) is installed; plain-HTTP upstreams such as a local Qdrant stay on HTTP/1.1.
+
+Mirrors backend/app/http_clients.py but uses the worker settings object.
+"""
+
+import importlib.util
+import logging
+import threading
+
+import httpx
+from prometheus_client import REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_clients: dict[str, httpx.Client] = {}
+_lock = threading.Lock()
+
+
+def _http2_enabled() -> bool:
+    if not settings.http_client_http2:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP_CLIENT_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def get_http_client(upstream: str) -> httpx.Client:
+    client = _clients.get(upstream)
+    if client is not None:
+        return client
+    with _lock:
+        client = _clients.get(upstream)
+        if client is None:
+            client = httpx.Client(
+                timeout=float(settings.http_client_timeout_seconds),
+                limits=httpx.Limits(
+                    max_connections=settings.http_client_max_connections,
+                    max_keepalive_connections=settings.http_client_max_keepalive_connections,
+                    keepalive_expiry=float(settings.http_client_keepalive_expiry_seconds),
+                ),
+                http2=_http2_enabled(),
+            )
+            _clients[upstream] = client
+        return client
+
+
+def close_http_clients() -> None:
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+class _PoolCollector:
+    """Exports open pooled connections per upstream, split into active and idle."""
+
+    def collect(self):
+        family = GaugeMetricFamily(
+            "devlens_http_pool_connections",
+            "Pooled HTTP connections per upstream.",
+            labels=["upstream", "state"],
+        )
+        for upstream, client in list(_clients.items()):
+            # httpx does not expose pool stats publicly; read the httpcore pool when present.
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", None) or [])
+            idle = sum(1 for connection in connections if connection.is_idle())
+            family.add_metric([upstream, "active"], len(connections) - idle)
+            family.add_metric([upstream, "idle"], idle)
+        yield family
+
+
+REGISTRY.register(_PoolCollector())
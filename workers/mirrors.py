@@ -0,0 +1,162 @@
+"""Persistent bare-mirror cache for the parse stage.
+
+Each repository is cloned once into a bare mirror under PARSE_MIRROR_DIR, keyed by a hash of
+its github_url. A job only touches the network when the mirror does not yet have the commit
+being analyzed, and then only for an incremental fetch. Working trees are produced with a
+local clone, which hardlinks the mirror's object files instead of copying them, so the
+checkout is independent of the mirror and survives its eviction.
+
+Mirrors are evicted least-recently-used (by directory mtime, bumped on every use) once the
+store exceeds PARSE_MIRROR_MAX_MB. A per-mirror flock serializes updates between workers on
+the same host; eviction skips any mirror whose lock is held.
+"""
+
+import fcntl
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from config import settings
+
+
+def mirror_root() -> Path:
+    return Path(settings.parse_mirror_dir or os.path.join(tempfile.gettempdir(), 'devlens-mirrors'))
+
+
+def mirror_path(github_url: str) -> Path:
+    digest = hashlib.sha256(github_url.strip().rstrip('/').lower().encode('utf-8')).hexdigest()[:24]
+    return mirror_root() / f'{digest}.git'
+
+
+def _git(args: list[str], cwd: str | None = None, timeout: int | None = None) -> str:
+    result = subprocess.run(
+        ['git', *args],
+        cwd=cwd,
+        check=True,
+        timeout=timeout,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    return result.stdout.decode('utf-8', errors='ignore')
+
+
+def _has_commit(mirror: Path, commit_sha: str) -> bool:
+    try:
+        _git(['cat-file', '-e', f'{commit_sha}^{{commit}}'], cwd=str(mirror))
+        return True
+    except subprocess.CalledProcessError:
+        return False
+
+
+@contextmanager
+def _locked(mirror: Path, *, blocking: bool = True) -> Iterator[bool]:
+    mirror.parent.mkdir(parents=True, exist_ok=True)
+    with open(f'{mirror}.lock', 'a+') as handle:
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(handle, flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _is_repository(mirror: Path) -> bool:
+    try:
+        _git(['--git-dir', str(mirror), 'rev-parse', '--is-bare-repository'])
+        return True
+    except subprocess.CalledProcessError:
+        return False
+
+
+def _update_mirror(github_url: str, mirror: Path, commit_sha: str, timeout: int) -> None:
+    if mirror.is_dir() and not _is_repository(mirror):
+        # Left half-written by a worker killed mid-clone; git cannot open it, so start over.
+        shutil.rmtree(mirror, ignore_errors=True)
+    if not mirror.is_dir():
+        try:
+            _git(['clone', '--bare', '--quiet', github_url, str(mirror)], timeout=timeout)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+            shutil.rmtree(mirror, ignore_errors=True)
+            raise
+    if _has_commit(mirror, commit_sha):
+        return
+    _git(['fetch', '--quiet', '--prune', 'origin', '+refs/heads/*:refs/heads/*'], cwd=str(mirror), timeout=timeout)
+    if not _has_commit(mirror, commit_sha):
+        # Not on any branch tip (e.g. a PR head); GitHub serves reachable SHAs directly.
+        _git(['fetch', '--quiet', 'origin', commit_sha], cwd=str(mirror), timeout=timeout)
+
+
+def checkout_from_mirror(github_url: str, commit_sha: str, timeout: int, checkout: bool = True) -> str:
+    """Return a fresh local clone at commit_sha, served from (and refreshing) the local mirror.
+
+    checkout=False skips writing the working tree, for callers that read blobs from git objects.
+
+    Raises subprocess.CalledProcessError / TimeoutExpired like a plain git clone would.
+    """
+    mirror = mirror_path(github_url)
+    with _locked(mirror):
+        # Fetch errors and timeouts propagate with the mirror intact; the next job only needs
+        # the missing commits, not a full re-clone.
+        _update_mirror(github_url, mirror, commit_sha, timeout)
+        os.utime(mirror)
+
+        work_dir = tempfile.mkdtemp(prefix='devlens-parse-')
+        try:
+            _git(['clone', '--quiet', '--no-checkout', str(mirror), work_dir], timeout=timeout)
+        except BaseException:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+
+    if not checkout:
+        return work_dir
+    try:
+        _git(['checkout', '--quiet', '--detach', commit_sha], cwd=work_dir, timeout=timeout)
+    except BaseException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+    return work_dir
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for current, _dirs, files in os.walk(path):
+        for filename in files:
+            try:
+                total += os.lstat(os.path.join(current, filename)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def prune_mirrors(max_bytes: int, keep: Path | None = None) -> list[Path]:
+    """Evict least-recently-used mirrors until the store fits max_bytes; returns evicted paths."""
+    root = mirror_root()
+    if not root.is_dir():
+        return []
+
+    mirrors = sorted((path for path in root.glob('*.git') if path.is_dir()), key=lambda path: path.stat().st_mtime)
+    sizes = {path: _dir_size(path) for path in mirrors}
+    total = sum(sizes.values())
+
+    evicted: list[Path] = []
+    for path in mirrors:
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        with _locked(path, blocking=False) as acquired:
+            if not acquired:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+        total -= sizes[path]
+        evicted.append(path)
+    return evicted
@@ -1,22 +1,41 @@
 import json
+import logging
+import multiprocessing
 import os
 import shutil
 import subprocess
 import tempfile
 import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 from uuid import uuid4
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from chunking import ChunkingUnavailable, chunk_code, ts_language_for
+from chunk_cache import lookup_spans, span_key, store_spans
+from chunking import ChunkingUnavailable, chunk_code, chunk_tokens, chunker_fingerprint, ts_language_for
 from config import settings
-from diffing import compute_commit_diff
-from reliability import schedule_retry_or_dead_letter
-from telemetry import record_stage_duration, trace_span
+from dependencies import ImportRef, extract_import_refs, file_text, resolve_edges
+from diffing import compute_changed_paths, compute_commit_diff
+from gitobjects import GitObjectError, SourceBlob, iter_blob_contents, list_blobs
+from mirrors import checkout_from_mirror, mirror_path, prune_mirrors
+from source_filter import RepoIgnoreRules, content_skip_reason, path_skip_reason
+from reliability import JobLease, LeaseLost, schedule_retry_or_dead_letter, worker_identity
+from telemetry import (
+    record_chunk_cache,
+    record_file_skipped,
+    record_stage_duration,
+    record_stale_point_cleanup_failure,
+    trace_span,
+)
+
+logger = logging.getLogger("devlens.worker.parse")
 
 
 SKIP_DIRS = {'.git', 'node_modules', '.venv', 'venv', 'dist', 'build', '__pycache__'}
@@ -37,6 +56,10 @@ class ParseError(RuntimeError):
         super().__init__(message)
         self.code = code
 
+    def __reduce__(self):
+        # Keep (code, message) intact when raised inside a chunking pool process.
+        return (type(self), (self.code, str(self)))
+
 
 @dataclass
 class RepoSnapshot:
@@ -46,30 +69,133 @@ class RepoSnapshot:
     commit_sha: str
 
 
+@dataclass
+class IncrementalPlan:
+    base_sha: str
+    changed: set[str]
+    deleted: set[str]
+    kept_chunks: int
+
+
+def _clone_error(exc: subprocess.SubprocessError) -> ParseError:
+    if isinstance(exc, subprocess.TimeoutExpired):
+        return ParseError('CLONE_TIMEOUT', 'Repository clone timed out')
+    stderr = exc.stderr.decode(errors="ignore") if isinstance(exc.stderr, bytes) else str(exc.stderr or '')
+    return ParseError('CLONE_FAILED', f'Command failed: {stderr[:300]}')
+
+
 def _run(cmd: list[str], cwd: str | None = None, timeout: int | None = None) -> None:
     try:
         subprocess.run(cmd, cwd=cwd, check=True, timeout=timeout, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    except subprocess.TimeoutExpired as exc:
-        raise ParseError('CLONE_TIMEOUT', 'Repository clone timed out') from exc
-    except subprocess.CalledProcessError as exc:
-        raise ParseError('CLONE_FAILED', f'Command failed: {exc.stderr.decode(errors="ignore")[:300]}') from exc
+    except (subprocess.TimeoutExpired, subprocess.CalledProcessError) as exc:
+        raise _clone_error(exc) from exc
 
 
-def clone_repo(github_url: str, commit_sha: str) -> str:
+def clone_repo(github_url: str, commit_sha: str, checkout: bool = True) -> str:
+    """Clone the repo at commit_sha into a temp dir; checkout=False leaves only the object store."""
+    if settings.parse_mirror_max_mb > 0:
+        try:
+            return checkout_from_mirror(github_url, commit_sha, timeout=settings.parse_clone_timeout_seconds, checkout=checkout)
+        except (subprocess.TimeoutExpired, subprocess.CalledProcessError) as exc:
+            raise _clone_error(exc) from exc
+
     temp_dir = tempfile.mkdtemp(prefix='devlens-parse-')
-    _run(['git', 'clone', '--depth', '1', github_url, temp_dir], timeout=settings.parse_clone_timeout_seconds)
+    _run(['git', 'clone', '--depth', '1', '--no-checkout', github_url, temp_dir], timeout=settings.parse_clone_timeout_seconds)
     _run(['git', 'fetch', '--depth', '1', 'origin', commit_sha], cwd=temp_dir, timeout=settings.parse_clone_timeout_seconds)
-    _run(['git', 'checkout', commit_sha], cwd=temp_dir, timeout=settings.parse_clone_timeout_seconds)
+    if checkout:
+        _run(['git', 'checkout', commit_sha], cwd=temp_dir, timeout=settings.parse_clone_timeout_seconds)
     return temp_dir
 
 
+def maybe_prune_mirrors(github_url: str) -> None:
+    """Best-effort: keep the mirror store within PARSE_MIRROR_MAX_MB. Never fails the parse stage."""
+    if settings.parse_mirror_max_mb <= 0:
+        return
+    try:
+        prune_mirrors(settings.parse_mirror_max_mb * 1024 * 1024, keep=mirror_path(github_url))
+    except OSError:
+        pass
+
+
+def _is_source_name(filename: str) -> bool:
+    return Path(filename).suffix.lower() in ALLOWED_EXTENSIONS or filename.lower() in ALLOWED_FILENAMES
+
+
 def iter_source_files(root: str) -> Iterable[Path]:
     for current, dirs, files in os.walk(root):
         dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
         for filename in files:
-            path = Path(current) / filename
-            if path.suffix.lower() in ALLOWED_EXTENSIONS or filename.lower() in ALLOWED_FILENAMES:
-                yield path
+            if _is_source_name(filename):
+                yield Path(current) / filename
+
+
+def is_source_path(rel_path: str) -> bool:
+    """Same filter as iter_source_files, applied to a repo-relative path without touching disk."""
+    *dirs, filename = rel_path.split('/')
+    return not SKIP_DIRS.intersection(dirs) and _is_source_name(filename)
+
+
+def _path_skipped(rel: str, size: int, rules: RepoIgnoreRules) -> bool:
+    if not settings.parse_skip_generated:
+        return False
+    reason = path_skip_reason(rel, size, rules, settings.parse_max_file_bytes)
+    if reason:
+        record_file_skipped(reason)
+    return reason is not None
+
+
+def _content_skipped(data: bytes) -> bool:
+    if not settings.parse_skip_generated:
+        return False
+    reason = content_skip_reason(data, settings.parse_max_line_length)
+    if reason:
+        record_file_skipped(reason)
+    return reason is not None
+
+
+def list_source_blobs(repo_path: str, commit_sha: str) -> list[SourceBlob]:
+    """Source blobs at commit_sha that pass the path filters; nothing but tree metadata is read."""
+    try:
+        blobs = list_blobs(repo_path, commit_sha, timeout=settings.parse_clone_timeout_seconds)
+        by_path = {blob.path: blob for blob in blobs}
+        rule_blobs = [by_path.get(name) for name in ('.gitattributes', '.gitignore')]
+        rule_texts = dict(
+            zip(
+                [blob.path for blob in rule_blobs if blob],
+                (data.decode('utf-8', errors='ignore') for data in iter_blob_contents(repo_path, [blob.sha for blob in rule_blobs if blob])),
+            )
+        )
+    except GitObjectError as exc:
+        raise ParseError('GIT_READ_FAILED', str(exc)) from exc
+
+    rules = RepoIgnoreRules.from_texts(rule_texts.get('.gitattributes'), rule_texts.get('.gitignore'))
+    return [blob for blob in blobs if is_source_path(blob.path) and not _path_skipped(blob.path, blob.size, rules)]
+
+
+def filter_checkout_files(repo_path: str, files: list[Path]) -> list[Path]:
+    """Checkout-mode counterpart of the blob filters: path rules first, then a content sniff."""
+    if not settings.parse_skip_generated:
+        return files
+    root = Path(repo_path)
+    texts = {}
+    for name in ('.gitattributes', '.gitignore'):
+        candidate = root / name
+        if candidate.is_file():
+            texts[name] = candidate.read_text(encoding='utf-8', errors='ignore')
+    rules = RepoIgnoreRules.from_texts(texts.get('.gitattributes'), texts.get('.gitignore'))
+
+    kept: list[Path] = []
+    for path in files:
+        if _path_skipped(relative_path(path, repo_path), path.stat().st_size, rules):
+            continue
+        if _content_skipped(path.read_bytes()):
+            continue
+        kept.append(path)
+    return kept
+
+
+def relative_path(path: Path, root: str) -> str:
+    return str(path.relative_to(root)).replace('\\', '/')
 
 
 def chunk_lines(content: str, chunk_lines: int, overlap_lines: int) -> list[tuple[int, int, str]]:
@@ -93,29 +219,241 @@ def chunk_lines(content: str, chunk_lines: int, overlap_lines: int) -> list[tupl
     return chunks
 
 
-def chunk_file(content: str, language: str, chunk_size: int, overlap_size: int) -> list[tuple[int, int, str]]:
-    """Structure-aware chunking when a tree-sitter grammar exists; line-window otherwise."""
+def chunk_file(
+    content: str,
+    language: str,
+    chunk_size: int,
+    overlap_size: int,
+    unit: str = 'lines',
+) -> list[tuple[int, int, str]]:
+    """Structure-aware chunking when a tree-sitter grammar exists; plain window otherwise.
+
+    chunk_size/overlap_size are lines or estimated tokens, depending on unit.
+    """
+    if chunk_size <= overlap_size:
+        raise ParseError('INVALID_CHUNK_CONFIG', 'Chunk size must be greater than overlap size')
     ts_language = ts_language_for(language)
     if ts_language:
         try:
-            spans = chunk_code(content, ts_language, chunk_size, overlap_size)
+            spans = chunk_code(content, ts_language, chunk_size, overlap_size, unit)
             if spans:
                 return spans
         except ChunkingUnavailable:
-            pass  # fall back to line-window chunking below
+            pass  # fall back to window chunking below
+    if unit == 'tokens':
+        return chunk_tokens(content, chunk_size, overlap_size)
     return chunk_lines(content, chunk_size, overlap_size)
 
 
-def update_job_status(db: Session, job_id: str, status: str, progress: int, error_message: str | None = None) -> None:
-    db.execute(
+def chunk_sizing() -> tuple[int, int, str]:
+    """(chunk_size, overlap_size, unit) for the configured PARSE_CHUNK_MODE."""
+    if settings.parse_chunk_mode == 'tokens':
+        return settings.parse_chunk_max_tokens, settings.parse_chunk_overlap_tokens, 'tokens'
+    return settings.parse_chunk_lines, settings.parse_chunk_overlap_lines, 'lines'
+
+
+
+def language_for_path(path: str) -> str:
+    name = Path(path)
+    return name.suffix.lstrip('.').lower() or name.name.lower()
+
+
+def chunk_source_file(
+    path: str,
+    repo_path: str,
+    chunk_size: int,
+    overlap_size: int,
+    unit: str = 'lines',
+) -> tuple[str, str, list[tuple[int, int, str]]]:
+    """Read and chunk one file. Top-level so it can run in a chunking pool process."""
+    file_path = Path(path)
+    rel = relative_path(file_path, repo_path)
+    language = language_for_path(rel)
+
+    with file_path.open('r', encoding='utf-8', errors='ignore') as fh:
+        content = fh.read()
+
+    return rel, language, chunk_file(content, language, chunk_size, overlap_size, unit)
+
+
+def materialize_spans(content: str, spans: list[tuple[int, int]]) -> list[tuple[int, int, str]]:
+    """Rebuild chunk text from 1-indexed inclusive line spans, exactly as the chunkers slice it."""
+    lines = content.splitlines()
+    return [(start, end, '\n'.join(lines[start - 1:end])) for start, end in spans]
+
+
+def chunk_source_blob(
+    rel: str,
+    data: bytes,
+    cached_spans: list[tuple[int, int]] | None,
+    chunk_size: int,
+    overlap_size: int,
+    unit: str = 'lines',
+) -> tuple[str, str, list[tuple[int, int, str]]]:
+    """Chunk one file's raw bytes as read from the object store. Top-level for the chunking pool.
+
+    With cached_spans (a blob-SHA cache hit) the chunker is skipped and only text is sliced.
+    """
+    language = language_for_path(rel)
+    content = data.decode('utf-8', errors='ignore')
+    if cached_spans is not None:
+        return rel, language, materialize_spans(content, cached_spans)
+    return rel, language, chunk_file(content, language, chunk_size, overlap_size, unit)
+
+
+_chunk_pool: ProcessPoolExecutor | None = None
+_chunk_pool_size = 0
+# Blobs submitted ahead of the one being yielded, per pool process (bounds memory in git ingest).
+_BLOB_CHUNK_WINDOW_PER_WORKER = 4
+
+
+def _chunk_worker_count() -> int:
+    return settings.parse_chunk_workers or os.cpu_count() or 1
+
+
+def _get_chunk_pool(workers: int) -> ProcessPoolExecutor:
+    """Long-lived pool reused across jobs so each process keeps its loaded grammars warm."""
+    global _chunk_pool, _chunk_pool_size
+    if _chunk_pool is None or _chunk_pool_size != workers:
+        if _chunk_pool is not None:
+            _chunk_pool.shutdown(cancel_futures=True)
+        # forkserver: the parent holds lease/DB threads, which fork() must not copy.
+        _chunk_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('forkserver'))
+        _chunk_pool_size = workers
+    return _chunk_pool
+
+
+def _reset_chunk_pool() -> None:
+    global _chunk_pool, _chunk_pool_size
+    if _chunk_pool is not None:
+        _chunk_pool.shutdown(wait=False, cancel_futures=True)
+    _chunk_pool = None
+    _chunk_pool_size = 0
+
+
+def iter_file_chunks(
+    repo_path: str,
+    files: list[Path],
+    chunk_size: int,
+    overlap_size: int,
+    unit: str = 'lines',
+) -> Iterator[tuple[str, str, list[tuple[int, int, str]]]]:
+    """Yield (rel_path, language, spans) per file, in input order, chunking across processes.
+
+    Results stream back as they complete, so the caller can stop early (e.g. on the chunk
+    limit); closing the iterator cancels files that have not started yet.
+    """
+    paths = [str(path) for path in files]
+    work = partial(chunk_source_file, repo_path=repo_path, chunk_size=chunk_size, overlap_size=overlap_size, unit=unit)
+    workers = min(_chunk_worker_count(), len(paths))
+    if workers <= 1:
+        for path in paths:
+            yield work(path)
+        return
+
+    pool = _get_chunk_pool(workers)
+    try:
+        yield from pool.map(work, paths, chunksize=max(1, len(paths) // (workers * 8)))
+    except BrokenProcessPool as exc:
+        _reset_chunk_pool()
+        raise ParseError('CHUNK_WORKER_FAILED', 'A chunking worker process died') from exc
+
+
+def iter_blob_chunks(
+    repo_path: str,
+    blobs: list[SourceBlob],
+    chunk_size: int,
+    overlap_size: int,
+    unit: str = 'lines',
+) -> Iterator[tuple[str, str, list[tuple[int, int, str]]]]:
+    """Like iter_file_chunks, but contents stream from `git cat-file --batch` instead of disk.
+
+    Spans are looked up by blob SHA first (chunk_cache); only misses are run through the
+    chunker, and their spans are written back for the next repo or commit that has the file.
+    Blobs are handed to the pool as they are read, with a bounded number in flight, so only
+    a window of file contents is held in memory at a time.
+    """
+    fingerprint = chunker_fingerprint(chunk_size, overlap_size, unit)
+    keys = [span_key(fingerprint, language_for_path(blob.path), blob.sha) for blob in blobs]
+    use_cache = settings.parse_chunk_cache_ttl_seconds > 0
+    cached = lookup_spans(keys) if use_cache else [None] * len(keys)
+    hits = sum(1 for spans in cached if spans is not None)
+    record_chunk_cache(hits=hits, misses=len(keys) - hits)
+
+    work = partial(chunk_source_blob, chunk_size=chunk_size, overlap_size=overlap_size, unit=unit)
+    workers = min(_chunk_worker_count(), len(keys) - hits)
+    pool = _get_chunk_pool(workers) if workers > 1 else None
+    window = workers * _BLOB_CHUNK_WINDOW_PER_WORKER if pool is not None else 0
+    pending: deque[tuple[str, list | None, Future | tuple]] = deque()
+    to_store: list[tuple[str, list[tuple[int, int]]]] = []
+
+    def take() -> tuple[str, str, list[tuple[int, int, str]]]:
+        key, spans, outcome = pending.popleft()
+        result = outcome.result() if isinstance(outcome, Future) else outcome
+        if spans is None and use_cache:
+            to_store.append((key, [(start, end) for start, end, _text in result[2]]))
+            if len(to_store) >= 256:
+                store_spans(to_store, settings.parse_chunk_cache_ttl_seconds)
+                to_store.clear()
+        return result
+
+    contents = iter_blob_contents(repo_path, [blob.sha for blob in blobs])
+    try:
+        for blob, key, spans, data in zip(blobs, keys, cached, contents):
+            # Content checks need the bytes, so they run here as blobs stream in.
+            if _content_skipped(data):
+                continue
+            # Cache hits only slice the blob; that is cheaper here than shipping it to the pool.
+            if pool is None or spans is not None:
+                pending.append((key, spans, work(blob.path, data, spans)))
+            else:
+                pending.append((key, spans, pool.submit(work, blob.path, data, spans)))
+            while len(pending) > window:
+                yield take()
+        while pending:
+            yield take()
+        store_spans(to_store, settings.parse_chunk_cache_ttl_seconds)
+    except GitObjectError as exc:
+        raise ParseError('GIT_READ_FAILED', str(exc)) from exc
+    except BrokenProcessPool as exc:
+        _reset_chunk_pool()
+        raise ParseError('CHUNK_WORKER_FAILED', 'A chunking worker process died') from exc
+    finally:
+        contents.close()
+        for _key, _spans, outcome in pending:
+            if isinstance(outcome, Future):
+                outcome.cancel()
+
+
+def update_job_status(
+    db: Session,
+    job_id: str,
+    status: str,
+    progress: int,
+    error_message: str | None = None,
+    owner: str | None = None,
+) -> None:
+    """Write a job's status/progress; with owner, only while this worker still holds the claim.
+
+    lease.check() alone is racy: the lease can lapse and the job be re-claimed between the last
+    renewal and the check. The owner guard makes the write itself fail in that case, raising
+    LeaseLost so the caller rolls back instead of overwriting the new owner's progress.
+    """
+    owner_filter = 'AND claimed_by = :owner RETURNING id' if owner is not None else ''
+    result = db.execute(
         text(
-            """
+            f"""
             UPDATE analysis_jobs
             SET status = :status,
                 progress = :progress,
                 error_message = :error_message,
-                next_retry_at = NULL
+                next_retry_at = NULL,
+                -- A stage transition releases the claim so the next stage's worker can take it.
+                claimed_by = CASE WHEN status = :status THEN claimed_by END,
+                claimed_at = CASE WHEN status = :status THEN claimed_at END,
+                lease_expires_at = CASE WHEN status = :status THEN lease_expires_at END
             WHERE id = CAST(:job_id AS uuid)
+            {owner_filter}
             """
         ),
         {
@@ -123,27 +461,49 @@ def update_job_status(db: Session, job_id: str, status: str, progress: int, erro
             'status': status,
             'progress': progress,
             'error_message': error_message,
+            'owner': owner,
         },
     )
+    if owner is not None and result.first() is None:
+        raise LeaseLost(f'Job {job_id} is no longer claimed by {owner}')
 
 
 def fetch_next_parse_job(db: Session) -> RepoSnapshot | None:
+    """Atomically claim the oldest runnable parse job for this worker.
+
+    FOR UPDATE SKIP LOCKED lets concurrent workers skip rows another worker is claiming, and
+    claimed_by keeps a claimed job from being re-selected while it is still in 'parsing'.
+    """
     row = db.execute(
         text(
             """
-            SELECT j.id::text AS job_id,
-                   j.repo_id::text AS repo_id,
-                   j.commit_sha,
-                   r.github_url
-            FROM analysis_jobs j
-            JOIN repositories r ON r.id = j.repo_id
-            WHERE j.status IN ('queued', 'parsing')
-              AND (j.next_retry_at IS NULL OR j.next_retry_at <= NOW())
-            ORDER BY j.created_at ASC
-            LIMIT 1
+            WITH next_job AS (
+                SELECT id
+                FROM analysis_jobs
+                WHERE status IN ('queued', 'parsing')
+                  AND claimed_by IS NULL
+                  AND (next_retry_at IS NULL OR next_retry_at <= NOW())
+                ORDER BY created_at ASC
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE analysis_jobs j
+            SET status = 'parsing',
+                claimed_by = :worker_id,
+                claimed_at = NOW(),
+                lease_expires_at = NOW() + make_interval(secs => :lease_seconds)
+            FROM next_job, repositories r
+            WHERE j.id = next_job.id
+              AND r.id = j.repo_id
+            RETURNING j.id::text AS job_id,
+                      j.repo_id::text AS repo_id,
+                      j.commit_sha,
+                      r.github_url
             """
-        )
+        ),
+        {'worker_id': worker_identity(), 'lease_seconds': settings.worker_lease_seconds},
     ).mappings().first()
+    db.commit()
 
     if not row:
         return None
@@ -156,29 +516,232 @@ def fetch_next_parse_job(db: Session) -> RepoSnapshot | None:
     )
 
 
+CHUNK_COPY_COLUMNS = ('id', 'repo_id', 'file_path', 'start_line', 'end_line', 'content', 'language')
+
+
+def _copy_chunks(db: Session, chunks: list[dict]) -> None:
+    # fts is not written here: trg_code_chunks_fts_sync fills it as each row is inserted, so the
+    # vector is computed exactly once per chunk instead of once in SQL and again in the trigger.
+    if not chunks:
+        return
+    raw = db.connection().connection.driver_connection
+    with raw.cursor() as cursor:
+        with cursor.copy(f"COPY code_chunks ({', '.join(CHUNK_COPY_COLUMNS)}) FROM STDIN") as copy:
+            for chunk in chunks:
+                copy.write_row(tuple(chunk[column] for column in CHUNK_COPY_COLUMNS))
+
+
 def store_chunks(db: Session, repo_id: str, chunks: list[dict]) -> None:
+    """Replace the repo's chunks with one COPY stream inside the caller's transaction."""
     db.execute(text('DELETE FROM code_chunks WHERE repo_id = CAST(:repo_id AS uuid)'), {'repo_id': repo_id})
+    _copy_chunks(db, chunks)
 
-    for chunk in chunks:
+
+def replace_file_chunks(db: Session, repo_id: str, paths: set[str], chunks: list[dict]) -> list[str]:
+    """Swap chunks for just the given files; returns Qdrant point IDs of the removed chunks."""
+    rows = db.execute(
+        text(
+            """
+            DELETE FROM code_chunks
+            WHERE repo_id = CAST(:repo_id AS uuid)
+              AND file_path = ANY(:paths)
+            RETURNING qdrant_point_id::text AS qdrant_point_id
+            """
+        ),
+        {'repo_id': repo_id, 'paths': sorted(paths)},
+    ).mappings().all()
+    _copy_chunks(db, chunks)
+    return [row['qdrant_point_id'] for row in rows if row['qdrant_point_id']]
+
+
+def mark_indexed_commit(db: Session, repo_id: str, commit_sha: str, fingerprint: str) -> None:
+    db.execute(
+        text(
+            """
+            UPDATE repositories
+            SET indexed_commit_sha = :commit_sha, indexed_chunker_fingerprint = :fingerprint
+            WHERE id = CAST(:repo_id AS uuid)
+            """
+        ),
+        {'repo_id': repo_id, 'commit_sha': commit_sha, 'fingerprint': fingerprint},
+    )
+
+
+def list_indexed_paths(db: Session, repo_id: str) -> set[str]:
+    rows = db.execute(
+        text('SELECT DISTINCT file_path FROM code_chunks WHERE repo_id = CAST(:repo_id AS uuid)'),
+        {'repo_id': repo_id},
+    ).mappings().all()
+    return {row['file_path'] for row in rows}
+
+
+def load_import_refs(db: Session, repo_id: str, paths: list[str]) -> dict[str, list[ImportRef]]:
+    """Re-extract import references for files that were not re-chunked, from their stored chunks."""
+    result = db.execute(
+        text(
+            """
+            SELECT file_path, start_line, end_line, content
+            FROM code_chunks
+            WHERE repo_id = CAST(:repo_id AS uuid)
+              AND file_path = ANY(:paths)
+            ORDER BY file_path, start_line
+            """
+        ),
+        {'repo_id': repo_id, 'paths': paths},
+        execution_options={'yield_per': settings.chunk_load_page_size},
+    ).mappings()
+
+    refs: dict[str, list[ImportRef]] = {}
+    current: str | None = None
+    spans: list[tuple[int, int, str]] = []
+    for row in result:
+        if row['file_path'] != current:
+            if current is not None:
+                refs[current] = extract_import_refs(current, file_text(spans))
+            current, spans = row['file_path'], []
+        spans.append((row['start_line'] or 1, row['end_line'] or 1, row['content']))
+    if current is not None:
+        refs[current] = extract_import_refs(current, file_text(spans))
+    return refs
+
+
+def store_file_dependencies(
+    db: Session,
+    repo_id: str,
+    commit_sha: str,
+    refs: dict[str, list[ImportRef]],
+    plan: IncrementalPlan | None,
+    previous_paths: set[str] | None,
+) -> None:
+    """Write the commit's file -> file import edges, replacing those of any earlier commit.
+
+    refs holds the import references of every file chunked in this run. Files kept from an
+    incremental base keep their base edges when the set of paths is unchanged (resolution
+    depends only on which files exist); otherwise their references are re-read from chunks.
+    """
+    paths = list_indexed_paths(db, repo_id)
+    refs = {path: file_refs for path, file_refs in refs.items() if path in paths}
+    kept = sorted(paths - refs.keys())
+    params = {'repo_id': repo_id, 'commit_sha': commit_sha}
+    db.execute(
+        text('DELETE FROM file_dependencies WHERE repo_id = CAST(:repo_id AS uuid) AND commit_sha = :commit_sha'),
+        params,
+    )
+
+    carry_over = False
+    if kept and plan is not None and previous_paths == paths:
+        row = db.execute(
+            text('SELECT dependencies_commit_sha FROM repositories WHERE id = CAST(:repo_id AS uuid)'),
+            {'repo_id': repo_id},
+        ).mappings().first()
+        carry_over = (row or {}).get('dependencies_commit_sha') == plan.base_sha
+    if carry_over:
         db.execute(
             text(
                 """
-                INSERT INTO code_chunks (id, repo_id, file_path, start_line, end_line, content, language, qdrant_point_id, fts)
-                VALUES (
-                    CAST(:id AS uuid),
-                    CAST(:repo_id AS uuid),
-                    :file_path,
-                    :start_line,
-                    :end_line,
-                    :content,
-                    :language,
-                    NULL,
-                    to_tsvector('english', coalesce(:file_path, '') || ' ' || coalesce(:content, ''))
-                )
+                INSERT INTO file_dependencies (repo_id, commit_sha, source_path, target_path, kind)
+                SELECT repo_id, :commit_sha, source_path, target_path, kind
+                FROM file_dependencies
+                WHERE repo_id = CAST(:repo_id AS uuid)
+                  AND commit_sha = :base_sha
+                  AND source_path = ANY(:kept)
                 """
             ),
-            chunk,
+            {**params, 'base_sha': plan.base_sha, 'kept': kept},
         )
+    elif kept:
+        refs.update(load_import_refs(db, repo_id, kept))
+
+    edges = sorted(resolve_edges(refs, paths))
+    if edges:
+        db.execute(
+            text(
+                """
+                INSERT INTO file_dependencies (repo_id, commit_sha, source_path, target_path, kind)
+                SELECT CAST(:repo_id AS uuid), :commit_sha, edge.source_path, edge.target_path, edge.kind
+                FROM unnest(CAST(:sources AS text[]), CAST(:targets AS text[]), CAST(:kinds AS text[]))
+                    AS edge(source_path, target_path, kind)
+                """
+            ),
+            {
+                **params,
+                'sources': [edge[0] for edge in edges],
+                'targets': [edge[1] for edge in edges],
+                'kinds': [edge[2] for edge in edges],
+            },
+        )
+    db.execute(
+        text('DELETE FROM file_dependencies WHERE repo_id = CAST(:repo_id AS uuid) AND commit_sha <> :commit_sha'),
+        params,
+    )
+    db.execute(
+        text('UPDATE repositories SET dependencies_commit_sha = :commit_sha WHERE id = CAST(:repo_id AS uuid)'),
+        params,
+    )
+
+
+def plan_incremental(db: Session, repo_path: str, snapshot: RepoSnapshot, fingerprint: str) -> IncrementalPlan | None:
+    """Diff against the commit the stored chunks were built from; None means do a full re-index.
+
+    fingerprint is the current chunker_fingerprint; stored chunks built with another one are
+    rebuilt in full.
+    """
+    if not settings.parse_incremental:
+        return None
+
+    row = db.execute(
+        text(
+            """
+            SELECT indexed_commit_sha, indexed_chunker_fingerprint
+            FROM repositories
+            WHERE id = CAST(:repo_id AS uuid)
+            """
+        ),
+        {'repo_id': snapshot.repo_id},
+    ).mappings().first()
+    base_sha = (row or {}).get('indexed_commit_sha')
+    if not base_sha or base_sha == snapshot.commit_sha:
+        return None
+    # Unchanged files would keep chunks cut by a different chunker (mode, sizes, grammars).
+    if (row or {}).get('indexed_chunker_fingerprint') != fingerprint:
+        return None
+
+    paths = compute_changed_paths(repo_path, base_sha, snapshot.commit_sha, timeout=settings.parse_clone_timeout_seconds)
+    if paths is None:
+        return None
+
+    touched = sorted(paths['changed'] | paths['deleted'])
+    kept = db.execute(
+        text(
+            """
+            SELECT COUNT(*) AS kept_chunks
+            FROM code_chunks
+            WHERE repo_id = CAST(:repo_id AS uuid)
+              AND NOT (file_path = ANY(:paths))
+            """
+        ),
+        {'repo_id': snapshot.repo_id, 'paths': touched},
+    ).mappings().first()
+
+    return IncrementalPlan(
+        base_sha=base_sha,
+        changed=paths['changed'],
+        deleted=paths['deleted'],
+        kept_chunks=int((kept or {}).get('kept_chunks') or 0),
+    )
+
+
+def maybe_delete_stale_points(point_ids: list[str]) -> None:
+    """Best-effort: drop vectors of chunks removed by an incremental re-index."""
+    if not point_ids:
+        return
+    try:
+        from embed_worker import delete_chunk_points  # embed_worker imports this module
+
+        delete_chunk_points(point_ids)
+    except Exception as exc:
+        logger.warning("stale point delete failed for %d points; run compact_qdrant: %s", len(point_ids), exc)
+        record_stale_point_cleanup_failure("parsing")
 
 
 def store_commit_diff(db: Session, repo_id: str, diff: dict) -> None:
@@ -224,31 +787,53 @@ def parse_job(db: Session, snapshot: RepoSnapshot) -> None:
     db.commit()
 
     repo_path = None
+    lease = JobLease(snapshot.job_id)
     try:
-        with trace_span("worker.parse", trace_id=snapshot.job_id, repo_id=snapshot.repo_id):
-            repo_path = clone_repo(snapshot.github_url, snapshot.commit_sha)
-            update_job_status(db, snapshot.job_id, 'parsing', 30)
+        with (
+            trace_span("worker.parse", trace_id=snapshot.job_id, repo_id=snapshot.repo_id),
+            lease,
+        ):
+            # "git" ingest reads blobs straight from the object store, so no checkout is needed.
+            from_objects = settings.parse_ingest_mode == 'git'
+            repo_path = clone_repo(snapshot.github_url, snapshot.commit_sha, checkout=not from_objects)
+            update_job_status(db, snapshot.job_id, 'parsing', 30, owner=lease.owner)
             db.commit()
 
-            files = list(iter_source_files(repo_path))
-            if len(files) > settings.parse_max_files:
-                raise ParseError('FILE_LIMIT_EXCEEDED', f'Repo has {len(files)} source files; limit is {settings.parse_max_files}')
+            # Sorted so chunk order is stable across runs regardless of filesystem walk order.
+            if from_objects:
+                blobs = list_source_blobs(repo_path, snapshot.commit_sha)
+                rel_paths = [blob.path for blob in blobs]
+            else:
+                files = filter_checkout_files(repo_path, sorted(iter_source_files(repo_path)))
+                rel_paths = [relative_path(path, repo_path) for path in files]
+            if len(rel_paths) > settings.parse_max_files:
+                raise ParseError('FILE_LIMIT_EXCEEDED', f'Repo has {len(rel_paths)} source files; limit is {settings.parse_max_files}')
+
+            # Incremental mode re-chunks only files the diff touched; everything else keeps its
+            # chunks and vectors. Deleted files are in the plan but not in the tree, so they only
+            # lose their rows.
+            chunk_size, overlap_size, chunk_unit = chunk_sizing()
+            fingerprint = chunker_fingerprint(chunk_size, overlap_size, chunk_unit)
+            plan = plan_incremental(db, repo_path, snapshot, fingerprint)
+            chunk_budget = settings.parse_max_chunks
+            if plan is not None:
+                chunk_budget -= plan.kept_chunks
+
+            if from_objects:
+                if plan is not None:
+                    blobs = [blob for blob in blobs if blob.path in plan.changed]
+                file_chunks = iter_blob_chunks(repo_path, blobs, chunk_size, overlap_size, chunk_unit)
+            else:
+                if plan is not None:
+                    files = [path for path, rel in zip(files, rel_paths) if rel in plan.changed]
+                file_chunks = iter_file_chunks(repo_path, files, chunk_size, overlap_size, chunk_unit)
 
             chunks: list[dict] = []
-            for file_path in files:
-                rel = str(file_path.relative_to(repo_path)).replace('\\', '/')
-                suffix = file_path.suffix.lstrip('.').lower()
-                language = suffix or file_path.name.lower()
-
-                with file_path.open('r', encoding='utf-8', errors='ignore') as fh:
-                    content = fh.read()
-
-                for start_line, end_line, chunk_content in chunk_file(
-                    content,
-                    language,
-                    settings.parse_chunk_lines,
-                    settings.parse_chunk_overlap_lines,
-                ):
+            import_refs: dict[str, list[ImportRef]] = {}
+            for rel, language, spans in file_chunks:
+                if spans:
+                    import_refs[rel] = extract_import_refs(rel, file_text(spans))
+                for start_line, end_line, chunk_content in spans:
                     chunks.append(
                         {
                             'id': str(uuid4()),
@@ -260,18 +845,32 @@ def parse_job(db: Session, snapshot: RepoSnapshot) -> None:
                             'language': language,
                         }
                     )
-                    if len(chunks) > settings.parse_max_chunks:
+                    if len(chunks) > chunk_budget:
                         raise ParseError('CHUNK_LIMIT_EXCEEDED', f'Chunk limit exceeded: {settings.parse_max_chunks}')
 
-            update_job_status(db, snapshot.job_id, 'parsing', 80)
-            store_chunks(db, snapshot.repo_id, chunks)
-            update_job_status(db, snapshot.job_id, 'embedding', 100)
+            lease.check()
+            update_job_status(db, snapshot.job_id, 'parsing', 80, owner=lease.owner)
+            stale_points: list[str] = []
+            previous_paths: set[str] | None = None
+            if plan is None:
+                store_chunks(db, snapshot.repo_id, chunks)
+            else:
+                previous_paths = list_indexed_paths(db, snapshot.repo_id)
+                stale_points = replace_file_chunks(db, snapshot.repo_id, plan.changed | plan.deleted, chunks)
+            store_file_dependencies(db, snapshot.repo_id, snapshot.commit_sha, import_refs, plan, previous_paths)
+            mark_indexed_commit(db, snapshot.repo_id, snapshot.commit_sha, fingerprint)
+            update_job_status(db, snapshot.job_id, 'embedding', 100, owner=lease.owner)
             db.commit()
             record_stage_duration("parsing", "success", time.perf_counter() - started)
+            maybe_delete_stale_points(stale_points)
 
             # Best-effort commit-diff capture (never blocks the parse pipeline).
             maybe_store_commit_diff(db, repo_path, snapshot.repo_id, snapshot.commit_sha)
 
+    except LeaseLost:
+        # The job was reaped and possibly re-claimed; leave it to its new owner.
+        db.rollback()
+        record_stage_duration("parsing", "lease_lost", time.perf_counter() - started)
     except ParseError as exc:
         schedule_retry_or_dead_letter(
             db,
@@ -281,6 +880,7 @@ def parse_job(db: Session, snapshot: RepoSnapshot) -> None:
             error_code=exc.code,
             message=str(exc),
             metadata={'github_url': snapshot.github_url, 'commit_sha': snapshot.commit_sha},
+            owner=lease.owner,
         )
         db.commit()
         record_stage_duration("parsing", "error", time.perf_counter() - started)
@@ -293,12 +893,14 @@ def parse_job(db: Session, snapshot: RepoSnapshot) -> None:
             error_code='UNEXPECTED_PARSE_ERROR',
             message=str(exc),
             metadata={'github_url': snapshot.github_url, 'commit_sha': snapshot.commit_sha},
+            owner=lease.owner,
         )
         db.commit()
         record_stage_duration("parsing", "error", time.perf_counter() - started)
     finally:
         if repo_path and os.path.isdir(repo_path):
             shutil.rmtree(repo_path, ignore_errors=True)
+        maybe_prune_mirrors(snapshot.github_url)
 
 
 def process_next_parse_job(db: Session) -> bool:
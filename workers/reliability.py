@@ -1,10 +1,26 @@
 import json
+import logging
+import os
+import socket
+import threading
 from datetime import UTC, datetime, timedelta
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from config import settings
+from telemetry import record_lease_reaped
+
+logger = logging.getLogger("devlens.worker.reliability")
+
+
+class LeaseLost(RuntimeError):
+    """The job's lease expired and was reaped; another worker may now own the job."""
+
+
+def worker_identity() -> str:
+    """Owner tag written to analysis_jobs.claimed_by when this process claims a job."""
+    return settings.worker_id or f"{socket.gethostname()}:{os.getpid()}"
 
 
 def is_retriable_error(stage: str, error_code: str) -> bool:
@@ -14,6 +30,8 @@ def is_retriable_error(stage: str, error_code: str) -> bool:
         return True
     if stage == "parsing" and error_code in {"CLONE_FAILED", "CLONE_TIMEOUT"}:
         return True
+    if error_code == "LEASE_EXPIRED":
+        return True
     if error_code.startswith("UNEXPECTED_"):
         return True
     return False
@@ -28,7 +46,15 @@ def schedule_retry_or_dead_letter(
     error_code: str,
     message: str,
     metadata: dict | None = None,
+    owner: str | None = None,
 ) -> None:
+    """Requeue the job with backoff, or fail it and record a dead letter once retries run out.
+
+    With owner, both writes only apply while this worker still holds the claim. A stage that
+    raises after its lease was reaped and the job re-claimed must not take it back from the new
+    owner, so nothing is written and no dead letter is recorded.
+    """
+    owner_filter = "AND claimed_by = :owner RETURNING id" if owner is not None else ""
     row = db.execute(
         text(
             """
@@ -47,16 +73,20 @@ def schedule_retry_or_dead_letter(
     if retriable and retry_count < max_attempts:
         delay_seconds = settings.worker_retry_base_delay_seconds * (2 ** retry_count)
         next_retry_at = datetime.now(UTC) + timedelta(seconds=delay_seconds)
-        db.execute(
+        result = db.execute(
             text(
-                """
+                f"""
                 UPDATE analysis_jobs
                 SET status = :stage,
                     error_message = :error_message,
                     retry_count = :retry_count,
                     next_retry_at = :next_retry_at,
-                    completed_at = NULL
+                    completed_at = NULL,
+                    claimed_by = NULL,
+                    claimed_at = NULL,
+                    lease_expires_at = NULL
                 WHERE id = CAST(:job_id AS uuid)
+                {owner_filter}
                 """
             ),
             {
@@ -65,29 +95,40 @@ def schedule_retry_or_dead_letter(
                 "retry_count": retry_count + 1,
                 "next_retry_at": next_retry_at,
                 "error_message": f"{error_code}: {message}",
+                "owner": owner,
             },
         )
+        if owner is not None and result.first() is None:
+            logger.info("job %s was re-claimed; not scheduling a retry for %s", job_id, error_code)
         return
 
     now = datetime.now(UTC)
-    db.execute(
+    result = db.execute(
         text(
-            """
+            f"""
             UPDATE analysis_jobs
             SET status = 'failed',
                 progress = 100,
                 error_message = :error_message,
                 completed_at = :completed_at,
-                next_retry_at = NULL
+                next_retry_at = NULL,
+                claimed_by = NULL,
+                claimed_at = NULL,
+                lease_expires_at = NULL
             WHERE id = CAST(:job_id AS uuid)
+            {owner_filter}
             """
         ),
         {
             "job_id": job_id,
             "completed_at": now,
             "error_message": f"{error_code}: {message}",
+            "owner": owner,
         },
     )
+    if owner is not None and result.first() is None:
+        logger.info("job %s was re-claimed; not dead-lettering %s", job_id, error_code)
+        return
     db.execute(
         text(
             """
@@ -110,3 +151,103 @@ def schedule_retry_or_dead_letter(
         },
     )
 
+
+
+def renew_job_lease(db: Session, job_id: str, owner: str, lease_seconds: int) -> bool:
+    """Push the lease deadline forward. Returns False if the claim is no longer ours."""
+    row = db.execute(
+        text(
+            """
+            UPDATE analysis_jobs
+            SET lease_expires_at = NOW() + make_interval(secs => :lease_seconds)
+            WHERE id = CAST(:job_id AS uuid)
+              AND claimed_by = :owner
+            RETURNING id
+            """
+        ),
+        {"job_id": job_id, "owner": owner, "lease_seconds": lease_seconds},
+    ).first()
+    db.commit()
+    return row is not None
+
+
+class JobLease:
+    """Renews a claimed job's lease from a background thread while a stage runs.
+
+    Renewal uses its own session so it keeps ticking while the stage is blocked in a clone,
+    an embedding request, or a long transaction. If a renewal finds the claim gone (the lease
+    lapsed and was reaped), `lost` is set and the stage aborts at its next `check()`.
+    """
+
+    def __init__(self, job_id: str, session_factory=None, lease_seconds: int | None = None) -> None:
+        self.job_id = job_id
+        self.lost = False
+        self.owner = worker_identity()
+        self._lease_seconds = lease_seconds or settings.worker_lease_seconds
+        self._interval = max(1.0, self._lease_seconds / 3)
+        self._session_factory = session_factory
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "JobLease":
+        self._thread = threading.Thread(target=self._run, name=f"lease-{self.job_id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        if self._session_factory is None:
+            from db import SessionLocal
+
+            self._session_factory = SessionLocal
+        while not self._stop.wait(self._interval):
+            db = self._session_factory()
+            try:
+                if not renew_job_lease(db, self.job_id, self.owner, self._lease_seconds):
+                    self.lost = True
+                    return
+            except Exception as exc:
+                logger.warning("lease renewal failed job_id=%s: %s", self.job_id, exc)
+            finally:
+                db.close()
+
+    def check(self) -> None:
+        if self.lost:
+            raise LeaseLost(f"Lease on job {self.job_id} was lost")
+
+
+def reap_expired_leases(db: Session, limit: int = 50) -> int:
+    """Return jobs whose worker stopped renewing its lease to the queue (or the dead letter)."""
+    rows = db.execute(
+        text(
+            """
+            SELECT id::text AS job_id, repo_id::text AS repo_id, status, claimed_by
+            FROM analysis_jobs
+            WHERE status IN ('parsing', 'embedding', 'analyzing')
+              AND claimed_by IS NOT NULL
+              AND lease_expires_at < NOW()
+            ORDER BY lease_expires_at ASC
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+            """
+        ),
+        {"limit": limit},
+    ).mappings().all()
+
+    for row in rows:
+        schedule_retry_or_dead_letter(
+            db,
+            job_id=row["job_id"],
+            repo_id=row["repo_id"],
+            stage=row["status"],
+            error_code="LEASE_EXPIRED",
+            message=f"Lease held by {row['claimed_by']} expired",
+            metadata={"claimed_by": row["claimed_by"]},
+        )
+        record_lease_reaped(row["status"])
+    db.commit()
+    return len(rows)
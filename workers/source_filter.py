@@ -0,0 +1,177 @@
+"""Pre-chunk classifier: keep binary, minified, generated and vendored files out of the index.
+
+An allowed extension is not enough: minified bundles, generated protobuf stubs, lockfiles and
+SQL dumps all have one, and each turns into thousands of chunks that are embedded and searched
+forever. Files are checked in two steps, each returning a skip reason (or None to keep):
+
+- path_skip_reason: size cap, well-known generated/lockfile names, and the repo's own
+  `.gitattributes` (linguist-generated / linguist-vendored) and `.gitignore` rules;
+- content_skip_reason: NUL-byte sniff, minification (very long lines), and "generated" header
+  markers.
+
+Reasons are short, stable strings used as metric labels.
+"""
+
+import re
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+
+# Bytes sniffed for NUL / generated markers; git's own binary heuristic looks at 8000.
+SNIFF_BYTES = 8000
+
+# Matched case-insensitively in the first 1KB. Deliberately specific: a bare "do not edit"
+# also shows up in hand-written config files.
+GENERATED_MARKERS = (
+    b'@generated',
+    b'code generated by',
+    b'generated by the protocol buffer compiler',
+    b'this file is auto-generated',
+    b'this file was automatically generated',
+    b'autogenerated file',
+)
+
+GENERATED_NAME_PATTERNS = (
+    '*.min.js',
+    '*.min.css',
+    '*.bundle.js',
+    '*-min.js',
+    '*_pb2.py',
+    '*_pb2_grpc.py',
+    '*.pb.go',
+    '*.pb.cc',
+    '*.pb.h',
+    '*.g.cs',
+    '*.designer.cs',
+    'pnpm-lock.yaml',
+    'yarn.lock',
+    'package-lock.json',
+)
+
+
+def _translate(pattern: str) -> str:
+    """gitwildmatch glob -> regex body ('**' spans directories, '*' and '?' do not)."""
+    out: list[str] = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+            out.append('(?:/.*)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            out.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            out.append('[^/]')
+            i += 1
+        elif pattern[i] == '[' and ']' in pattern[i + 1:]:
+            end = pattern.index(']', i + 1)
+            body = pattern[i + 1:end].replace('\\', '\\\\')
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            out.append(f'[{body}]')
+            i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return ''.join(out)
+
+
+@dataclass
+class _Rule:
+    regex: re.Pattern
+    negate: bool = False
+
+
+def compile_pattern(pattern: str) -> _Rule | None:
+    pattern = pattern.strip()
+    if not pattern or pattern.startswith('#'):
+        return None
+    negate = pattern.startswith('!')
+    if negate:
+        pattern = pattern[1:]
+    dir_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    # Any slash other than a trailing one anchors the pattern to the repo root.
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+    if not pattern:
+        return None
+
+    prefix = '^' if anchored else '^(?:.*/)?'
+    # A match on a directory covers everything below it; dir-only patterns match nothing else.
+    suffix = '/.*$' if dir_only else '(?:/.*)?$'
+    return _Rule(re.compile(prefix + _translate(pattern) + suffix), negate)
+
+
+@dataclass
+class RepoIgnoreRules:
+    generated: list[_Rule] = field(default_factory=list)
+    vendored: list[_Rule] = field(default_factory=list)
+    ignored: list[_Rule] = field(default_factory=list)
+
+    @classmethod
+    def from_texts(cls, gitattributes: str | None = None, gitignore: str | None = None) -> 'RepoIgnoreRules':
+        rules = cls()
+        for line in (gitattributes or '').splitlines():
+            parts = line.split()
+            if not parts or parts[0].startswith('#'):
+                continue
+            compiled = compile_pattern(parts[0])
+            if compiled is None:
+                continue
+            for attr in parts[1:]:
+                for name, bucket in (('linguist-generated', rules.generated), ('linguist-vendored', rules.vendored)):
+                    if attr in (name, f'{name}=true'):
+                        bucket.append(_Rule(compiled.regex))
+                    elif attr in (f'-{name}', f'{name}=false'):
+                        bucket.append(_Rule(compiled.regex, negate=True))
+        for line in (gitignore or '').splitlines():
+            compiled = compile_pattern(line)
+            if compiled is not None:
+                rules.ignored.append(compiled)
+        return rules
+
+    @staticmethod
+    def _matches(rules: list[_Rule], rel_path: str) -> bool:
+        matched = False
+        for rule in rules:  # later rules win, as in git
+            if rule.regex.match(rel_path):
+                matched = not rule.negate
+        return matched
+
+    def skip_reason(self, rel_path: str) -> str | None:
+        if self._matches(self.generated, rel_path):
+            return 'linguist_generated'
+        if self._matches(self.vendored, rel_path):
+            return 'linguist_vendored'
+        if self._matches(self.ignored, rel_path):
+            return 'gitignored'
+        return None
+
+
+def path_skip_reason(rel_path: str, size: int, rules: RepoIgnoreRules, max_bytes: int) -> str | None:
+    if max_bytes > 0 and size > max_bytes:
+        return 'too_large'
+    name = rel_path.rsplit('/', 1)[-1].lower()
+    if any(fnmatch(name, pattern) for pattern in GENERATED_NAME_PATTERNS):
+        return 'generated_name'
+    return rules.skip_reason(rel_path)
+
+
+def content_skip_reason(data: bytes, max_line_length: int) -> str | None:
+    head = data[:SNIFF_BYTES]
+    if b'\0' in head:
+        return 'binary'
+    if max_line_length > 0 and len(data) > max_line_length:
+        longest = max((len(line) for line in data.split(b'\n')), default=0)
+        if longest > max_line_length:
+            return 'minified'
+    lowered = head[:1024].lower()
+    if any(marker in lowered for marker in GENERATED_MARKERS):
+        return 'generated_header'
+    return None
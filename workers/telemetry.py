@@ -25,6 +25,31 @@ llm_fallback_total = Counter(
     ["primary_provider", "fallback_provider", "reason"],
 )
 
+worker_leases_reaped_total = Counter(
+    "devlens_worker_leases_reaped_total",
+    "Jobs returned to the queue after their worker lease expired.",
+    ["stage"],
+)
+
+parse_chunk_cache_total = Counter(
+    "devlens_parse_chunk_cache_total",
+    "Blob-SHA chunk cache lookups during parsing.",
+    ["result"],
+)
+
+parse_files_skipped_total = Counter(
+    "devlens_parse_files_skipped_total",
+    "Source files left out of the index by the pre-chunk classifier.",
+    ["reason"],
+)
+
+
+stale_point_cleanup_failures_total = Counter(
+    "devlens_stale_point_cleanup_failures_total",
+    "Failed deletes of stale Qdrant points (orphans left for compact_qdrant).",
+    ["stage"],
+)
+
 
 def start_metrics_server(port: int) -> None:
     try:
@@ -37,6 +62,25 @@ def record_stage_duration(stage: str, status: str, duration_seconds: float) -> N
     stage_duration_seconds.labels(stage=stage, status=status).observe(max(duration_seconds, 0.0))
 
 
+def record_lease_reaped(stage: str) -> None:
+    worker_leases_reaped_total.labels(stage=(stage or "unknown").lower()).inc()
+
+
+def record_chunk_cache(hits: int, misses: int) -> None:
+    if hits:
+        parse_chunk_cache_total.labels(result="hit").inc(hits)
+    if misses:
+        parse_chunk_cache_total.labels(result="miss").inc(misses)
+
+
+def record_file_skipped(reason: str) -> None:
+    parse_files_skipped_total.labels(reason=(reason or "unknown").lower()).inc()
+
+
+def record_stale_point_cleanup_failure(stage: str) -> None:
+    stale_point_cleanup_failures_total.labels(stage=(stage or "unknown").lower()).inc()
+
+
 def record_llm_provider_attempt(provider: str, status: str, error_code: str = "none") -> None:
     llm_provider_attempts_total.labels(
         provider=(provider or "unknown").lower(),
@@ -20,6 +20,9 @@ class FakeSession:
     def first(self):
         return {'retry_count': self.retry_count}
 
+    def all(self):
+        return []
+
 
 
 def test_language_breakdown_percentages_sum_close_to_100() -> None:
@@ -42,6 +45,14 @@ def test_compute_quality_score_is_bounded() -> None:
     assert 0 <= score <= 100
 
 
+def test_compute_quality_score_penalizes_import_cycles() -> None:
+    tech_debt = {'todo_count': 0, 'long_functions': [], 'missing_tests': []}
+    file_tree = {'files': {'a.py': {}}}
+    clean = analyze_worker.compute_quality_score(tech_debt, file_tree, {'cycle_count': 0})
+    tangled = analyze_worker.compute_quality_score(tech_debt, file_tree, {'cycle_count': 2})
+    assert tangled == clean - 6
+
+
 def test_analyze_job_success_marks_done(monkeypatch) -> None:
     fake_db = FakeSession()
     snapshot = AnalyzeSnapshot(
@@ -79,6 +90,28 @@ def test_analyze_job_success_marks_done(monkeypatch) -> None:
     assert observed['count'] == 1
 
 
+def test_analyze_job_stores_the_commit_its_graph_analytics_came_from(monkeypatch) -> None:
+    snapshot = AnalyzeSnapshot(
+        repo_id='00000000-0000-0000-0000-000000000043',
+        job_id='00000000-0000-0000-0000-000000000044',
+        full_name='test-owner/repo',
+        default_branch='main',
+    )
+    chunks = [ChunkRecord(file_path='a.py', start_line=1, end_line=2, content='import b', language='py')]
+    monkeypatch.setattr(analyze_worker, 'load_repo_chunks', lambda *_args, **_kwargs: chunks)
+    monkeypatch.setattr(analyze_worker, 'get_contributor_stats', lambda *_args, **_kwargs: {'top_contributors': []})
+    monkeypatch.setattr(analyze_worker, 'load_dependency_edges', lambda *_args: ('sha-edges', [('a.py', 'b.py')]))
+    monkeypatch.setattr(analyze_worker, 'mark_job_done', lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(analyze_worker, 'record_stage_duration', lambda *_args, **_kwargs: None)
+    stored = {}
+    monkeypatch.setattr(analyze_worker, 'store_analysis_result', lambda *args: stored.setdefault('graph', args[8]))
+
+    analyze_worker.analyze_job(FakeSession(), snapshot)
+
+    assert stored['graph']['commit_sha'] == 'sha-edges'
+    assert stored['graph']['edge_count'] == 1
+
+
 def test_analyze_job_fails_when_no_chunks(monkeypatch) -> None:
     fake_db = FakeSession()
     snapshot = AnalyzeSnapshot(
@@ -155,7 +188,7 @@ def test_generate_architecture_summary_uses_llm_response(monkeypatch) -> None:
         def post(self, *args, **kwargs):
             return DummyResponse()
 
-    monkeypatch.setattr(analyze_worker.httpx, 'Client', DummyClient)
+    monkeypatch.setattr(analyze_worker, 'get_http_client', lambda _upstream: DummyClient())
     summary = analyze_worker.generate_architecture_summary(snapshot, {'py': 100.0}, chunks)
     assert summary == 'LLM architecture summary'
 
@@ -217,7 +250,7 @@ def test_generate_architecture_summary_falls_back_to_groq(monkeypatch) -> None:
                 return DummyResponse(500, {'error': 'upstream failed'})
             return DummyResponse(200, {'choices': [{'message': {'content': 'Groq fallback summary'}}]})
 
-    monkeypatch.setattr(analyze_worker.httpx, 'Client', DummyClient)
+    monkeypatch.setattr(analyze_worker, 'get_http_client', lambda _upstream: DummyClient())
     summary = analyze_worker.generate_architecture_summary(snapshot, {'py': 100.0}, chunks)
 
     assert summary == 'Groq fallback summary'
@@ -282,7 +315,7 @@ def test_generate_architecture_summary_falls_back_on_primary_timeout(monkeypatch
                 raise analyze_worker.httpx.TimeoutException('timed out')
             return DummyResponse(200, {'choices': [{'message': {'content': 'Groq timeout fallback summary'}}]})
 
-    monkeypatch.setattr(analyze_worker.httpx, 'Client', DummyClient)
+    monkeypatch.setattr(analyze_worker, 'get_http_client', lambda _upstream: DummyClient())
     summary = analyze_worker.generate_architecture_summary(snapshot, {'py': 100.0}, chunks)
 
     assert summary == 'Groq timeout fallback summary'
@@ -347,7 +380,7 @@ def test_generate_architecture_summary_falls_back_on_primary_rate_limit(monkeypa
                 return DummyResponse(429, {'error': 'rate limited'})
             return DummyResponse(200, {'choices': [{'message': {'content': 'Groq rate-limit fallback summary'}}]})
 
-    monkeypatch.setattr(analyze_worker.httpx, 'Client', DummyClient)
+    monkeypatch.setattr(analyze_worker, 'get_http_client', lambda _upstream: DummyClient())
     summary = analyze_worker.generate_architecture_summary(snapshot, {'py': 100.0}, chunks)
 
     assert summary == 'Groq rate-limit fallback summary'
@@ -412,7 +445,7 @@ def test_generate_architecture_summary_falls_back_on_transport_error(monkeypatch
                 raise analyze_worker.httpx.TransportError('connection error')
             return DummyResponse(200, {'choices': [{'message': {'content': 'Groq transport fallback summary'}}]})
 
-    monkeypatch.setattr(analyze_worker.httpx, 'Client', DummyClient)
+    monkeypatch.setattr(analyze_worker, 'get_http_client', lambda _upstream: DummyClient())
     summary = analyze_worker.generate_architecture_summary(snapshot, {'py': 100.0}, chunks)
 
     assert summary == 'Groq transport fallback summary'
@@ -477,7 +510,7 @@ def test_generate_architecture_summary_returns_structural_fallback_when_all_prov
                 return DummyResponse(500, {'error': 'upstream failed'})
             raise analyze_worker.httpx.TimeoutException('timed out')
 
-    monkeypatch.setattr(analyze_worker.httpx, 'Client', DummyClient)
+    monkeypatch.setattr(analyze_worker, 'get_http_client', lambda _upstream: DummyClient())
     summary = analyze_worker.generate_architecture_summary(snapshot, {'py': 100.0}, chunks)
 
     assert 'Repository test-owner/repo' in summary
@@ -510,3 +543,29 @@ def test_analyze_job_unexpected_failure_schedules_retry(monkeypatch) -> None:
     assert called['stage'] == 'analyzing'
     assert called['code'] == 'UNEXPECTED_ANALYZE_ERROR'
     assert observed['count'] == 1
+
+
+def test_chunk_stats_single_pass_over_a_generator() -> None:
+    chunks = [
+        ChunkRecord(file_path='src/a.py', start_line=1, end_line=80, content='# TODO\n' * 3, language='Python'),
+        ChunkRecord(file_path='src/a.py', start_line=81, end_line=90, content='x', language='python'),
+        ChunkRecord(file_path='web/app.ts', start_line=1, end_line=5, content='fixme', language='ts'),
+    ]
+    consumed = []
+
+    def stream():
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    stats = analyze_worker.ChunkStats.from_chunks(stream())
+
+    assert len(consumed) == 3
+    assert stats.chunk_count == 3
+    assert analyze_worker.language_breakdown(stats) == analyze_worker.language_breakdown(chunks)
+    assert analyze_worker.detect_tech_debt(stats) == {
+        'long_functions': [{'file': 'src/a.py', 'line': 1, 'length': 80}],
+        'todo_count': 4,
+        'missing_tests': ['src/a.py', 'web/app.ts'],
+    }
+    assert analyze_worker.build_file_tree(stats)['files']['src/a.py'] == {'chunks': 2, 'lines': 90, 'language': 'Python'}
@@ -0,0 +1,58 @@
+import chunk_cache
+import chunking
+
+
+class FakePipeline:
+    def __init__(self, store):
+        self._store = store
+        self._ops = []
+
+    def set(self, key, value, ex=None):
+        self._ops.append((key, value))
+
+    def execute(self):
+        for key, value in self._ops:
+            self._store[key] = value.encode() if isinstance(value, str) else value
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def mget(self, keys):
+        return [self.store.get(k) for k in keys]
+
+    def pipeline(self):
+        return FakePipeline(self.store)
+
+
+def _use_fake(monkeypatch, fake):
+    monkeypatch.setattr(chunk_cache, "_client", fake)
+    monkeypatch.setattr(chunk_cache, "_client_ready", True)
+
+
+def test_round_trip_distinguishes_empty_hit_from_miss(monkeypatch) -> None:
+    _use_fake(monkeypatch, FakeRedis())
+    chunk_cache.store_spans([("k1", [(1, 10), (11, 20)]), ("k2", [])], ttl_seconds=60)
+
+    assert chunk_cache.lookup_spans(["k1", "k2", "k3"]) == [[(1, 10), (11, 20)], [], None]
+
+
+def test_redis_errors_read_as_misses(monkeypatch) -> None:
+    class BrokenRedis:
+        def mget(self, keys):
+            raise RuntimeError("redis down")
+
+        def pipeline(self):
+            raise RuntimeError("redis down")
+
+    _use_fake(monkeypatch, BrokenRedis())
+    chunk_cache.store_spans([("k", [(1, 2)])], ttl_seconds=60)
+    assert chunk_cache.lookup_spans(["k"]) == [None]
+
+
+def test_key_changes_with_chunker_config() -> None:
+    a = chunk_cache.span_key(chunking.chunker_fingerprint(120, 20), "py", "abc")
+    b = chunk_cache.span_key(chunking.chunker_fingerprint(80, 20), "py", "abc")
+    c = chunk_cache.span_key(chunking.chunker_fingerprint(120, 20), "md", "abc")
+    assert len({a, b, c}) == 3
@@ -48,3 +48,83 @@ def test_chunk_code_splits_python_at_definitions() -> None:
     starts = [s for s, _, _ in spans]
     assert starts == sorted(starts)
     assert min(starts) >= 1
+
+
+def test_chunk_code_reuses_loaded_parser(monkeypatch) -> None:
+    pack = pytest.importorskip("tree_sitter_language_pack")
+    calls = {"n": 0}
+
+    def counting_get_parser(name):
+        calls["n"] += 1
+        return pack.get_parser(name)
+
+    monkeypatch.setattr(chunking, "get_parser", counting_get_parser)
+    monkeypatch.setattr(chunking, "_PARSERS", {})
+    chunk_code(PYTHON_SAMPLE, "python", 120, 20)
+    chunk_code(PYTHON_SAMPLE, "python", 120, 20)
+    assert calls["n"] == 1
+
+
+def test_estimate_tokens_counts_words_and_punctuation() -> None:
+    assert chunking.estimate_tokens("") == 0
+    assert chunking.estimate_tokens("x = 1") == 3
+    # Long identifiers cost roughly one token per four characters.
+    assert chunking.estimate_tokens("getUserById()") == 5
+
+
+def test_token_window_packs_lines_within_budget_with_overlap() -> None:
+    weights = [10] * 20
+    spans = chunking._token_window(1, 20, weights, max_tokens=50, overlap_tokens=10)
+    assert all(sum(weights[s - 1:e]) <= 50 for s, e in spans)
+    assert spans[0] == (1, 5)
+    assert spans[1][0] == 5  # one line (10 tokens) of overlap
+    assert spans[-1][1] == 20
+
+
+def test_token_window_keeps_an_oversized_line_alone() -> None:
+    spans = chunking._token_window(1, 3, [5, 500, 5], max_tokens=50, overlap_tokens=0)
+    assert spans == [(1, 1), (2, 2), (3, 3)]
+
+
+def _class_with_methods(count: int, body_lines: int) -> str:
+    out = ["class Service:"]
+    for i in range(count):
+        out.append(f"    def method_{i}(self, value):")
+        out.extend(f"        value = value + {j}" for j in range(body_lines))
+        out.append("        return value")
+        out.append("")
+    return "\n".join(out) + "\n"
+
+
+def test_chunk_code_tokens_splits_oversized_class_at_methods() -> None:
+    pytest.importorskip("tree_sitter_language_pack")
+    source = _class_with_methods(count=6, body_lines=8)
+    budget = 120
+
+    spans = chunk_code(source, "python", budget, 16, unit="tokens")
+
+    assert len(spans) > 1
+    assert all(chunking.estimate_tokens(text) <= budget for _, _, text in spans)
+    # Small methods are packed together, and no method is cut across two chunks.
+    for i in range(6):
+        owners = [text for _, _, text in spans if f"def method_{i}(" in text]
+        assert len(owners) == 1
+        assert all(f"value + {j}\n" in owners[0] for j in range(8))
+
+
+def test_chunk_code_tokens_keeps_small_file_whole() -> None:
+    pytest.importorskip("tree_sitter_language_pack")
+    spans = chunk_code(PYTHON_SAMPLE, "python", 480, 32, unit="tokens")
+    assert len(spans) == 1
+    assert spans[0][0] == 1
+
+
+def test_chunk_tokens_windows_plain_text() -> None:
+    content = "\n".join(f"word{i} " * 8 for i in range(100))
+    spans = chunking.chunk_tokens(content, 64, 8)
+    assert all(chunking.estimate_tokens(text) <= 64 for _, _, text in spans)
+    assert spans[-1][1] == 100
+
+
+def test_chunker_fingerprint_depends_on_unit() -> None:
+    assert chunking.chunker_fingerprint(120, 20, "lines") != chunking.chunker_fingerprint(120, 20, "tokens")
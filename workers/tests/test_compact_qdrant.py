@@ -0,0 +1,49 @@
+import compact_qdrant
+
+
+class FakeResult:
+    def __init__(self, rows) -> None:
+        self._rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class FakeSession:
+    def __init__(self, active_jobs, referenced) -> None:
+        self.active_jobs = active_jobs
+        self.referenced = referenced
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if 'analysis_jobs' in sql:
+            return FakeResult([{'job_id': job_id} for job_id in self.active_jobs])
+        return FakeResult([{'qdrant_point_id': pid} for pid in params['point_ids'] if pid in self.referenced])
+
+
+def test_delete_orphan_points_skips_referenced_and_in_flight_points(monkeypatch) -> None:
+    pages = {
+        None: ([{'id': 'p1', 'payload': {'generation': 'old'}}, {'id': 'p2', 'payload': {'generation': 'old'}}], 'p3'),
+        'p3': ([{'id': 'p3', 'payload': {'generation': 'running'}}, {'id': 'p4', 'payload': {}}], None),
+    }
+    monkeypatch.setattr(compact_qdrant, 'scroll_points', lambda offset, _limit: pages[offset])
+    deleted = []
+    monkeypatch.setattr(compact_qdrant, 'delete_chunk_points', deleted.extend)
+
+    db = FakeSession(active_jobs=['running'], referenced={'p1'})
+    scanned, orphaned = compact_qdrant.delete_orphan_points(db)
+
+    assert (scanned, orphaned) == (4, 2)
+    assert deleted == ['p2', 'p4']
+
+
+def test_delete_orphan_points_dry_run_deletes_nothing(monkeypatch) -> None:
+    monkeypatch.setattr(compact_qdrant, 'scroll_points', lambda _offset, _limit: ([{'id': 'p1', 'payload': {}}], None))
+    monkeypatch.setattr(compact_qdrant, 'delete_chunk_points', lambda _ids: (_ for _ in ()).throw(AssertionError('deleted')))
+
+    scanned, orphaned = compact_qdrant.delete_orphan_points(FakeSession(active_jobs=[], referenced=set()), dry_run=True)
+
+    assert (scanned, orphaned) == (1, 1)
@@ -0,0 +1,30 @@
+from dependencies import extract_import_refs, file_text, resolve_edges
+
+
+def test_file_text_drops_overlapping_lines() -> None:
+    spans = [(1, 3, 'a\nb\nc'), (3, 5, 'c\nd\ne')]
+    assert file_text(spans) == 'a\nb\nc\nd\ne'
+
+
+def test_extract_import_refs_python_and_javascript() -> None:
+    py_refs = extract_import_refs('app/main.py', 'import os, app.utils as u\nfrom app.handlers import router\n')
+    assert py_refs == [('os', 'python'), ('app.utils', 'python'), ('app.handlers', 'python')]
+
+    js_refs = extract_import_refs('web/index.ts', "import { a } from './a'\nconst b = require('../lib/b')\n")
+    assert js_refs == [('./a', 'javascript'), ('../lib/b', 'javascript')]
+    assert extract_import_refs('README.md', 'import x') == []
+
+
+def test_resolve_edges_against_commit_paths() -> None:
+    files = {'app/main.py', 'app/utils.py', 'app/handlers/__init__.py', 'web/index.ts', 'web/a.ts', 'lib/b/index.js'}
+    refs = {
+        'app/main.py': [('os', 'python'), ('app.utils', 'python'), ('app.handlers', 'python'), ('app.main', 'python')],
+        'web/index.ts': [('./a', 'javascript'), ('../lib/b', 'javascript'), ('react', 'javascript')],
+    }
+
+    assert resolve_edges(refs, files) == {
+        ('app/main.py', 'app/utils.py', 'python'),
+        ('app/main.py', 'app/handlers/__init__.py', 'python'),
+        ('web/index.ts', 'web/a.ts', 'javascript'),
+        ('web/index.ts', 'lib/b/index.js', 'javascript'),
+    }
@@ -1,4 +1,4 @@
-from diffing import detect_security_touches, parse_unified_diff
+from diffing import detect_security_touches, parse_name_status, parse_unified_diff
 
 SAMPLE_DIFF = """diff --git a/app/auth.py b/app/auth.py
 index 111..222 100644
@@ -62,3 +62,14 @@ def test_detect_security_touches_flags_auth_file() -> None:
 
 def test_empty_diff_returns_no_files() -> None:
     assert parse_unified_diff("") == []
+
+
+def test_parse_name_status_splits_changed_and_deleted() -> None:
+    output = "M\0app/main.py\0A\0app/new.py\0D\0app/old.py\0T\0bin/run\0"
+    paths = parse_name_status(output)
+    assert paths["changed"] == {"app/main.py", "app/new.py", "bin/run"}
+    assert paths["deleted"] == {"app/old.py"}
+
+
+def test_parse_name_status_empty_output() -> None:
+    assert parse_name_status("") == {"changed": set(), "deleted": set()}
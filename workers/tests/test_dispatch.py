@@ -0,0 +1,83 @@
+import dispatch
+from dispatch import JobListener
+
+
+class FakeConnection:
+    def __init__(self, pending=None, broken=False):
+        self.pending = list(pending or [])
+        self.broken = broken
+        self.closed = False
+        self.executed = []
+        self.notify_calls = []
+
+    def execute(self, sql):
+        self.executed.append(sql)
+
+    def notifies(self, timeout=None, stop_after=None):
+        self.notify_calls.append((timeout, stop_after))
+        if self.broken:
+            raise RuntimeError("connection lost")
+        count = 0
+        while self.pending and (stop_after is None or count < stop_after):
+            count += 1
+            yield self.pending.pop(0)
+
+    def close(self):
+        self.closed = True
+
+
+class FakePsycopg:
+    def __init__(self, conn):
+        self.conn = conn
+        self.connects = 0
+
+    def connect(self, conninfo, autocommit=False):
+        self.connects += 1
+        assert autocommit is True
+        return self.conn
+
+
+def test_wait_returns_true_and_drains_burst(monkeypatch) -> None:
+    conn = FakeConnection(pending=["queued", "embedding", "analyzing"])
+    monkeypatch.setattr(dispatch, "psycopg", FakePsycopg(conn))
+
+    listener = JobListener("postgresql://x")
+    assert listener.wait(5) is True
+    assert conn.executed == ["LISTEN devlens_jobs"]
+    # The first notify wakes the worker; the rest of the burst is coalesced.
+    assert conn.pending == []
+
+
+def test_wait_times_out_without_notifications(monkeypatch) -> None:
+    conn = FakeConnection()
+    monkeypatch.setattr(dispatch, "psycopg", FakePsycopg(conn))
+
+    listener = JobListener("postgresql://x")
+    assert listener.wait(0.01) is False
+    assert conn.notify_calls == [(0.01, 1)]
+
+
+def test_wait_reconnects_after_connection_error(monkeypatch) -> None:
+    conn = FakeConnection(broken=True)
+    fake = FakePsycopg(conn)
+    monkeypatch.setattr(dispatch, "psycopg", fake)
+    monkeypatch.setattr(dispatch.time, "sleep", lambda *_args: None)
+
+    listener = JobListener("postgresql://x")
+    assert listener.wait(1) is False
+    assert conn.closed is True
+
+    conn.broken = False
+    conn.closed = False
+    conn.pending = ["queued"]
+    assert listener.wait(1) is True
+    assert fake.connects == 2
+
+
+def test_wait_falls_back_to_sleep_when_unavailable(monkeypatch) -> None:
+    slept = []
+    monkeypatch.setattr(dispatch, "psycopg", None)
+    monkeypatch.setattr(dispatch.time, "sleep", lambda seconds: slept.append(seconds))
+
+    assert JobListener("postgresql://x").wait(3) is False
+    assert slept == [3]
@@ -1,8 +1,17 @@
 import json
 
+import pytest
+
 import embed_cache
 
 
+@pytest.fixture(autouse=True)
+def _empty_local_tier():
+    embed_cache._local.clear()
+    yield
+    embed_cache._local.clear()
+
+
 class FakePipeline:
     def __init__(self, store):
         self._store = store
@@ -84,3 +93,53 @@ def test_mget_error_falls_back(monkeypatch) -> None:
     _use_fake(monkeypatch, BrokenRedis())
     out = embed_cache.embed_with_cache(["x", "y"], lambda texts: [[1.0], [2.0]], model="m", ttl_seconds=10)
     assert out == [[1.0], [2.0]]
+
+
+def test_vectors_round_trip_through_binary_encoding() -> None:
+    vector = [0.25, -1.5, 3.0, 0.0]
+    raw = embed_cache.encode_vector(vector)
+    assert len(raw) == 4 + 4 * len(vector)
+    assert embed_cache.decode_vector(raw) == vector
+
+    half = embed_cache.encode_vector(vector, "float16")
+    assert len(half) == 4 + 2 * len(vector)
+    assert embed_cache.decode_vector(half) == vector
+
+
+def test_stores_binary_and_reads_legacy_json(monkeypatch) -> None:
+    fake = FakeRedis()
+    fake.store[embed_cache._key("m", "old")] = json.dumps([1.5]).encode()
+    _use_fake(monkeypatch, fake)
+
+    out = embed_cache.embed_with_cache(["old", "new"], lambda texts: [[2.5] for _ in texts], model="m", ttl_seconds=10)
+
+    assert out == [[1.5], [2.5]]
+    assert fake.store[embed_cache._key("m", "new")][:2] == b"EV"
+
+
+def test_local_tier_serves_repeat_hits_without_redis(monkeypatch) -> None:
+    fake = FakeRedis()
+    _use_fake(monkeypatch, fake)
+    monkeypatch.setattr(embed_cache.settings, "embed_cache_local_entries", 2)
+
+    embed_cache.embed_with_cache(["a", "b"], lambda texts: [[1.0] for _ in texts], model="m", ttl_seconds=10)
+    out = embed_cache.embed_with_cache(["a", "b"], lambda texts: pytest.fail("should be cached"), model="m", ttl_seconds=10)
+
+    assert out == [[1.0], [1.0]]
+    assert fake.mget_calls == 1
+
+
+def test_local_tier_evicts_least_recently_used(monkeypatch) -> None:
+    monkeypatch.setattr(embed_cache, "_client", None)
+    monkeypatch.setattr(embed_cache, "_client_ready", True)
+    monkeypatch.setattr(embed_cache.settings, "embed_cache_local_entries", 2)
+    embedded = []
+
+    def embed_fn(texts):
+        embedded.extend(texts)
+        return [[1.0] for _ in texts]
+
+    for text in ["a", "b", "a", "c", "a", "b"]:
+        embed_cache.embed_with_cache([text], embed_fn, model="m", ttl_seconds=10)
+
+    assert embedded == ["a", "b", "c", "b"]
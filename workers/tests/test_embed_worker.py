@@ -1,3 +1,7 @@
+import time
+
+import pytest
+
 import embed_worker
 import embeddings
 from embed_worker import ChunkRecord, EmbedSnapshot, EmbedError
@@ -44,7 +48,7 @@ class _FakeClient:
     def __exit__(self, *_args):
         return False
 
-    def post(self, url, headers=None, json=None):
+    def post(self, url, headers=None, json=None, timeout=None):
         self._capture['url'] = url
         self._capture['headers'] = headers
         self._capture['json'] = json
@@ -60,9 +64,9 @@ def test_embed_texts_calls_nim_with_passage_input_type(monkeypatch) -> None:
         {'index': 0, 'embedding': [0.1, 0.2, 0.3]},
     ]}
     monkeypatch.setattr(
-        embeddings.httpx,
-        'Client',
-        lambda *a, **k: _FakeClient(_FakeResponse(200, payload), capture),
+        embeddings,
+        'get_http_client',
+        lambda _upstream: _FakeClient(_FakeResponse(200, payload), capture),
     )
 
     vectors = embed_texts(['first passage', 'second passage'])
@@ -104,7 +108,10 @@ def test_embed_job_success_transitions_to_analyzing(monkeypatch) -> None:
     monkeypatch.setattr(embed_worker, 'load_repo_chunks', lambda *_args, **_kwargs: chunks)
     monkeypatch.setattr(embed_worker, 'ensure_collection', lambda: None)
     monkeypatch.setattr(embed_worker, 'embed_texts', lambda contents, size=None: [[0.0] * 4 for _ in contents])
-    monkeypatch.setattr(embed_worker, 'upsert_chunk_vectors', lambda _repo_id, batch, _vectors: [f'id-{c.id}' for c in batch])
+    monkeypatch.setattr(embed_worker, 'upsert_chunk_vectors', lambda _repo_id, batch, _vectors, **_kwargs: [f'id-{c.id}' for c in batch])
+    monkeypatch.setattr(embed_worker, 'count_repo_chunks', lambda *_args, **_kwargs: 2)
+    swept = []
+    monkeypatch.setattr(embed_worker, 'sweep_stale_points', lambda repo_id, generation: swept.append((repo_id, generation)))
 
     stored = {'count': 0}
 
@@ -119,6 +126,7 @@ def test_embed_job_success_transitions_to_analyzing(monkeypatch) -> None:
 
     assert stored['count'] == 2
     assert observed['count'] == 1
+    assert swept == [(snapshot.repo_id, snapshot.job_id)]
     updates = [e for e in fake_db.events if e[0] == 'execute' and 'UPDATE analysis_jobs' in str(e[1][0])]
     assert any('analyzing' in str(ev) for ev in updates)
 
@@ -187,3 +195,144 @@ def test_embed_job_retriable_failure_schedules_retry(monkeypatch) -> None:
     assert called['stage'] == 'embedding'
     assert called['code'] == 'EMBED_UPSERT_FAILED'
     assert observed['count'] == 1
+
+
+def test_embed_job_skips_when_all_chunks_already_embedded(monkeypatch) -> None:
+    fake_db = FakeSession()
+    snapshot = EmbedSnapshot(repo_id='00000000-0000-0000-0000-000000000041', job_id='00000000-0000-0000-0000-000000000042')
+
+    monkeypatch.setattr(embed_worker, 'load_repo_chunks', lambda *_args, **_kwargs: [])
+    monkeypatch.setattr(embed_worker, 'count_repo_chunks', lambda *_args, **_kwargs: 12)
+    monkeypatch.setattr(embed_worker, 'ensure_collection', lambda: pytest.fail('no embedding expected'))
+
+    embed_worker.embed_job(fake_db, snapshot)
+
+    updates = [e for e in fake_db.events if e[0] == 'execute' and 'UPDATE analysis_jobs' in str(e[1][0])]
+    assert any('analyzing' in str(u) for u in updates)
+    assert not any('NO_CHUNKS' in str(u) for u in updates)
+
+
+def test_upsert_chunk_vectors_uses_deterministic_point_ids(monkeypatch) -> None:
+    captured = []
+    monkeypatch.setattr(embed_worker, '_request_with_retries', lambda method, url, *, json_body=None, **_kwargs: captured.append(json_body))
+    chunk = ChunkRecord(id='00000000-0000-0000-0000-000000000201', file_path='a.py', start_line=1, end_line=2, content='x', language='py')
+
+    first = embed_worker.upsert_chunk_vectors('repo', [chunk], [[0.0]], generation='gen-1')
+    second = embed_worker.upsert_chunk_vectors('repo', [chunk], [[0.0]], generation='gen-2')
+
+    assert first == second == [embed_worker.chunk_point_id(chunk.id)]
+    assert captured[1]['points'][0]['payload']['generation'] == 'gen-2'
+
+
+def test_sweep_stale_points_filters_by_repo_and_other_generations(monkeypatch) -> None:
+    captured = {}
+
+    def fake_request(method, url, *, json_body=None, allowed_statuses=None, headers=None):
+        captured.update(method=method, url=url, body=json_body)
+
+    monkeypatch.setattr(embed_worker, '_request_with_retries', fake_request)
+    embed_worker.sweep_stale_points('repo-1', 'job-9')
+
+    assert captured['method'] == 'POST'
+    assert captured['url'].endswith('/points/delete?wait=true')
+    assert captured['body']['filter']['must'] == [{'key': 'repo_id', 'match': {'value': 'repo-1'}}]
+    assert captured['body']['filter']['must_not'] == [{'key': 'generation', 'match': {'value': 'job-9'}}]
+
+
+def test_embed_job_maps_point_ids_per_batch_with_one_statement(monkeypatch) -> None:
+    fake_db = FakeSession()
+    snapshot = EmbedSnapshot(repo_id='00000000-0000-0000-0000-000000000051', job_id='00000000-0000-0000-0000-000000000052')
+    chunks = [
+        ChunkRecord(id=f'00000000-0000-0000-0000-00000000030{i}', file_path='a.py', start_line=i, end_line=i, content=f'x{i}', language='py')
+        for i in range(5)
+    ]
+
+    monkeypatch.setattr(embed_worker.settings, 'embed_batch_size', 2)
+    monkeypatch.setattr(embed_worker, 'load_repo_chunks', lambda *_args, **_kwargs: chunks)
+    monkeypatch.setattr(embed_worker, 'ensure_collection', lambda: None)
+    monkeypatch.setattr(embed_worker, 'embed_texts', lambda contents, size=None: [[0.0] * 4 for _ in contents])
+    monkeypatch.setattr(embed_worker, 'upsert_chunk_vectors', lambda _repo_id, batch, _vectors, **_kwargs: [f'p-{c.id}' for c in batch])
+    monkeypatch.setattr(embed_worker, 'sweep_stale_points', lambda *_args: None)
+
+    embed_worker.embed_job(fake_db, snapshot)
+
+    mappings = [e for e in fake_db.events if e[0] == 'execute' and 'unnest' in str(e[1][0])]
+    assert [len(m[1][1]['chunk_ids']) for m in mappings] == [2, 2, 1]
+    assert mappings[0][1][1]['qdrant_ids'] == [f'p-{chunks[0].id}', f'p-{chunks[1].id}']
+    # Each batch's mapping is committed before the next batch is embedded.
+    first_mapping = fake_db.events.index(mappings[0])
+    second_mapping = fake_db.events.index(mappings[1])
+    assert ('commit',) in fake_db.events[first_mapping:second_mapping]
+
+
+def test_iter_embedded_batches_bounds_in_flight_and_preserves_order(monkeypatch) -> None:
+    import threading
+
+    lock = threading.Lock()
+    state = {'active': 0, 'peak': 0}
+
+    def fake_embed_and_upsert(_repo_id, batch, _generation):
+        with lock:
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+        time.sleep(0.02 if int(batch[0].id) % 2 else 0.01)
+        with lock:
+            state['active'] -= 1
+        return [f'p-{c.id}' for c in batch]
+
+    monkeypatch.setattr(embed_worker, 'embed_and_upsert_batch', fake_embed_and_upsert)
+    chunks = [ChunkRecord(id=str(i), file_path='a.py', start_line=i, end_line=i, content='x', language='py') for i in range(20)]
+
+    results = list(embed_worker.iter_embedded_batches('repo', chunks, 'gen', batch_size=3, max_in_flight=3))
+
+    assert [c.id for batch, _ids in results for c in batch] == [str(i) for i in range(20)]
+    assert all(ids == [f'p-{c.id}' for c in batch] for batch, ids in results)
+    assert 1 < state['peak'] <= 3
+
+
+def test_iter_embedded_batches_propagates_batch_failure(monkeypatch) -> None:
+    def failing(_repo_id, batch, _generation):
+        if batch[0].id == '2':
+            raise EmbedError('EMBED_UPSERT_FAILED', 'qdrant down')
+        return ['p'] * len(batch)
+
+    monkeypatch.setattr(embed_worker, 'embed_and_upsert_batch', failing)
+    chunks = [ChunkRecord(id=str(i), file_path='a.py', start_line=i, end_line=i, content='x', language='py') for i in range(6)]
+
+    with pytest.raises(EmbedError):
+        list(embed_worker.iter_embedded_batches('repo', chunks, 'gen', batch_size=2, max_in_flight=2))
+
+
+def test_load_repo_chunks_streams_keyset_pages(monkeypatch) -> None:
+    rows = [
+        {'id': f'00000000-0000-0000-0000-00000000040{i}', 'file_path': 'a.py', 'start_line': i, 'end_line': i, 'content': 'x', 'language': 'py'}
+        for i in range(5)
+    ]
+
+    class PagedSession:
+        def __init__(self) -> None:
+            self.calls = []
+
+        def execute(self, _statement, params):
+            self.calls.append(dict(params))
+            page = [row for row in rows if row['id'] > params['after']][: params['limit']]
+            return PagedResult(page)
+
+    class PagedResult:
+        def __init__(self, page) -> None:
+            self._page = page
+
+        def mappings(self):
+            return self
+
+        def all(self):
+            return self._page
+
+    monkeypatch.setattr(embed_worker.settings, 'chunk_load_page_size', 2)
+    db = PagedSession()
+    stream = embed_worker.load_repo_chunks(db, 'repo', only_unembedded=True)
+
+    assert next(stream).id == rows[0]['id']
+    assert len(db.calls) == 1
+    assert [chunk.id for chunk in stream] == [row['id'] for row in rows[1:]]
+    assert [call['after'] for call in db.calls] == ['00000000-0000-0000-0000-000000000000', rows[1]['id'], rows[3]['id']]
@@ -0,0 +1,58 @@
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import gitobjects
+
+
+def _git(cwd: Path, *args: str) -> str:
+    env = {**os.environ, 'GIT_AUTHOR_NAME': 't', 'GIT_AUTHOR_EMAIL': 't@t', 'GIT_COMMITTER_NAME': 't', 'GIT_COMMITTER_EMAIL': 't@t'}
+    return subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True, text=True, env=env).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path) -> Path:
+    _git(tmp_path, 'init', '-q', '-b', 'main')
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'app.py').write_text('print("hi")\n')
+    (tmp_path / 'node_modules').mkdir()
+    (tmp_path / 'node_modules' / 'dep.js').write_text('x')
+    (tmp_path / 'big.bin').write_bytes(bytes(range(256)) * 64)
+    os.symlink('src/app.py', tmp_path / 'link.py')
+    _git(tmp_path, 'add', '-A')
+    _git(tmp_path, 'commit', '-q', '-m', 'init')
+    return tmp_path
+
+
+def test_parse_ls_tree_keeps_regular_blobs_only() -> None:
+    output = (
+        b'100644 blob aaaa     12\tsrc/a.py\0'
+        b'120000 blob bbbb      5\tlink.py\0'
+        b'160000 commit cccc       -\tvendor/sub\0'
+    )
+    assert gitobjects.parse_ls_tree(output) == [gitobjects.SourceBlob(path='src/a.py', sha='aaaa', size=12)]
+
+
+def test_list_blobs_filters_paths_before_reading(repo) -> None:
+    head = _git(repo, 'rev-parse', 'HEAD')
+    blobs = gitobjects.list_blobs(str(repo), head, include=lambda path: not path.startswith('node_modules/'))
+
+    assert [blob.path for blob in blobs] == ['big.bin', 'src/app.py']
+    assert blobs[1].sha == _git(repo, 'rev-parse', f'{head}:src/app.py')
+
+
+def test_iter_blob_contents_streams_through_one_process(repo) -> None:
+    head = _git(repo, 'rev-parse', 'HEAD')
+    blobs = gitobjects.list_blobs(str(repo), head)
+
+    contents = dict(zip((blob.path for blob in blobs), gitobjects.iter_blob_contents(str(repo), [blob.sha for blob in blobs])))
+
+    assert contents['src/app.py'] == b'print("hi")\n'
+    assert contents['big.bin'] == bytes(range(256)) * 64
+
+
+def test_iter_blob_contents_raises_on_missing_object(repo) -> None:
+    with pytest.raises(gitobjects.GitObjectError):
+        list(gitobjects.iter_blob_contents(str(repo), ['0' * 40]))
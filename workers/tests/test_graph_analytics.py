@@ -0,0 +1,33 @@
+from graph_analytics import compute_graph_analytics, pagerank, strongly_connected_components
+
+
+def test_strongly_connected_components_finds_cycles() -> None:
+    edges = [('a', 'b'), ('b', 'c'), ('c', 'a'), ('c', 'd'), ('e', 'e')]
+    components = strongly_connected_components(['a', 'b', 'c', 'd', 'e'], edges)
+    assert sorted(components) == [['a', 'b', 'c'], ['d'], ['e']]
+
+
+def test_strongly_connected_components_handles_deep_chains() -> None:
+    depth = 5000
+    edges = [(f'f{i}', f'f{i + 1}') for i in range(depth)] + [(f'f{depth}', 'f0')]
+    components = strongly_connected_components([], edges)
+    assert len(components) == 1 and len(components[0]) == depth + 1
+
+
+def test_pagerank_favours_widely_imported_files() -> None:
+    ranks = pagerank(['a', 'b', 'core'], [('a', 'core'), ('b', 'core')])
+    assert abs(sum(ranks.values()) - 1.0) < 1e-6
+    assert ranks['core'] > ranks['a'] == ranks['b']
+
+
+def test_compute_graph_analytics_summarizes_degrees_and_cycles() -> None:
+    edges = [('api.py', 'models.py'), ('cli.py', 'models.py'), ('models.py', 'db.py'), ('db.py', 'models.py')]
+    result = compute_graph_analytics(['api.py', 'cli.py', 'models.py', 'db.py', 'README.md'], edges, top_n=2)
+
+    assert result['node_count'] == 5
+    assert result['edge_count'] == 4
+    assert result['cycle_count'] == 1
+    assert result['cycles'] == [['db.py', 'models.py']]
+    assert result['top_fan_in'][0] == {'file_path': 'models.py', 'value': 3}
+    assert len(result['top_fan_out']) == 2
+    assert result['top_central'][0]['file_path'] == 'models.py'
@@ -0,0 +1,12 @@
+import http_clients
+
+
+def test_clients_are_shared_per_upstream_and_closed() -> None:
+    try:
+        nim = http_clients.get_http_client('nim')
+        assert http_clients.get_http_client('nim') is nim
+        assert http_clients.get_http_client('qdrant') is not nim
+    finally:
+        http_clients.close_http_clients()
+    assert nim.is_closed
+    assert http_clients._clients == {}
@@ -0,0 +1,100 @@
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import mirrors
+
+
+def _git(cwd: Path, *args: str) -> str:
+    env = {**os.environ, 'GIT_AUTHOR_NAME': 't', 'GIT_AUTHOR_EMAIL': 't@t', 'GIT_COMMITTER_NAME': 't', 'GIT_COMMITTER_EMAIL': 't@t'}
+    return subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True, text=True, env=env).stdout.strip()
+
+
+def _commit(repo: Path, name: str, content: str) -> str:
+    (repo / name).write_text(content)
+    _git(repo, 'add', name)
+    _git(repo, 'commit', '-q', '-m', name)
+    return _git(repo, 'rev-parse', 'HEAD')
+
+
+@pytest.fixture
+def origin(tmp_path, monkeypatch):
+    monkeypatch.setattr(mirrors.settings, 'parse_mirror_dir', str(tmp_path / 'mirrors'))
+    repo = tmp_path / 'origin'
+    repo.mkdir()
+    _git(repo, 'init', '-q', '-b', 'main')
+    return repo
+
+
+def test_checkout_reuses_mirror_and_fetches_only_new_commits(origin) -> None:
+    first = _commit(origin, 'a.py', 'print(1)\n')
+    url = origin.as_uri()
+
+    work = mirrors.checkout_from_mirror(url, first, timeout=30)
+    assert (Path(work) / 'a.py').read_text() == 'print(1)\n'
+    assert mirrors.mirror_path(url).is_dir()
+
+    second = _commit(origin, 'b.py', 'print(2)\n')
+    work2 = mirrors.checkout_from_mirror(url, second, timeout=30)
+    assert (Path(work2) / 'b.py').exists()
+    # The older commit is still resolvable from the checkout, so incremental diffs stay local.
+    assert _git(Path(work2), 'cat-file', '-t', first) == 'commit'
+
+
+def test_checkout_survives_mirror_eviction(origin) -> None:
+    sha = _commit(origin, 'a.py', 'x = 1\n')
+    work = mirrors.checkout_from_mirror(origin.as_uri(), sha, timeout=30)
+
+    evicted = mirrors.prune_mirrors(0)
+
+    assert evicted == [mirrors.mirror_path(origin.as_uri())]
+    assert _git(Path(work), 'cat-file', '-t', sha) == 'commit'
+
+
+def test_prune_mirrors_evicts_least_recently_used_first(origin, tmp_path) -> None:
+    root = tmp_path / 'mirrors'
+    for index, name in enumerate(['old.git', 'mid.git', 'new.git']):
+        path = root / name
+        path.mkdir(parents=True)
+        (path / 'pack').write_bytes(b'x' * 100)
+        os.utime(path, (1000 + index, 1000 + index))
+
+    evicted = mirrors.prune_mirrors(250, keep=root / 'old.git')
+
+    assert evicted == [root / 'mid.git']
+    assert (root / 'old.git').is_dir() and (root / 'new.git').is_dir()
+
+
+def test_fetch_failure_keeps_existing_mirror(origin) -> None:
+    sha = _commit(origin, 'a.py', 'x = 1\n')
+    url = origin.as_uri()
+    mirrors.checkout_from_mirror(url, sha, timeout=30)
+
+    with pytest.raises(subprocess.CalledProcessError):
+        mirrors.checkout_from_mirror(url, 'f' * 40, timeout=30)
+
+    mirror = mirrors.mirror_path(url)
+    assert _git(mirror, 'cat-file', '-t', sha) == 'commit'
+
+
+def test_unreadable_mirror_is_recloned(origin) -> None:
+    sha = _commit(origin, 'a.py', 'x = 1\n')
+    url = origin.as_uri()
+    mirror = mirrors.mirror_path(url)
+    mirror.mkdir(parents=True)
+    (mirror / 'config').write_text('partial')
+
+    work = mirrors.checkout_from_mirror(url, sha, timeout=30)
+
+    assert (Path(work) / 'a.py').read_text() == 'x = 1\n'
+
+
+def test_failed_initial_clone_leaves_no_mirror(origin, tmp_path) -> None:
+    url = (tmp_path / 'missing').as_uri()
+
+    with pytest.raises(subprocess.CalledProcessError):
+        mirrors.checkout_from_mirror(url, 'f' * 40, timeout=30)
+
+    assert not mirrors.mirror_path(url).exists()
@@ -25,6 +25,9 @@ class FakeSession:
     def first(self):
         return {'retry_count': self.retry_count}
 
+    def all(self):
+        return []
+
 
 
 def test_chunk_lines_with_overlap() -> None:
@@ -72,6 +75,7 @@ def test_parse_job_fails_when_file_limit_exceeded(monkeypatch) -> None:
 
         monkeypatch.setattr(parse_worker.settings, 'parse_max_files', 2)
         monkeypatch.setattr(parse_worker, 'clone_repo', lambda *_args, **_kwargs: tmp)
+        monkeypatch.setattr(parse_worker.settings, 'parse_ingest_mode', 'checkout')
 
         parse_job(fake_db, snapshot)
 
@@ -91,6 +95,7 @@ def test_parse_job_success_transitions_to_embedding(monkeypatch) -> None:
         monkeypatch.setattr(parse_worker.settings, 'parse_max_files', 100)
         monkeypatch.setattr(parse_worker.settings, 'parse_max_chunks', 100)
         monkeypatch.setattr(parse_worker, 'clone_repo', lambda *_args, **_kwargs: tmp)
+        monkeypatch.setattr(parse_worker.settings, 'parse_ingest_mode', 'checkout')
 
         stored = {'called': False, 'count': 0}
 
@@ -121,11 +126,12 @@ def test_parse_job_retriable_failure_schedules_retry(monkeypatch) -> None:
     )
 
     monkeypatch.setattr(parse_worker, 'clone_repo', lambda *_args, **_kwargs: (_ for _ in ()).throw(ParseError('CLONE_TIMEOUT', 'timeout')))
-    called = {'stage': None, 'code': None}
+    called = {'stage': None, 'code': None, 'owner': None}
 
     def fake_schedule(*_args, **kwargs):
         called['stage'] = kwargs['stage']
         called['code'] = kwargs['error_code']
+        called['owner'] = kwargs['owner']
 
     monkeypatch.setattr(parse_worker, 'schedule_retry_or_dead_letter', fake_schedule)
     observed = {'count': 0}
@@ -134,4 +140,414 @@ def test_parse_job_retriable_failure_schedules_retry(monkeypatch) -> None:
 
     assert called['stage'] == 'parsing'
     assert called['code'] == 'CLONE_TIMEOUT'
+    assert called['owner'] == parse_worker.worker_identity()
     assert observed['count'] == 1
+
+
+def test_update_job_status_with_owner_raises_when_claim_moved() -> None:
+    class ReclaimedSession(FakeSession):
+        def first(self):
+            return None
+
+    fake_db = ReclaimedSession()
+    with pytest.raises(parse_worker.LeaseLost):
+        parse_worker.update_job_status(fake_db, 'job-1', 'embedding', 100, owner='worker-a')
+
+    sql = str(fake_db.events[0][1][0])
+    assert 'claimed_by = :owner' in sql and 'RETURNING id' in sql
+    assert fake_db.events[0][1][1]['owner'] == 'worker-a'
+
+
+def test_parse_job_rolls_back_when_transition_finds_job_reclaimed(monkeypatch) -> None:
+    class ReclaimedSession(FakeSession):
+        def __init__(self) -> None:
+            super().__init__()
+            self.rolled_back = False
+
+        def first(self):
+            # The status write at 80% finds another worker's claim.
+            sql = str(self.events[-1][1][0])
+            if 'claimed_by = :owner' in sql and self.events[-1][1][1]['progress'] == 80:
+                return None
+            return super().first()
+
+        def rollback(self):
+            self.rolled_back = True
+
+    fake_db = ReclaimedSession()
+    snapshot = RepoSnapshot('00000000-0000-0000-0000-000000000013', '00000000-0000-0000-0000-000000000014', 'https://github.com/x/y', 'abc')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / 'main.py').write_text('x = 1\n')
+        monkeypatch.setattr(parse_worker, 'clone_repo', lambda *_args, **_kwargs: tmp)
+        monkeypatch.setattr(parse_worker.settings, 'parse_ingest_mode', 'checkout')
+        monkeypatch.setattr(parse_worker, 'store_chunks', lambda *_args: pytest.fail('chunks must not be written'))
+        outcomes = []
+        monkeypatch.setattr(parse_worker, 'record_stage_duration', lambda _stage, status, _seconds: outcomes.append(status))
+
+        parse_job(fake_db, snapshot)
+
+    assert fake_db.rolled_back is True
+    assert outcomes == ['lease_lost']
+
+
+def test_fetch_next_parse_job_claims_row_with_skip_locked(monkeypatch) -> None:
+    class ClaimSession(FakeSession):
+        def first(self):
+            return {
+                'job_id': '00000000-0000-0000-0000-000000000082',
+                'repo_id': '00000000-0000-0000-0000-000000000081',
+                'commit_sha': 'abc',
+                'github_url': 'https://github.com/x/y',
+            }
+
+    fake_db = ClaimSession()
+    monkeypatch.setattr(parse_worker.settings, 'worker_id', 'worker-a')
+
+    snapshot = parse_worker.fetch_next_parse_job(fake_db)
+
+    assert snapshot is not None
+    assert snapshot.job_id == '00000000-0000-0000-0000-000000000082'
+    sql = str(fake_db.events[0][1][0])
+    assert 'FOR UPDATE SKIP LOCKED' in sql
+    assert 'claimed_by IS NULL' in sql
+    assert fake_db.events[0][1][1]['worker_id'] == 'worker-a'
+    assert 'lease_expires_at' in sql
+    # The claim is committed immediately so the row lock is released.
+    assert fake_db.events[1] == ('commit',)
+
+
+def test_iter_file_chunks_pool_preserves_input_order(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for i in range(6):
+            (root / f'm{i}.py').write_text('\n'.join([f'def f{i}_{j}():\n    return {j}\n' for j in range(3)]))
+        files = sorted(iter_source_files(tmp))
+
+        monkeypatch.setattr(parse_worker.settings, 'parse_chunk_workers', 1)
+        inline = list(parse_worker.iter_file_chunks(tmp, files, 120, 20))
+
+        monkeypatch.setattr(parse_worker.settings, 'parse_chunk_workers', 2)
+        pooled = list(parse_worker.iter_file_chunks(tmp, files, 120, 20))
+        parse_worker._reset_chunk_pool()
+
+    assert [rel for rel, _, _ in pooled] == [f'm{i}.py' for i in range(6)]
+    assert pooled == inline
+
+
+def test_parse_error_survives_pickling() -> None:
+    import pickle
+
+    restored = pickle.loads(pickle.dumps(ParseError('INVALID_CHUNK_CONFIG', 'bad config')))
+    assert restored.code == 'INVALID_CHUNK_CONFIG'
+    assert str(restored) == 'bad config'
+
+
+def test_store_chunks_streams_rows_through_copy() -> None:
+    class FakeCopy:
+        def __init__(self, sink):
+            self.sink = sink
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_args):
+            return False
+
+        def write_row(self, row):
+            self.sink.append(row)
+
+    class FakeCursor:
+        def __init__(self, sink):
+            self.sink = sink
+            self.statements = []
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_args):
+            return False
+
+        def copy(self, statement):
+            self.statements.append(statement)
+            return FakeCopy(self.sink)
+
+    class FakeDriverConnection:
+        def __init__(self):
+            self.rows = []
+            self.cursor_obj = FakeCursor(self.rows)
+
+        def cursor(self):
+            return self.cursor_obj
+
+    class CopySession(FakeSession):
+        def __init__(self):
+            super().__init__()
+            self.driver = FakeDriverConnection()
+
+        def connection(self):
+            outer = self
+
+            class _Conn:
+                class connection:
+                    driver_connection = outer.driver
+
+            return _Conn()
+
+    fake_db = CopySession()
+    chunks = [
+        {'id': f'id-{i}', 'repo_id': 'repo', 'file_path': 'a.py', 'start_line': i, 'end_line': i, 'content': 'x', 'language': 'py'}
+        for i in range(3)
+    ]
+
+    parse_worker.store_chunks(fake_db, 'repo', chunks)
+
+    assert 'DELETE FROM code_chunks' in str(fake_db.events[0][1][0])
+    # One DELETE round trip; all rows go through a single COPY with no inline tsvector.
+    assert len(fake_db.events) == 1
+    statement = fake_db.driver.cursor_obj.statements[0]
+    assert statement.startswith('COPY code_chunks')
+    assert 'fts' not in statement
+    assert fake_db.driver.rows[0] == ('id-0', 'repo', 'a.py', 0, 0, 'x', 'py')
+    assert len(fake_db.driver.rows) == 3
+
+
+def test_parse_job_incremental_rechunks_only_changed_files(monkeypatch) -> None:
+    fake_db = FakeSession()
+    snapshot = RepoSnapshot('00000000-0000-0000-0000-000000000071', '00000000-0000-0000-0000-000000000072', 'https://github.com/x/y', 'def')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / 'changed.py').write_text('\n'.join(['x=1'] * 10))
+        (root / 'untouched.py').write_text('\n'.join(['y=2'] * 10))
+
+        monkeypatch.setattr(parse_worker.settings, 'parse_max_files', 100)
+        monkeypatch.setattr(parse_worker.settings, 'parse_max_chunks', 100)
+        monkeypatch.setattr(parse_worker, 'clone_repo', lambda *_args, **_kwargs: tmp)
+        monkeypatch.setattr(parse_worker.settings, 'parse_ingest_mode', 'checkout')
+        plan = parse_worker.IncrementalPlan(base_sha='abc', changed={'changed.py'}, deleted={'gone.py'}, kept_chunks=5)
+        monkeypatch.setattr(parse_worker, 'plan_incremental', lambda *_args, **_kwargs: plan)
+        monkeypatch.setattr(parse_worker, 'store_chunks', lambda *_args, **_kwargs: pytest.fail('full re-index'))
+
+        replaced = {}
+
+        def fake_replace(_db, _repo_id, paths, chunks):
+            replaced['paths'] = paths
+            replaced['files'] = {chunk['file_path'] for chunk in chunks}
+            return ['00000000-0000-0000-0000-0000000000aa']
+
+        deleted_points = []
+        monkeypatch.setattr(parse_worker, 'replace_file_chunks', fake_replace)
+        monkeypatch.setattr(parse_worker, 'maybe_delete_stale_points', deleted_points.extend)
+        monkeypatch.setattr(parse_worker, 'record_stage_duration', lambda *_args, **_kwargs: None)
+
+        parse_job(fake_db, snapshot)
+
+    assert replaced['paths'] == {'changed.py', 'gone.py'}
+    assert replaced['files'] == {'changed.py'}
+    assert deleted_points == ['00000000-0000-0000-0000-0000000000aa']
+    marks = [e for e in fake_db.events if e[0] == 'execute' and 'indexed_commit_sha' in str(e[1][0])]
+    assert marks and marks[-1][1][1]['commit_sha'] == 'def'
+    assert marks[-1][1][1]['fingerprint'] == parse_worker.chunker_fingerprint(*parse_worker.chunk_sizing())
+
+
+def test_parse_job_git_ingest_reads_blobs_without_checkout(monkeypatch, tmp_path) -> None:
+    import subprocess
+
+    env = {'GIT_AUTHOR_NAME': 't', 'GIT_AUTHOR_EMAIL': 't@t', 'GIT_COMMITTER_NAME': 't', 'GIT_COMMITTER_EMAIL': 't@t', 'PATH': '/usr/bin:/bin'}
+    origin = tmp_path / 'origin'
+    origin.mkdir()
+    (origin / 'main.py').write_text('\n'.join(['x=1'] * 30))
+    (origin / 'node_modules').mkdir()
+    (origin / 'node_modules' / 'lib.js').write_text('y')
+    for cmd in (['init', '-q', '-b', 'main'], ['add', '-A'], ['commit', '-q', '-m', 'init']):
+        subprocess.run(['git', *cmd], cwd=origin, check=True, env=env, capture_output=True)
+    head = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=origin, check=True, capture_output=True, text=True).stdout.strip()
+
+    monkeypatch.setattr(parse_worker.settings, 'parse_mirror_dir', str(tmp_path / 'mirrors'))
+    monkeypatch.setattr(parse_worker.settings, 'parse_ingest_mode', 'git')
+    monkeypatch.setattr(parse_worker.settings, 'parse_chunk_workers', 1)
+    stored = {}
+    monkeypatch.setattr(parse_worker, 'store_chunks', lambda _db, _repo_id, chunks: stored.setdefault('chunks', chunks))
+    monkeypatch.setattr(parse_worker, 'record_stage_duration', lambda *_args, **_kwargs: None)
+
+    clones = []
+    real_clone = parse_worker.clone_repo
+
+    def tracking_clone(*args, **kwargs):
+        path = real_clone(*args, **kwargs)
+        clones.append((path, sorted(p.name for p in Path(path).iterdir())))
+        return path
+
+    monkeypatch.setattr(parse_worker, 'clone_repo', tracking_clone)
+    snapshot = RepoSnapshot('00000000-0000-0000-0000-000000000081', '00000000-0000-0000-0000-000000000082', origin.as_uri(), head)
+
+    parse_job(FakeSession(), snapshot)
+
+    assert clones and clones[0][1] == ['.git']
+    assert {chunk['file_path'] for chunk in stored['chunks']} == {'main.py'}
+
+
+def test_iter_blob_chunks_reuses_cached_spans_and_stores_misses(monkeypatch) -> None:
+    from gitobjects import SourceBlob
+
+    blobs = [SourceBlob('a.py', 'sha-a', 10), SourceBlob('b.md', 'sha-b', 10)]
+    contents = {'sha-a': b'line1\nline2\nline3\n', 'sha-b': b'# title\ntext\n'}
+    monkeypatch.setattr(parse_worker, 'iter_blob_contents', lambda _repo, shas: (contents[sha] for sha in shas))
+    monkeypatch.setattr(parse_worker.settings, 'parse_chunk_workers', 1)
+    monkeypatch.setattr(parse_worker, 'lookup_spans', lambda keys: [[(2, 3)] if 'sha-a' in key else None for key in keys])
+    stored = []
+    monkeypatch.setattr(parse_worker, 'store_spans', lambda entries, _ttl: stored.extend(entries))
+    real_chunk_file = parse_worker.chunk_file
+    chunked = []
+    monkeypatch.setattr(parse_worker, 'chunk_file', lambda content, language, *args: chunked.append(language) or real_chunk_file(content, language, *args))
+
+    results = list(parse_worker.iter_blob_chunks('/repo', blobs, 120, 20))
+
+    assert results[0] == ('a.py', 'py', [(2, 3, 'line2\nline3')])
+    assert results[1] == ('b.md', 'md', [(1, 2, '# title\ntext')])
+    assert chunked == ['md']
+    assert len(stored) == 1 and stored[0][0].endswith(':md:sha-b') and stored[0][1] == [(1, 2)]
+
+
+def test_iter_blob_chunks_reads_contents_as_it_chunks(monkeypatch) -> None:
+    from gitobjects import SourceBlob
+
+    blobs = [SourceBlob(f'f{i}.py', f'sha-{i}', 10) for i in range(5)]
+    read = []
+
+    def contents(_repo, shas):
+        for sha in shas:
+            read.append(sha)
+            yield b'x = 1\n'
+
+    monkeypatch.setattr(parse_worker, 'iter_blob_contents', contents)
+    monkeypatch.setattr(parse_worker.settings, 'parse_chunk_workers', 1)
+    monkeypatch.setattr(parse_worker, 'lookup_spans', lambda keys: [None] * len(keys))
+    monkeypatch.setattr(parse_worker, 'store_spans', lambda *_args: None)
+
+    results = parse_worker.iter_blob_chunks('/repo', blobs, 120, 20)
+    assert next(results)[0] == 'f0.py'
+    assert read == ['sha-0']
+    results.close()
+
+
+def test_filter_checkout_files_applies_path_and_content_rules(monkeypatch, tmp_path) -> None:
+    (tmp_path / '.gitattributes').write_text('gen/** linguist-generated\n')
+    (tmp_path / 'gen').mkdir()
+    (tmp_path / 'gen' / 'api.py').write_text('x = 1\n')
+    (tmp_path / 'app.py').write_text('def f():\n    return 1\n')
+    (tmp_path / 'bundle.js').write_text('a=1;' * 1000)
+    (tmp_path / 'blob.py').write_bytes(b'\0\1\2')
+
+    skipped = []
+    monkeypatch.setattr(parse_worker, 'record_file_skipped', skipped.append)
+    files = sorted(iter_source_files(str(tmp_path)))
+
+    kept = parse_worker.filter_checkout_files(str(tmp_path), files)
+
+    assert [path.name for path in kept] == ['app.py']
+    assert sorted(skipped) == ['binary', 'linguist_generated', 'minified']
+
+
+def test_chunk_sizing_follows_chunk_mode(monkeypatch) -> None:
+    monkeypatch.setattr(parse_worker.settings, 'parse_chunk_mode', 'tokens')
+    assert parse_worker.chunk_sizing() == (
+        parse_worker.settings.parse_chunk_max_tokens,
+        parse_worker.settings.parse_chunk_overlap_tokens,
+        'tokens',
+    )
+    monkeypatch.setattr(parse_worker.settings, 'parse_chunk_mode', 'lines')
+    assert parse_worker.chunk_sizing() == (
+        parse_worker.settings.parse_chunk_lines,
+        parse_worker.settings.parse_chunk_overlap_lines,
+        'lines',
+    )
+
+
+class DependencySession(FakeSession):
+    def __init__(self, paths, dependencies_commit_sha=None, chunk_rows=()):
+        super().__init__()
+        self.paths = paths
+        self.dependencies_commit_sha = dependencies_commit_sha
+        self.chunk_rows = list(chunk_rows)
+        self._last = ''
+
+    def execute(self, statement, *args, **kwargs):
+        self._last = str(statement)
+        return super().execute(statement, *args, **kwargs)
+
+    def first(self):
+        return {'dependencies_commit_sha': self.dependencies_commit_sha}
+
+    def all(self):
+        if 'DISTINCT file_path' in self._last:
+            return [{'file_path': path} for path in sorted(self.paths)]
+        return []
+
+    def __iter__(self):
+        return iter(self.chunk_rows)
+
+    def statements(self):
+        return [(str(event[1][0]), event[1][1]) for event in self.events if event[0] == 'execute']
+
+
+def _edge_insert(session):
+    return next(params for sql, params in session.statements() if 'unnest' in sql)
+
+
+def test_store_file_dependencies_carries_over_edges_of_unchanged_files() -> None:
+    paths = {'a.py', 'b.py', 'c.py'}
+    session = DependencySession(paths, dependencies_commit_sha='base')
+    plan = parse_worker.IncrementalPlan(base_sha='base', changed={'a.py'}, deleted=set(), kept_chunks=4)
+
+    parse_worker.store_file_dependencies(session, 'repo', 'head', {'a.py': [('b', 'python')]}, plan, set(paths))
+
+    copied = [params for sql, params in session.statements() if 'commit_sha = :base_sha' in sql]
+    assert copied and copied[0]['kept'] == ['b.py', 'c.py']
+    assert _edge_insert(session)['sources'] == ['a.py']
+    assert _edge_insert(session)['targets'] == ['b.py']
+    assert any('commit_sha <> :commit_sha' in sql for sql, _ in session.statements())
+
+
+def test_store_file_dependencies_reresolves_kept_files_when_paths_change() -> None:
+    # c.py is new, so b.py's previously unresolved `import c` must now become an edge.
+    paths = {'a.py', 'b.py', 'c.py'}
+    rows = [{'file_path': 'b.py', 'start_line': 1, 'end_line': 1, 'content': 'import c'}]
+    session = DependencySession(paths, dependencies_commit_sha='base', chunk_rows=rows)
+    plan = parse_worker.IncrementalPlan(base_sha='base', changed={'c.py'}, deleted=set(), kept_chunks=4)
+
+    parse_worker.store_file_dependencies(session, 'repo', 'head', {'c.py': []}, plan, {'a.py', 'b.py'})
+
+    assert not any('commit_sha = :base_sha' in sql for sql, _ in session.statements())
+    inserted = _edge_insert(session)
+    assert list(zip(inserted['sources'], inserted['targets'])) == [('b.py', 'c.py')]
+
+
+def test_maybe_delete_stale_points_logs_and_counts_failures(monkeypatch, caplog) -> None:
+    import embed_worker
+
+    def failing_delete(_point_ids):
+        raise embed_worker.EmbedError('EMBED_UPSERT_FAILED', 'qdrant down')
+
+    failures = []
+    monkeypatch.setattr(embed_worker, 'delete_chunk_points', failing_delete)
+    monkeypatch.setattr(parse_worker, 'record_stale_point_cleanup_failure', failures.append)
+
+    with caplog.at_level('WARNING', logger='devlens.worker.parse'):
+        parse_worker.maybe_delete_stale_points(['p1', 'p2'])
+
+    assert failures == ['parsing']
+    assert 'stale point delete failed for 2 points' in caplog.text
+
+
+def test_plan_incremental_falls_back_to_full_reindex_when_chunker_changed(monkeypatch) -> None:
+    class IndexedSession(FakeSession):
+        def first(self):
+            return {'indexed_commit_sha': 'abc', 'indexed_chunker_fingerprint': 'lines-fingerprint'}
+
+    snapshot = RepoSnapshot('00000000-0000-0000-0000-000000000081', '00000000-0000-0000-0000-000000000082', 'https://github.com/x/y', 'def')
+    monkeypatch.setattr(parse_worker.settings, 'parse_incremental', True)
+    monkeypatch.setattr(parse_worker, 'compute_changed_paths', lambda *_args, **_kwargs: pytest.fail('diffed'))
+
+    assert parse_worker.plan_incremental(IndexedSession(), '/tmp/repo', snapshot, 'tokens-fingerprint') is None
@@ -13,10 +13,14 @@ class FakeResult:
 
 
 class FakeSession:
-    def __init__(self, retry_count: int) -> None:
+    def __init__(self, retry_count: int, claimed: bool = True) -> None:
         self.retry_count = retry_count
+        self.claimed = claimed
         self.events = []
 
+    def first(self):
+        return {"id": "job"} if self.claimed else None
+
     def execute(self, statement, params=None):
         sql = str(statement)
         self.events.append((sql, params))
@@ -61,3 +65,158 @@ def test_move_to_dead_letter_after_retry_limit(monkeypatch) -> None:
     sql_calls = [sql for sql, _ in fake_db.events]
     assert any("UPDATE analysis_jobs" in sql and "status = 'failed'" in sql for sql in sql_calls)
     assert any("INSERT INTO dead_letter_jobs" in sql for sql in sql_calls)
+
+
+def test_retry_releases_job_claim(monkeypatch) -> None:
+    fake_db = FakeSession(retry_count=0)
+    monkeypatch.setattr(reliability.settings, "worker_retry_max_attempts", 3)
+
+    reliability.schedule_retry_or_dead_letter(
+        fake_db,
+        job_id="00000000-0000-0000-0000-000000000095",
+        repo_id="00000000-0000-0000-0000-000000000096",
+        stage="parsing",
+        error_code="CLONE_TIMEOUT",
+        message="timeout",
+    )
+
+    retry_sql = next(sql for sql, _ in fake_db.events if "UPDATE analysis_jobs" in sql)
+    assert "claimed_by = NULL" in retry_sql
+
+
+def test_owner_guard_skips_dead_letter_when_job_was_reclaimed(monkeypatch) -> None:
+    fake_db = FakeSession(retry_count=3, claimed=False)
+    monkeypatch.setattr(reliability.settings, "worker_retry_max_attempts", 3)
+
+    reliability.schedule_retry_or_dead_letter(
+        fake_db,
+        job_id="00000000-0000-0000-0000-000000000097",
+        repo_id="00000000-0000-0000-0000-000000000098",
+        stage="parsing",
+        error_code="CLONE_TIMEOUT",
+        message="still failing",
+        owner="worker-a",
+    )
+
+    updates = [(sql, params) for sql, params in fake_db.events if "UPDATE analysis_jobs" in sql]
+    assert len(updates) == 1
+    assert "AND claimed_by = :owner" in updates[0][0] and updates[0][1]["owner"] == "worker-a"
+    assert all("INSERT INTO dead_letter_jobs" not in sql for sql, _ in fake_db.events)
+
+
+def test_owner_guard_applies_to_retry_update(monkeypatch) -> None:
+    fake_db = FakeSession(retry_count=0)
+    monkeypatch.setattr(reliability.settings, "worker_retry_max_attempts", 3)
+
+    reliability.schedule_retry_or_dead_letter(
+        fake_db,
+        job_id="00000000-0000-0000-0000-000000000099",
+        repo_id="00000000-0000-0000-0000-000000000100",
+        stage="embedding",
+        error_code="EMBED_UPSERT_FAILED",
+        message="temporary",
+        owner="worker-a",
+    )
+
+    retry_sql = next(sql for sql, _ in fake_db.events if "UPDATE analysis_jobs" in sql)
+    assert "AND claimed_by = :owner" in retry_sql
+
+
+def test_worker_identity_prefers_configured_id(monkeypatch) -> None:
+    monkeypatch.setattr(reliability.settings, "worker_id", "node-1:worker-2")
+    assert reliability.worker_identity() == "node-1:worker-2"
+
+    monkeypatch.setattr(reliability.settings, "worker_id", None)
+    assert ":" in reliability.worker_identity()
+
+
+class ReapSession(FakeSession):
+    def __init__(self, expired: list[dict]) -> None:
+        super().__init__(retry_count=0)
+        self.expired = expired
+        self.commits = 0
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "lease_expires_at < NOW()" in sql:
+            self.events.append((sql, params))
+            return FakeRows(self.expired)
+        return super().execute(statement, params)
+
+    def commit(self):
+        self.commits += 1
+
+
+class FakeRows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+def test_reap_expired_leases_requeues_via_retry(monkeypatch) -> None:
+    fake_db = ReapSession(
+        [
+            {
+                "job_id": "00000000-0000-0000-0000-000000000097",
+                "repo_id": "00000000-0000-0000-0000-000000000098",
+                "status": "embedding",
+                "claimed_by": "dead-node:42",
+            }
+        ]
+    )
+    monkeypatch.setattr(reliability.settings, "worker_retry_max_attempts", 3)
+
+    reaped = reliability.reap_expired_leases(fake_db)
+
+    assert reaped == 1
+    assert fake_db.commits == 1
+    retry = [(sql, params) for sql, params in fake_db.events if "UPDATE analysis_jobs" in sql]
+    assert retry and retry[0][1]["stage"] == "embedding"
+    assert "LEASE_EXPIRED" in retry[0][1]["error_message"]
+
+
+class RenewSession:
+    def __init__(self, renewed: bool) -> None:
+        self.renewed = renewed
+        self.closed = False
+
+    def execute(self, statement, params=None):
+        return self
+
+    def first(self):
+        return ("job",) if self.renewed else None
+
+    def commit(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_job_lease_flags_loss_when_claim_is_gone() -> None:
+    lease = reliability.JobLease("job-1", session_factory=lambda: RenewSession(renewed=False), lease_seconds=3)
+    lease._interval = 0.01
+    with lease:
+        lease._thread.join(timeout=2)
+
+    assert lease.lost is True
+    try:
+        lease.check()
+        assert False, "expected LeaseLost"
+    except reliability.LeaseLost:
+        pass
+
+
+def test_job_lease_keeps_renewing_while_owned() -> None:
+    lease = reliability.JobLease("job-2", session_factory=lambda: RenewSession(renewed=True), lease_seconds=3)
+    lease._interval = 0.01
+    with lease:
+        lease._stop.wait(0.05)
+        lease.check()
+
+    assert lease.lost is False
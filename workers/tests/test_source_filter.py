@@ -0,0 +1,51 @@
+import pytest
+
+from source_filter import RepoIgnoreRules, compile_pattern, content_skip_reason, path_skip_reason
+
+
+@pytest.mark.parametrize(
+    'pattern,path,expected',
+    [
+        ('*.log', 'deep/dir/app.log', True),
+        ('/build', 'build/out.py', True),
+        ('/build', 'src/build/out.py', False),
+        ('dist/', 'web/dist/app.js', True),
+        ('dist/', 'dist', False),
+        ('docs/**/gen_*.md', 'docs/a/b/gen_api.md', True),
+        ('src/*.py', 'src/pkg/a.py', False),
+        ('vendor', 'vendor/lib/x.go', True),
+    ],
+)
+def test_compile_pattern_follows_gitignore_semantics(pattern, path, expected) -> None:
+    assert bool(compile_pattern(pattern).regex.match(path)) is expected
+
+
+def test_repo_rules_read_linguist_attributes_and_gitignore() -> None:
+    rules = RepoIgnoreRules.from_texts(
+        gitattributes='api/gen/** linguist-generated\nthird_party/** linguist-vendored=true\nthird_party/ours/** -linguist-vendored\n',
+        gitignore='# comment\n*.sql\n!schema.sql\n',
+    )
+
+    assert rules.skip_reason('api/gen/client.ts') == 'linguist_generated'
+    assert rules.skip_reason('third_party/lib/x.c') == 'linguist_vendored'
+    assert rules.skip_reason('third_party/ours/x.c') is None
+    assert rules.skip_reason('db/dump.sql') == 'gitignored'
+    assert rules.skip_reason('schema.sql') is None
+    assert rules.skip_reason('src/app.py') is None
+
+
+def test_path_skip_reason_checks_size_and_generated_names() -> None:
+    rules = RepoIgnoreRules()
+    assert path_skip_reason('big.py', 2_000_000, rules, max_bytes=1_000_000) == 'too_large'
+    assert path_skip_reason('web/vendor.min.js', 10, rules, max_bytes=1_000_000) == 'generated_name'
+    assert path_skip_reason('proto/user_pb2.py', 10, rules, max_bytes=1_000_000) == 'generated_name'
+    assert path_skip_reason('pnpm-lock.yaml', 10, rules, max_bytes=1_000_000) == 'generated_name'
+    assert path_skip_reason('src/app.py', 10, rules, max_bytes=1_000_000) is None
+
+
+def test_content_skip_reason_sniffs_binary_minified_and_generated() -> None:
+    assert content_skip_reason(b'abc\0def', 1000) == 'binary'
+    assert content_skip_reason(b'var a=1;' * 500, 1000) == 'minified'
+    assert content_skip_reason(b'// Code generated by protoc-gen-go. DO NOT EDIT.\npackage x\n', 1000) == 'generated_header'
+    assert content_skip_reason(b'# Do not edit by hand without reading docs\nkey: 1\n', 1000) is None
+    assert content_skip_reason(b'def f():\n    return 1\n' * 100, 1000) is None
@@ -28,3 +28,10 @@ def test_trace_span_context_executes() -> None:
 
 def test_start_metrics_server_is_tolerant_for_ephemeral_port() -> None:
     telemetry.start_metrics_server(0)
+
+
+def test_chunk_cache_counter_emits_hit_and_miss_samples() -> None:
+    telemetry.record_chunk_cache(hits=3, misses=1)
+    payload = generate_latest().decode("utf-8")
+    assert 'devlens_parse_chunk_cache_total{result="hit"}' in payload
+    assert 'devlens_parse_chunk_cache_total{result="miss"}' in payload
@@ -4,9 +4,12 @@ import redis
 
 from config import settings
 from analyze_worker import process_next_analyze_job
-from db import SessionLocal
+from db import SessionLocal, raw_conninfo
+from dispatch import JobListener
 from embed_worker import process_next_embed_job
+from http_clients import close_http_clients
 from parse_worker import process_next_parse_job
+from reliability import reap_expired_leases
 from telemetry import start_metrics_server
 
 
@@ -25,22 +28,27 @@ def main() -> None:
     client = wait_for_redis(settings.redis_url)
     start_metrics_server(settings.worker_metrics_port)
     print(f"Worker connected to Redis in {settings.env} mode. Parse+embed+analyze worker started.")
-
-    while True:
-        client.set("devlens:worker:heartbeat", int(time.time()), ex=30)
-        db = SessionLocal()
-        try:
-            processed_parse = process_next_parse_job(db)
-            processed_embed = process_next_embed_job(db)
-            processed_analyze = process_next_analyze_job(db)
-        finally:
-            db.close()
-
-        if not processed_parse and not processed_embed and not processed_analyze:
-            time.sleep(2)
-            continue
-
-        time.sleep(10)
+    listener = JobListener(raw_conninfo())
+
+    try:
+        while True:
+            client.set("devlens:worker:heartbeat", int(time.time()), ex=30)
+            db = SessionLocal()
+            try:
+                reap_expired_leases(db)
+                processed_parse = process_next_parse_job(db)
+                processed_embed = process_next_embed_job(db)
+                processed_analyze = process_next_analyze_job(db)
+            finally:
+                db.close()
+
+            if processed_parse or processed_embed or processed_analyze:
+                # Drain the queue back-to-back; the next stage is usually claimable right away.
+                continue
+
+            listener.wait(settings.worker_poll_interval_seconds)
+    finally:
+        close_http_clients()
 
 
 if __name__ == "__main__":